@@ -0,0 +1,115 @@
+// Site search over the static index written by scripts/generate_search_index.py.
+// Only the manifest and the term shards for the words being typed are fetched;
+// tokens() and lookup() mirror the Python functions of the same names.
+document.addEventListener('DOMContentLoaded', () => {
+    const form = document.getElementById('site-search-form');
+    const input = document.getElementById('site-search-input');
+    const status = document.getElementById('site-search-status');
+    const results = document.getElementById('site-search-results');
+    if (!form || !input || !status || !results) return;
+
+    const maxResults = 20;
+    const shards = new Map();
+    let manifestPromise;
+    let searchDebounce;
+    let latestQuery = '';
+
+    const escapeHtml = (value = '') => String(value)
+        .replaceAll('&', '&amp;').replaceAll('<', '&lt;').replaceAll('>', '&gt;').replaceAll('"', '&quot;').replaceAll("'", '&#039;');
+
+    const fetchJson = async (url) => {
+        const response = await fetch(url);
+        if (!response.ok) throw new Error(`Search request failed with ${response.status}`);
+        return response.json();
+    };
+
+    const loadManifest = () => {
+        manifestPromise = manifestPromise || fetchJson('/search/index.json').then((manifest) => ({
+            ...manifest,
+            stopWords: new Set(manifest.stopWords)
+        }));
+        return manifestPromise;
+    };
+
+    const loadShard = (manifest, path) => {
+        if (!shards.has(path)) shards.set(path, fetchJson(`/search/${path}?v=${manifest.revision}`));
+        return shards.get(path);
+    };
+
+    const tokens = (manifest, text) => (text.normalize('NFKD').replace(/[\u0300-\u036f]/g, '').toLowerCase().match(/[a-z0-9]+/g) || [])
+        .filter((term) => term.length >= manifest.prefixLength && !manifest.stopWords.has(term));
+
+    const lookup = async (manifest, query) => {
+        const terms = [...new Set(tokens(manifest, query))];
+        // A shard can hold terms starting with the query term when either is a prefix of the other.
+        const postings = await Promise.all(terms.map((term) => Promise.all(manifest.prefixes
+            .filter((prefix) => term.startsWith(prefix) || prefix.startsWith(term))
+            .map((prefix) => loadShard(manifest, `terms/${prefix}.json`)))));
+        let scores = null;
+        for (const [position, term] of terms.entries()) {
+            const matched = new Map();
+            for (const shard of postings[position]) {
+                for (const [indexed, posting] of Object.entries(shard)) {
+                    if (!indexed.startsWith(term)) continue;
+                    for (let index = 0; index < posting.length; index += 2) {
+                        matched.set(posting[index], (matched.get(posting[index]) || 0) + posting[index + 1]);
+                    }
+                }
+            }
+            scores = scores === null
+                ? matched
+                : new Map([...scores].filter(([page]) => matched.has(page)).map(([page, score]) => [page, score + matched.get(page)]));
+            if (!scores.size) return [];
+        }
+        return [...(scores || new Map())].sort((a, b) => b[1] - a[1] || a[0] - b[0]);
+    };
+
+    const describePages = async (manifest, ranked) => Promise.all(ranked.map(async ([page]) => {
+        const block = await loadShard(manifest, `pages/${Math.floor(page / manifest.pagesPerShard)}.json`);
+        const [url, title, description] = block[page % manifest.pagesPerShard];
+        return { url, title, description };
+    }));
+
+    const render = async (query) => {
+        latestQuery = query;
+        const url = new URL(window.location.href);
+        query ? url.searchParams.set('q', query) : url.searchParams.delete('q');
+        window.history.replaceState({}, '', `${url.pathname}${url.search}`);
+        if (!query.trim()) {
+            status.textContent = 'Type a word to search every public page.';
+            results.innerHTML = '';
+            return;
+        }
+        try {
+            const manifest = await loadManifest();
+            const ranked = await lookup(manifest, query);
+            const pages = await describePages(manifest, ranked.slice(0, maxResults));
+            if (query !== latestQuery) return;
+            status.textContent = ranked.length
+                ? `${ranked.length} ${ranked.length === 1 ? 'page matches' : 'pages match'} “${query.trim()}”${ranked.length > maxResults ? `; showing the best ${maxResults}` : ''}.`
+                : `No pages match “${query.trim()}”.`;
+            results.innerHTML = pages.map((page) => `
+                <li class="rounded-2xl border border-border-color bg-white p-5 shadow-sm">
+                    <a class="text-xl font-bold text-brand-purple-dark underline-offset-4 hover:underline" href="${escapeHtml(page.url)}">${escapeHtml(page.title || page.url)}</a>
+                    ${page.description ? `<p class="mt-2 leading-7 text-text-secondary">${escapeHtml(page.description)}</p>` : ''}
+                    <p class="mt-2 text-sm text-text-secondary">${escapeHtml(page.url)}</p>
+                </li>`).join('');
+        } catch (error) {
+            console.error('Could not search the site:', error);
+            status.textContent = 'Search is unavailable right now. Try the news page or the resources page.';
+        }
+    };
+
+    form.addEventListener('submit', (event) => {
+        event.preventDefault();
+        clearTimeout(searchDebounce);
+        render(input.value);
+    });
+    input.addEventListener('input', () => {
+        clearTimeout(searchDebounce);
+        searchDebounce = setTimeout(() => render(input.value), 200);
+    });
+
+    input.value = new URLSearchParams(window.location.search).get('q') || '';
+    render(input.value);
+});
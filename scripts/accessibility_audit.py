@@ -14,7 +14,7 @@ from html.parser import HTMLParser
 from pathlib import Path
 from urllib.parse import urlparse
 
-from public_pages import public_html_paths
+from public_pages import PageCorpus, public_html_paths
 
 
 ROOT = Path(__file__).resolve().parent.parent
@@ -105,14 +105,14 @@ class AuditParser(HTMLParser):
             self.buttons[-1]["text"] += data
 
 
-def pages() -> list[Path]:
-    return public_html_paths(ROOT, include_404=True)
+def pages(corpus: PageCorpus | None = None) -> list[Path]:
+    return public_html_paths(ROOT, include_404=True, corpus=corpus)
 
 
-def audit(path: Path) -> list[Issue]:
+def audit(path: Path, corpus: PageCorpus | None = None) -> list[Issue]:
     rel = path.relative_to(ROOT).as_posix()
     parser = AuditParser()
-    parser.feed(path.read_text(encoding="utf-8"))
+    parser.feed(corpus.text(path) if corpus else path.read_text(encoding="utf-8"))
     issues: list[Issue] = []
 
     def add(level: str, message: str) -> None:
@@ -168,12 +168,13 @@ def audit(path: Path) -> list[Issue]:
     return issues
 
 
-def main() -> int:
+def main(argv: list[str] | None = None, corpus: PageCorpus | None = None) -> int:
     arg_parser = argparse.ArgumentParser(description=__doc__)
     arg_parser.add_argument("--report", default="accessibility-report.md")
-    args = arg_parser.parse_args()
-    checked = pages()
-    issues = [issue for page in checked for issue in audit(page)]
+    args = arg_parser.parse_args(argv)
+    corpus = corpus or PageCorpus(ROOT)
+    checked = pages(corpus)
+    issues = [issue for page in checked for issue in audit(page, corpus)]
     errors = [issue for issue in issues if issue.level == "ERROR"]
     warnings = [issue for issue in issues if issue.level == "WARN"]
     lines = ["# Static Accessibility Report", "", f"- Pages checked: {len(checked)}", f"- Errors: {len(errors)}", f"- Warnings: {len(warnings)}", "", "> This structural audit does not replace rendered axe, contrast, keyboard, screen-reader, zoom or real-device testing.", ""]
@@ -58,15 +58,22 @@ def parse_args() -> argparse.Namespace:
 
 
 def load_urls(sitemap_path: Path) -> list[str]:
+    """Return the page URLs of a sitemap, following a sitemap index to its local child sitemaps."""
+
     tree = ET.parse(sitemap_path)
     root = tree.getroot()
 
+    locs = [loc.text.strip() for loc in root.findall("{*}url/{*}loc") + root.findall("{*}sitemap/{*}loc") if loc.text]
+    if root.tag.endswith("sitemapindex"):
+        locs = [
+            url
+            for child in locs
+            for url in load_urls(sitemap_path.parent / urllib.parse.urlparse(child).path.lstrip("/"))
+        ]
+
     urls: list[str] = []
     seen: set[str] = set()
-    for loc in root.findall(".//{*}loc"):
-        if loc.text is None:
-            continue
-        url = loc.text.strip()
+    for url in locs:
         if not url or url in seen:
             continue
         seen.add(url)
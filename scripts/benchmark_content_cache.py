@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Time loading the content model from JSON against the pickle content cache.
+
+Copies the news, events and bargaining sources into a scratch tree, scaled up
+by repeating their entries, then reports for each scale the best of several
+timings of: parsing the JSON into records, a cold cached read (parse and
+write the pickle) and a warm cached read.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from content import CONTENT_CACHE, read_bargaining, read_events, read_news
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def scaled_sources(root: Path, factor: int) -> int:
+    """Write the sources with every entry repeated ``factor`` times; return the total bytes."""
+
+    news = json.loads((ROOT / "news" / "news.json").read_text(encoding="utf-8"))
+    events = json.loads((ROOT / "events" / "events.json").read_text(encoding="utf-8"))
+    bargaining = json.loads((ROOT / "data" / "higher-ed-bargaining-updates.json").read_text(encoding="utf-8"))
+    copies = range(factor)
+    news = [{**item, "url": f"{item.get('url', '')}?copy={copy}"} for copy in copies for item in news]
+    events = {**events, "events": [{**item, "url": f"{item.get('url', '')}?copy={copy}"} for copy in copies for item in events["events"]]}
+    bargaining = {**bargaining, "updates": [update for _ in copies for update in bargaining["updates"]]}
+    total = 0
+    for relative, data in (("news/news.json", news), ("events/events.json", events), ("data/higher-ed-bargaining-updates.json", bargaining)):
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        total += path.stat().st_size
+    return total
+
+
+def load_all(root: Path, *, cache: bool) -> None:
+    read_news(root, cache=cache)
+    read_events(root, cache=cache)
+    read_bargaining(root, cache=cache)
+
+
+def best_of(repeat: int, action: Callable[[], None], before: Callable[[], None] = lambda: None) -> float:
+    timings = []
+    for _ in range(repeat):
+        before()
+        started = time.perf_counter()
+        action()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scales", default="1,10,100", help="Comma-separated corpus multipliers (default: 1,10,100).")
+    parser.add_argument("--repeat", type=int, default=5, help="Timings per measurement; the best is reported (default: 5).")
+    args = parser.parse_args()
+
+    print(f"{'scale':>6} {'sources':>10} {'JSON + parse':>13} {'cold cache':>11} {'warm cache':>11} {'speedup':>8}")
+    for factor in (int(value) for value in args.scales.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            size = scaled_sources(root, factor)
+            clear = lambda: shutil.rmtree(root / CONTENT_CACHE, ignore_errors=True)  # noqa: E731
+            uncached = best_of(args.repeat, lambda: load_all(root, cache=False))
+            cold = best_of(args.repeat, lambda: load_all(root, cache=True), before=clear)
+            warm = best_of(args.repeat, lambda: load_all(root, cache=True))
+            print(
+                f"{factor:>5}x {size / 1024:>8.0f} KiB {uncached * 1000:>10.1f} ms {cold * 1000:>8.1f} ms"
+                f" {warm * 1000:>8.1f} ms {uncached / warm:>7.1f}x"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Time the streaming feed writer against the ElementTree-to-minidom round trip it replaced.
+
+Builds a combined feed of ``--items`` entries by cycling the site's news and
+event items with unique links, writes it both ways, checks that the two are
+byte-identical, and reports the best of several timings and the tracemalloc
+peak of each.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from typing import Callable
+from xml.dom import minidom
+
+from content import read_events, read_news
+from generate_rss import ATOM_NS, BASE_URL, ROOT, absolute_url, build_combined_items, build_event_items, build_feed, build_news_items, to_rfc2822
+
+
+FEED = {"title": "SEIU Local 503 at OSU - News and Events", "description": "Benchmark feed.", "self_path": "/feed.xml"}
+
+
+def minidom_feed(*, title: str, description: str, self_path: str, items: list[dict]) -> str:
+    """The previous writer: build an ElementTree, serialize it, re-parse it with minidom and pretty-print."""
+
+    ET.register_namespace("atom", ATOM_NS)
+    rss = ET.Element("rss", version="2.0")
+    channel = ET.SubElement(rss, "channel")
+    ET.SubElement(channel, "title").text = title
+    ET.SubElement(channel, "link").text = BASE_URL
+    ET.SubElement(channel, "description").text = description
+    ET.SubElement(channel, "language").text = "en-us"
+    ET.SubElement(channel, "lastBuildDate").text = to_rfc2822(max(item["pub_date"] for item in items))
+    ET.SubElement(channel, f"{{{ATOM_NS}}}link", href=absolute_url(self_path), rel="self", type="application/rss+xml")
+    for item in items:
+        element = ET.SubElement(channel, "item")
+        ET.SubElement(element, "title").text = item["title"]
+        ET.SubElement(element, "link").text = item["link"]
+        ET.SubElement(element, "guid", isPermaLink="true" if item["guid_is_permalink"] else "false").text = item["guid"]
+        ET.SubElement(element, "description").text = item["description"]
+        ET.SubElement(element, "pubDate").text = to_rfc2822(item["pub_date"])
+        for category in item.get("categories") or []:
+            ET.SubElement(element, "category").text = category
+    raw = ET.tostring(rss, encoding="utf-8")
+    return minidom.parseString(raw).toprettyxml(indent="  ", encoding="utf-8").decode("utf-8")
+
+
+def synthetic_items(count: int) -> list[dict]:
+    source = build_combined_items(build_news_items(read_news(ROOT)), build_event_items(read_events(ROOT).events))
+    return [
+        {**item, "link": f"{item['link']}?copy={number}", "guid": f"{item['guid']}:{number}"}
+        for number, item in zip(range(count), (item for _ in range(count // len(source) + 1) for item in source))
+    ]
+
+
+def measure(write: Callable[..., str], items: list[dict], repeat: int) -> tuple[str, float, int]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        write(items=items, **FEED)
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    text = write(items=items, **FEED)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return text, min(timings), peak
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=10_000, help="Feed items (default: 10000).")
+    parser.add_argument("--repeat", type=int, default=5, help="Timings per writer; the best is reported (default: 5).")
+    args = parser.parse_args()
+
+    items = synthetic_items(args.items)
+    old, old_time, old_peak = measure(minidom_feed, items, args.repeat)
+    new, new_time, new_peak = measure(build_feed, items, args.repeat)
+    if old != new:
+        raise SystemExit("The streaming writer's output differs from the minidom round trip.")
+    print(f"{len(items):,} items, {len(new.encode('utf-8')) / 1024:,.0f} KiB of identical output")
+    print(f"{'writer':<22} {'time':>10} {'peak memory':>12}")
+    print(f"{'ElementTree + minidom':<22} {old_time * 1000:>7.1f} ms {old_peak / 1024 / 1024:>8.1f} MiB")
+    print(f"{'streaming':<22} {new_time * 1000:>7.1f} ms {new_peak / 1024 / 1024:>8.1f} MiB")
+    print(f"Speedup {old_time / new_time:.1f}x, {old_peak / new_peak:.1f}x less peak memory")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
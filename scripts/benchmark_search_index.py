@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Report search index size and lookup latency for the site and a synthetic corpus.
+
+Indexes the current public pages, then a synthetic corpus of ``--pages``
+documents whose words are drawn from the site's own vocabulary, with page
+lengths sampled from the real pages. For each, prints the index size, the
+largest and median term shards, and, over a fixed set of one- and two-word
+queries, the bytes a browser would download (the term shards) and the time
+to decode those shards and rank the results.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import time
+from collections import Counter
+
+from generate_search_index import SearchDocument, build_index, documents, encode, lookup, tokens
+from public_pages import ROOT, PageCorpus, discover_public_pages
+
+
+def synthetic_documents(
+    source: list[SearchDocument], count: int, rng: random.Random
+) -> tuple[list[SearchDocument], list[str], list[int]]:
+    vocabulary = Counter(term for document in source for term in tokens(f"{document.title} {document.text}"))
+    words, weights = list(vocabulary), list(vocabulary.values())
+    lengths = [len(document.text.split()) for document in source]
+    return [
+        SearchDocument(
+            f"/synthetic/{number}.html",
+            " ".join(rng.choices(words, weights, k=6)),
+            " ".join(rng.choices(words, weights, k=20)),
+            " ".join(rng.choices(words, weights, k=rng.choice(lengths))),
+        )
+        for number in range(count)
+    ], words, weights
+
+
+def queries(words: list[str], weights: list[int], count: int, rng: random.Random) -> list[str]:
+    picked = []
+    for _ in range(count):
+        terms = rng.choices(words, weights, k=rng.choice((1, 2)))
+        if rng.random() < 0.5:
+            terms[-1] = terms[-1][: rng.randint(2, max(2, min(5, len(terms[-1]))))]
+        picked.append(" ".join(terms))
+    return picked
+
+
+def measure(label: str, corpus: list[SearchDocument], query_list: list[str]) -> None:
+    started = time.perf_counter()
+    files = {path: encode(content) for path, content in build_index(corpus).items()}
+    build_time = time.perf_counter() - started
+    shards = sorted(len(data) for path, data in files.items() if path.startswith("terms/"))
+    prefixes = json.loads(files["index.json"])["prefixes"]
+
+    timings, downloads = [], []
+    for query in query_list:
+        fetched = 0
+        started = time.perf_counter()
+
+        def load(prefix: str) -> dict:
+            nonlocal fetched
+            data = files[f"terms/{prefix}.json"]
+            fetched += len(data)
+            return json.loads(data)
+
+        lookup(query, load, prefixes)
+        timings.append(time.perf_counter() - started)
+        downloads.append(fetched)
+
+    total = sum(len(data) for data in files.values())
+    print(f"{label}: {len(corpus):,} pages indexed in {build_time:.2f} s")
+    print(f"  index: {total / 1024:,.0f} KiB in {len(files)} files; manifest {len(files['index.json']) / 1024:.1f} KiB")
+    print(f"  term shards: {len(shards)}, median {statistics.median(shards) / 1024:.1f} KiB, largest {shards[-1] / 1024:.1f} KiB")
+    print(
+        f"  per query ({len(query_list)} queries): median {statistics.median(downloads) / 1024:.1f} KiB downloaded, "
+        f"p95 {statistics.quantiles(downloads, n=20)[-1] / 1024:.1f} KiB; "
+        f"lookup median {statistics.median(timings) * 1000:.2f} ms, p95 {statistics.quantiles(timings, n=20)[-1] * 1000:.2f} ms"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=5000, help="Synthetic corpus size (default: 5000).")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per corpus (default: 200).")
+    args = parser.parse_args()
+
+    rng = random.Random(83)
+    corpus = PageCorpus(ROOT)
+    site = documents(discover_public_pages(ROOT, include_404=False, corpus=corpus), corpus)
+    synthetic, words, weights = synthetic_documents(site, args.pages, rng)
+    query_list = queries(words, weights, args.queries, rng)
+    measure("Site", site, query_list)
+    measure("Synthetic", synthetic, query_list)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
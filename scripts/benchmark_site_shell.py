@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""Time the single-scan site shell synchronizer against the pass-per-region version it replaced.
+
+Runs both over the site's public pages and over a synthetic tree of
+``--pages`` pages made by cycling those pages in three states: already
+marked, with an unmarked header and footer, and with no shell at all. Checks
+that the two synchronizers produce byte-identical pages, then reports the
+best of several timings for the previous version, the new one serially and
+the new one on a ``--jobs`` worker pool.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
+
+from public_pages import ROOT, PageCorpus, public_html_paths
+from sync_site_shell import (
+    FOOTER_END,
+    FOOTER_START,
+    HEADER_END,
+    HEADER_START,
+    MARKED_FEEDS_RE,
+    MARKED_FOOTER_RE,
+    MARKED_HEADER_RE,
+    active_section,
+    section_feed_links,
+    section_header,
+    shell_footer,
+    sync_page,
+    sync_pages,
+)
+
+
+BODY_RE = re.compile(r"<body\b[^>]*>", re.IGNORECASE)
+MAIN_RE = re.compile(r"<main\b", re.IGNORECASE)
+HEAD_END_RE = re.compile(r"</head\s*>", re.IGNORECASE)
+STYLE_RE = re.compile(r"<style\b", re.IGNORECASE)
+TAILWIND_LINK_RE = re.compile(r"<link\b[^>]*href=[\"']/styles/tailwind\.css[\"'][^>]*>", re.IGNORECASE)
+SHELL_STYLES_LINK_RE = re.compile(r"<link\b[^>]*href=[\"']/styles/site-shell\.css[\"'][^>]*>", re.IGNORECASE)
+
+
+def element_span(source: str, tag: str, start: int = 0, end: int | None = None, *, last: bool = False) -> tuple[int, int] | None:
+    boundary = len(source) if end is None else end
+    openers = list(re.compile(rf"<{tag}\b[^>]*>", re.IGNORECASE).finditer(source, start, boundary))
+    if not openers:
+        return None
+    opener = openers[-1] if last else openers[0]
+    depth = 0
+    for token in re.compile(rf"</?{tag}\b[^>]*>", re.IGNORECASE).finditer(source, opener.start()):
+        if token.group(0).lstrip().startswith("</"):
+            depth -= 1
+            if depth == 0:
+                return opener.start(), token.end()
+        elif not token.group(0).rstrip().endswith("/>"):
+            depth += 1
+    return None
+
+
+def reference_sync_source(source: str, relative_path: str) -> str:
+    """The previous synchronizer: one regex pass and one string rebuild per region, fragments rendered per page."""
+
+    links = []
+    if not TAILWIND_LINK_RE.search(source):
+        links.append('    <link rel="stylesheet" href="/styles/tailwind.css">')
+    if not SHELL_STYLES_LINK_RE.search(source):
+        links.append('    <link rel="stylesheet" href="/styles/site-shell.css">')
+    if links:
+        style = STYLE_RE.search(source)
+        head_end = HEAD_END_RE.search(source)
+        insert_at = style.start() if style else (head_end.start() if head_end else None)
+        if insert_at is None:
+            raise ValueError("Missing </head> while adding site shell stylesheets")
+        source = source[:insert_at] + "\n".join(links) + "\n" + source[insert_at:]
+
+    feeds = section_feed_links.__wrapped__(active_section(relative_path))
+    if MARKED_FEEDS_RE.search(source):
+        source = MARKED_FEEDS_RE.sub(lambda _: feeds, source, count=1)
+    else:
+        head_end = HEAD_END_RE.search(source)
+        if not head_end:
+            raise ValueError("Missing </head> while adding feed links")
+        line_start = source.rfind("\n", 0, head_end.start()) + 1
+        if source[line_start : head_end.start()].strip():
+            source = source[: head_end.start()] + feeds + "\n" + source[head_end.start() :]
+        else:
+            source = source[:line_start] + "    " + feeds + "\n" + source[line_start:]
+
+    had_marked_header = bool(MARKED_HEADER_RE.search(source))
+    body = BODY_RE.search(source)
+    if not body:
+        raise ValueError("Missing <body> element")
+    main = MAIN_RE.search(source, body.end())
+    header_span = None if had_marked_header else element_span(source, "header", body.end(), main.start() if main else None)
+    header = section_header.__wrapped__(active_section(relative_path))
+    if had_marked_header:
+        source = MARKED_HEADER_RE.sub(lambda _: header, source, count=1)
+    elif header_span:
+        source = source[: header_span[0]] + header + source[header_span[1] :]
+    else:
+        if "data-site-shell-added" not in body.group(0):
+            source = source[: body.start()] + body.group(0)[:-1] + " data-site-shell-added>" + source[body.end() :]
+        body = BODY_RE.search(source)
+        assert body is not None
+        main = MAIN_RE.search(source, body.end())
+        insert_at = main.start() if main else body.end()
+        source = source[:insert_at] + "\n    " + header + "\n\n    " + source[insert_at:]
+
+    footer = shell_footer.__wrapped__(relative_path == "privacy.html")
+    if MARKED_FOOTER_RE.search(source):
+        source = MARKED_FOOTER_RE.sub(lambda _: footer, source, count=1)
+    else:
+        footer_span = element_span(source, "footer", last=True)
+        if footer_span:
+            source = source[: footer_span[0]] + footer + source[footer_span[1] :]
+        else:
+            body_end = re.search(r"</body\s*>", source, re.IGNORECASE)
+            if not body_end:
+                raise ValueError("Missing </body> while adding footer")
+            source = source[: body_end.start()] + "\n    " + footer + "\n" + source[body_end.start() :]
+    return re.sub(rf"(?m)^[ \t]+(?=\n[ \t]*{re.escape(HEADER_START)})", "", source, count=1)
+
+
+def reference_sync_page(page: tuple[str, str]) -> tuple[str, str | None]:
+    source, relative_path = page
+    try:
+        return reference_sync_source(source, relative_path), None
+    except ValueError as error:
+        return source, str(error)
+
+
+def shell_states(source: str) -> list[str]:
+    """A page as synced, with its shell unmarked, and with no shell at all."""
+
+    unmarked = MARKED_FEEDS_RE.sub("", source)
+    unmarked = unmarked.replace(HEADER_START, "").replace(HEADER_END, "").replace(FOOTER_START, "").replace(FOOTER_END, "")
+    bare = MARKED_FOOTER_RE.sub("", MARKED_HEADER_RE.sub("", MARKED_FEEDS_RE.sub("", source)))
+    return [source, unmarked, bare]
+
+
+def site_pages() -> list[tuple[str, str]]:
+    corpus = PageCorpus(ROOT)
+    return [(corpus.text(path), path.relative_to(ROOT).as_posix()) for path in public_html_paths(ROOT, include_404=True, corpus=corpus)]
+
+
+def synthetic_tree(pages: list[tuple[str, str]], count: int) -> list[tuple[str, str]]:
+    variants = [(state, relative_path) for source, relative_path in pages for state in shell_states(source)]
+    return [variants[number % len(variants)] for number in range(count)]
+
+
+def best(run: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def report(label: str, work: list[tuple[str, str]], jobs: int, repeat: int) -> None:
+    expected = [reference_sync_page(page) for page in work]
+    if [sync_page(page) for page in work] != expected or sync_pages(work, jobs) != expected:
+        raise SystemExit(f"{label}: the single-scan synchronizer's output differs from the previous version.")
+    old = best(lambda: [reference_sync_page(page) for page in work], repeat)
+    serial = best(lambda: [sync_page(page) for page in work], repeat)
+    print(f"{label}: {len(work):,} pages, {sum(len(source) for source, _ in work) / 1024 / 1024:,.1f} MiB, identical output")
+    print(f"  {'pass per region':<20} {old * 1000:>8.1f} ms")
+    print(f"  {'single scan':<20} {serial * 1000:>8.1f} ms  ({old / serial:.1f}x)")
+    if jobs > 1:
+        # Call the pool directly so trees under the threshold are measured too.
+        def pooled() -> None:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                list(pool.map(sync_page, work, chunksize=max(1, len(work) // (jobs * 4))))
+
+        parallel = best(pooled, repeat)
+        print(f"  {f'{jobs} workers':<20} {parallel * 1000:>8.1f} ms  ({old / parallel:.1f}x)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=5_000, help="Pages in the synthetic tree (default: 5000).")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes to time (default: CPU count).")
+    parser.add_argument("--repeat", type=int, default=5, help="Timings per synchronizer; the best is reported (default: 5).")
+    args = parser.parse_args()
+
+    pages = site_pages()
+    report("Site", pages, args.jobs, args.repeat)
+    report("Synthetic", synthetic_tree(pages, args.pages), args.jobs, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
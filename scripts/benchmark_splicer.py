@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Compare one splice_regions pass with one replace_element_inner call per region.
+
+Builds a synthetic page with many generated regions separated by ordinary
+markup, replaces every region both ways, checks that the results match and
+prints the best of several timings for each.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable
+
+from generate_static_content import replace_element_inner, splice_regions
+
+
+def synthetic_page(regions: int, filler: int) -> str:
+    block = '<section class="card"><h2>Heading</h2><p>Body copy with <a href="/news.html">a link</a>.</p></section>\n'
+    parts = ["<!doctype html><html><body>\n"]
+    for index in range(regions):
+        parts.append(block * filler)
+        parts.append(f'<div id="region-{index}" class="generated"><div><span>old {index}</span></div></div>\n')
+    parts.append("</body></html>\n")
+    return "".join(parts)
+
+
+def best_of(repeat: int, action: Callable[[], str]) -> tuple[float, str]:
+    timings = []
+    result = ""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = action()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--regions", type=int, default=400, help="Generated regions in the page (default: 400).")
+    parser.add_argument("--filler", type=int, default=3, help="Markup blocks between regions (default: 3).")
+    parser.add_argument("--repeat", type=int, default=5, help="Timings per approach; the best is reported (default: 5).")
+    args = parser.parse_args()
+
+    source = synthetic_page(args.regions, args.filler)
+    inners = {f"region-{index}": f"<p>new {index}</p>" for index in range(args.regions)}
+
+    def sequential() -> str:
+        page = source
+        for element_id, inner in inners.items():
+            page = replace_element_inner(page, element_id, inner)
+        return page
+
+    sequential_time, expected = best_of(args.repeat, sequential)
+    single_time, actual = best_of(args.repeat, lambda: splice_regions(source, elements=inners))
+    if actual != expected:
+        print("splice_regions and replace_element_inner disagree")
+        return 1
+    print(f"Page: {len(source) / 1024:.0f} KiB, {args.regions} regions")
+    print(f"{f'replace_element_inner x {args.regions}':30} {sequential_time * 1000:8.1f} ms")
+    print(f"{'splice_regions (one pass)':30} {single_time * 1000:8.1f} ms ({sequential_time / single_time:.0f}x faster)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
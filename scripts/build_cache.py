@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Content-hash bookkeeping for incremental site builds.
+
+The cache records, for every build step, the SHA-256 of each input and output
+as they stood when the step last finished. A later build reruns a step only
+when one of those files changed, appeared or disappeared. The cache is a local
+convenience: deleting it, or passing ``--force``, simply rebuilds everything.
+
+Inputs under ``STAMPED_DIRS`` are recorded by size and mtime instead of
+hash. Those files are large and only ever replaced, so hashing them on every
+build would cost more than the steps they guard.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+from pathlib import Path
+
+from public_pages import ROOT
+
+
+CACHE_DIR_NAME = ".build-cache"
+CACHE_DIR = ROOT / CACHE_DIR_NAME
+CACHE_VERSION = 1
+STAMPED_DIRS = ("images/",)
+
+
+def file_digest(path: Path) -> str | None:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def file_stamp(path: Path) -> str | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return f"stat:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def digests(root: Path, relative_paths: list[str]) -> dict[str, str | None]:
+    return {
+        relative: file_stamp(root / relative) if relative.startswith(STAMPED_DIRS) else file_digest(root / relative)
+        for relative in relative_paths
+    }
+
+
+def changed_since(root: Path, ref: str) -> set[str]:
+    """Return repo-relative paths that differ from a git ref, including untracked files."""
+
+    def git(*args: str) -> list[str]:
+        result = subprocess.run(["git", *args], cwd=root, check=True, capture_output=True, text=True)
+        return [line for line in result.stdout.splitlines() if line]
+
+    return set(git("diff", "--name-only", ref, "--")) | set(git("ls-files", "--others", "--exclude-standard"))
+
+
+class BuildCache:
+    """Per-step input and output hashes persisted between builds."""
+
+    def __init__(self, path: Path, steps: dict[str, dict] | None = None) -> None:
+        self.path = path
+        self.steps: dict[str, dict] = steps or {}
+
+    @classmethod
+    def load(cls, path: Path) -> BuildCache:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return cls(path)
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return cls(path)
+        return cls(path, data.get("steps") or {})
+
+    def is_current(self, step: str, inputs: dict[str, str | None], root: Path) -> bool:
+        """Return whether a step's inputs and recorded outputs are unchanged."""
+
+        entry = self.steps.get(step)
+        if not entry or entry.get("inputs") != inputs:
+            return False
+        outputs: dict[str, str | None] = entry.get("outputs") or {}
+        return digests(root, list(outputs)) == outputs
+
+    def record(self, step: str, inputs: dict[str, str | None], outputs: dict[str, str | None]) -> None:
+        self.steps[step] = {"inputs": inputs, "outputs": outputs}
+
+    def save(self) -> None:
+        """Replace the cache file atomically, so an interrupted build never leaves half of it."""
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"version": CACHE_VERSION, "steps": self.steps}
+        temporary = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        try:
+            temporary.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+            os.replace(temporary, self.path)
+        except BaseException:
+            temporary.unlink(missing_ok=True)
+            raise
@@ -14,6 +14,8 @@ case "$(uname -s)-$(uname -m)" in
 esac
 
 BINARY="$CACHE_DIR/$ASSET"
+# build_site.py --check passes a scratch path so the checkout is never touched.
+OUTPUT="${1:-styles/tailwind.css}"
 
 mkdir -p "$CACHE_DIR"
 
@@ -29,7 +31,7 @@ cd "$ROOT"
 "$BINARY" \
   --config tailwind.config.cjs \
   --input styles/tailwind-input.css \
-  --output styles/tailwind.css \
+  --output "$OUTPUT" \
   --minify
 
-printf 'Built %s\n' "$ROOT/styles/tailwind.css"
+printf 'Built %s\n' "$OUTPUT"
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""Wall time, file I/O and memory profiling for ``build_site.py --profile``.
+
+A profile is a tree of spans: one per build step plus one per call to each
+instrumented function inside it. Every span records its wall time, the files
+and bytes read and written while it was open, and the tracemalloc peak above
+the memory in use when it started. The result is written as Chrome
+trace-event JSON (open it in ``chrome://tracing`` or https://ui.perfetto.dev)
+and as a plain-text summary table.
+
+Instrumentation is installed only while a profile is recording, so ordinary
+builds run the generators untouched.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Iterator
+
+from site_output import SiteOutput
+
+
+@dataclass
+class Span:
+    name: str
+    category: str
+    start: float
+    args: dict[str, object] = field(default_factory=dict)
+    duration: float = 0.0
+    files_read: int = 0
+    bytes_read: int = 0
+    files_written: int = 0
+    bytes_written: int = 0
+    memory_base: int = 0
+    memory_peak: int = 0
+
+
+@dataclass
+class Totals:
+    calls: int = 0
+    seconds: float = 0.0
+    files_read: int = 0
+    bytes_read: int = 0
+    files_written: int = 0
+    bytes_written: int = 0
+    memory_peak: int = 0
+
+
+class Profiler:
+    """Record nested spans and the I/O that happens inside them."""
+
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+        self.stack: list[Span] = []
+        self.origin = time.perf_counter()
+        self._restore: list[tuple[object, str, object]] = []
+
+    @contextmanager
+    def span(self, name: str, category: str = "step", **args: object) -> Iterator[Span]:
+        current, peak = tracemalloc.get_traced_memory()
+        if self.stack:
+            self.stack[-1].memory_peak = max(self.stack[-1].memory_peak, peak)
+        tracemalloc.reset_peak()
+        span = Span(name, category, time.perf_counter(), args, memory_base=current, memory_peak=current)
+        self.stack.append(span)
+        try:
+            yield span
+        finally:
+            span.duration = time.perf_counter() - span.start
+            _, peak = tracemalloc.get_traced_memory()
+            span.memory_peak = max(span.memory_peak, peak)
+            tracemalloc.reset_peak()
+            self.stack.pop()
+            if self.stack:
+                self.stack[-1].memory_peak = max(self.stack[-1].memory_peak, span.memory_peak)
+            self.spans.append(span)
+
+    def count_read(self, size: int) -> None:
+        for span in self.stack:
+            span.files_read += 1
+            span.bytes_read += size
+
+    def count_write(self, size: int) -> None:
+        for span in self.stack:
+            span.files_written += 1
+            span.bytes_written += size
+
+    def patch(self, owner: object, name: str, replacement: object) -> None:
+        self._restore.append((owner, name, owner.__dict__[name] if isinstance(owner, type) else getattr(owner, name)))
+        setattr(owner, name, replacement)
+
+    def instrument(self, module: object, name: str, label: Callable[..., dict[str, object]] | None = None) -> None:
+        """Record a span for every call to ``module.name``."""
+
+        original = getattr(module, name)
+        span_name = f"{module.__name__}.{name}"  # type: ignore[attr-defined]
+
+        @wraps(original)
+        def traced(*args: object, **kwargs: object) -> object:
+            with self.span(span_name, "function", **(label(*args, **kwargs) if label else {})):
+                return original(*args, **kwargs)
+
+        self.patch(module, name, traced)
+
+    def install_io_counters(self) -> None:
+        """Count file reads at ``Path`` and generated files that actually changed at ``SiteOutput``."""
+
+        profiler = self
+        read_bytes, read_text = Path.read_bytes, Path.read_text
+
+        def counted_read_bytes(path: Path) -> bytes:
+            data = read_bytes(path)
+            profiler.count_read(len(data))
+            return data
+
+        def counted_read_text(path: Path, *args: object, **kwargs: object) -> str:
+            text = read_text(path, *args, **kwargs)
+            profiler.count_read(len(text.encode("utf-8", errors="surrogateescape")))
+            return text
+
+        self.patch(Path, "read_bytes", counted_read_bytes)
+        self.patch(Path, "read_text", counted_read_text)
+        write_bytes = SiteOutput.write_bytes
+
+        def counted_write_bytes(output: SiteOutput, path: Path, data: bytes) -> bool:
+            changed = write_bytes(output, path, data)
+            if changed:
+                profiler.count_write(len(data))
+            return changed
+
+        self.patch(SiteOutput, "write_bytes", counted_write_bytes)
+
+    def start(self) -> None:
+        tracemalloc.start()
+        self.origin = time.perf_counter()
+
+    def stop(self) -> None:
+        for owner, name, original in reversed(self._restore):
+            setattr(owner, name, original)
+        self._restore.clear()
+        tracemalloc.stop()
+
+    def totals(self) -> dict[str, Totals]:
+        """Aggregate spans by name, steps first, in the order they finished."""
+
+        totals: dict[str, Totals] = {}
+        for span in sorted(self.spans, key=lambda span: span.category != "step"):
+            entry = totals.setdefault(span.name, Totals())
+            entry.calls += 1
+            entry.seconds += span.duration
+            entry.files_read += span.files_read
+            entry.bytes_read += span.bytes_read
+            entry.files_written += span.files_written
+            entry.bytes_written += span.bytes_written
+            entry.memory_peak = max(entry.memory_peak, span.memory_peak - span.memory_base)
+        return totals
+
+    def trace_events(self) -> dict[str, object]:
+        pid = os.getpid()
+        events = [
+            {
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": round((span.start - self.origin) * 1_000_000, 3),
+                "dur": round(span.duration * 1_000_000, 3),
+                "pid": pid,
+                "tid": 1,
+                "args": {
+                    **span.args,
+                    "files_read": span.files_read,
+                    "bytes_read": span.bytes_read,
+                    "files_written": span.files_written,
+                    "bytes_written": span.bytes_written,
+                    "memory_peak_bytes": span.memory_peak - span.memory_base,
+                },
+            }
+            for span in sorted(self.spans, key=lambda span: span.start)
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def summary(self) -> str:
+        header = ("span", "calls", "wall ms", "read", "read KiB", "written", "written KiB", "peak KiB")
+        rows = [header] + [
+            (
+                name,
+                str(entry.calls),
+                f"{entry.seconds * 1000:.1f}",
+                str(entry.files_read),
+                f"{entry.bytes_read / 1024:.1f}",
+                str(entry.files_written),
+                f"{entry.bytes_written / 1024:.1f}",
+                f"{entry.memory_peak / 1024:.1f}",
+            )
+            for name, entry in self.totals().items()
+        ]
+        widths = [max(len(row[index]) for row in rows) for index in range(len(header))]
+        lines = [
+            "  ".join(cell.ljust(width) if index == 0 else cell.rjust(width) for index, (cell, width) in enumerate(zip(row, widths)))
+            for row in rows
+        ]
+        lines.insert(1, "  ".join("-" * width for width in widths))
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Path) -> Path:
+        """Write the trace JSON to ``path`` and the summary beside it; return the summary path."""
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.trace_events(), indent=1) + "\n", encoding="utf-8")
+        summary_path = path.with_suffix(".txt")
+        summary_path.write_text(self.summary(), encoding="utf-8")
+        return summary_path
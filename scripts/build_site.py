@@ -4,107 +4,625 @@
 from __future__ import annotations
 
 import argparse
-import json
+import hashlib
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Callable
+
+from build_cache import CACHE_DIR_NAME, BuildCache, changed_since, digests, file_digest
+from build_profile import Profiler
+from content import BargainingManifest, EventCalendar, NewsArticle, read_bargaining, read_events, read_news
+import generate_bargaining_news
+import generate_content_api
+import generate_rss
+import generate_search_index
+import generate_short_redirects
+import generate_sitemap
+import generate_static_content
+import image_manifest
+import sync_site_shell
+from public_pages import PageCorpus, PublicPage, discover_public_pages
+from site_preview import FileWatcher, PreviewServer
+from site_output import OverlayOutput, SiteOutput
 
 
 ROOT = Path(__file__).resolve().parents[1]
 
 
-def bargaining_news_paths(root: Path = ROOT) -> list[str]:
-    manifest = root / "data" / "higher-ed-bargaining-updates.json"
-    if not manifest.is_file():
-        return []
-    data = json.loads(manifest.read_text(encoding="utf-8"))
-    return [
-        article["url"].lstrip("/")
-        for update in data["updates"]
-        for article in update["languages"].values()
-    ]
+@dataclass
+class BuildContext:
+    """Source data loaded once and shared by every in-process build step.
+
+    Sources are read through the content cache. Steps must treat the loaded
+    content as read-only and write through ``output``. Public pages are
+    discovered, and read into ``corpus``, on first use, which the step order
+    guarantees is after every generator that creates pages.
+    """
+
+    root: Path
+    output: SiteOutput = None  # type: ignore[assignment]
+    corpus: PageCorpus = field(default=None, repr=False)  # type: ignore[assignment]
+    jobs: int = 1
+    _content: dict[str, object] = field(default_factory=dict, repr=False)
+    _pages: list[PublicPage] | None = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.output is None:
+            self.output = SiteOutput(self.root)
+        if self.corpus is None:
+            self.corpus = PageCorpus(self.root, output=self.output)
+
+    def content(self, name: str, read: Callable[[Path], object]) -> object:
+        if name not in self._content:
+            self._content[name] = read(self.root)
+        return self._content[name]
+
+    @property
+    def persist(self) -> bool:
+        """Whether caches under ``.build-cache`` may be written; a check build's overlay leaves them alone."""
+
+        return self.output.in_place
+
+    @property
+    def articles(self) -> list[NewsArticle]:
+        return self.content("news", lambda root: read_news(root, persist=self.persist))  # type: ignore[return-value]
+
+    @property
+    def news(self) -> list[dict]:
+        """The ``news/news.json`` entries as loaded, for steps that need the raw JSON."""
+
+        return self.content("news entries", lambda root: [article.data for article in self.articles])  # type: ignore[return-value]
+
+    @property
+    def calendar(self) -> EventCalendar:
+        return self.content("events", lambda root: read_events(root, persist=self.persist))  # type: ignore[return-value]
+
+    @property
+    def bargaining(self) -> BargainingManifest:
+        return self.content("bargaining", lambda root: read_bargaining(root, persist=self.persist))  # type: ignore[return-value]
+
+    @property
+    def images(self) -> image_manifest.ImageManifest:
+        """Sizes and variants of everything under ``images/``, scanned once per build."""
+
+        return self.content("images", lambda root: image_manifest.scan(root, persist=self.persist))  # type: ignore[return-value]
+
+    def public_pages(self) -> list[PublicPage]:
+        if self._pages is None:
+            self._pages = discover_public_pages(self.root, include_404=True, corpus=self.corpus)
+        return self._pages
+
+    def preload(self) -> None:
+        """Parse the sources now so worker processes receive them ready-made.
+
+        A missing or malformed source is left for the step that needs it to report.
+        """
+
+        for load in (lambda: self.articles, lambda: self.calendar, lambda: self.bargaining, lambda: self.images):
+            try:
+                load()
+            except (OSError, ValueError):
+                pass
+
+
+class BuildStepError(Exception):
+    """A build step failed; the message names the step and the problem."""
+
+
+@dataclass(frozen=True)
+class Step:
+    """One build step and the files whose content determines its output.
+
+    ``inputs`` are glob patterns relative to the site root. Steps that read
+    every public page set ``page_inputs`` instead of globbing HTML, so drafts
+    and excluded directories never trigger a rebuild. ``after`` names the
+    steps whose outputs this step reads; steps with no path between them may
+    run at the same time.
+    """
+
+    name: str
+    action: Callable[[BuildContext], list[Path] | None]
+    inputs: tuple[str, ...] = ()
+    page_inputs: bool = False
+    after: tuple[str, ...] = ()
+
+
+# Every step depends on the pipeline wiring itself.
+BUILD_INPUTS = ("scripts/build_site.py", "scripts/build_cache.py")
+
+
+def report(paths: list[Path], output: SiteOutput) -> None:
+    for path in paths:
+        if path not in output.unchanged:
+            print(f"Wrote {output.relative(path)}")
+
+
+def bargaining_news_step(context: BuildContext) -> list[Path]:
+    written = generate_bargaining_news.build(
+        root=context.root,
+        manifest=context.bargaining,
+        news_index=context.news,
+        output=context.output,
+        images=context.images,
+    )
+    report(written, context.output)
+    return written
+
+
+def static_content_step(context: BuildContext) -> list[Path]:
+    fragments = generate_static_content.load_fragments(context.root)
+    written = generate_static_content.build(
+        context.root,
+        articles=context.articles,
+        event_calendar=context.calendar,
+        output=context.output,
+        fragments=fragments,
+        images=context.images,
+    )
+    if context.persist:
+        fragments.save()
+    report(written, context.output)
+    return written
+
+
+def rss_step(context: BuildContext) -> list[Path]:
+    written = generate_rss.generate(
+        context.root,
+        articles=context.articles,
+        event_calendar=context.calendar,
+        output=context.output,
+    )
+    report(written, context.output)
+    return written
+
+
+def content_api_step(context: BuildContext) -> list[Path]:
+    written = generate_content_api.build(
+        context.root,
+        articles=context.articles,
+        event_calendar=context.calendar,
+        output=context.output,
+        images=context.images,
+    )
+    report(written, context.output)
+    return written
+
+
+def short_redirects_step(context: BuildContext) -> list[Path]:
+    entries = generate_short_redirects.load_manifest(context.root / "data" / "short-urls.json")
+    outputs = generate_short_redirects.generate(context.root, entries, context.output)
+    print(f"Generated {len(outputs)} short URL redirect page(s).")
+    return outputs
+
+
+def sitemap_step(context: BuildContext) -> list[Path]:
+    written = generate_sitemap.generate(context.root, context.public_pages(), context.output, context.corpus)
+    report(written, context.output)
+    return [*written, context.root / "robots.txt"]
+
+
+def site_shell_step(context: BuildContext) -> list[Path]:
+    changed, errors = sync_site_shell.synchronize(
+        context.root,
+        check=False,
+        pages=context.public_pages(),
+        output=context.output,
+        corpus=context.corpus,
+        jobs=context.jobs,
+    )
+    print(f"Site shell updated {len(changed)} public page(s).")
+    if errors:
+        raise BuildStepError("\n".join(f"ERROR: {error}" for error in errors))
+    return changed
+
+
+def search_index_step(context: BuildContext) -> list[Path]:
+    written = generate_search_index.build(
+        context.root,
+        pages=context.public_pages(),
+        corpus=context.corpus,
+        output=context.output,
+    )
+    changed = [path for path in written if path not in context.output.unchanged]
+    print(f"Search index: {len(changed)} of {len(written)} file(s) changed.")
+    return written
 
 
-GENERATED_PATHS = [
-    "index.html",
-    "news.html",
-    "events.html",
-    "feed.xml",
-    "news/rss.xml",
-    "events/rss.xml",
-    "sitemap.xml",
-    "robots.txt",
-    "styles/tailwind.css",
-    "actions/index.html",
-    "pledge/index.html",
-    "strikeprep/index.html",
-    "strikepay/index.html",
-    "strikehelp/index.html",
-] + bargaining_news_paths()
-
-
-def run(command: list[str]) -> None:
-    print(f"+ {' '.join(command)}", flush=True)
-    subprocess.run(command, cwd=ROOT, check=True)
-
-
-def snapshot(paths: list[str]) -> dict[str, bytes | None]:
-    return {
-        path: (ROOT / path).read_bytes() if (ROOT / path).exists() else None
-        for path in paths
+def css_step(context: BuildContext) -> list[Path]:
+    path = context.root / "styles" / "tailwind.css"
+    if context.output.in_place:
+        subprocess.run(["bash", "scripts/build_css.sh"], cwd=context.root, check=True)
+        return [path]
+    # Tailwind writes a file itself, so compile to scratch and copy it into
+    # the overlay. It scans the committed HTML; drift in generated pages is
+    # reported by the page comparison either way.
+    with tempfile.TemporaryDirectory() as scratch:
+        compiled = Path(scratch) / "tailwind.css"
+        subprocess.run(["bash", "scripts/build_css.sh", str(compiled)], cwd=context.root, check=True)
+        context.output.write_bytes(path, compiled.read_bytes())
+    return [path]
+
+
+PAGE_GENERATORS = ("bargaining news", "static content", "short redirects")
+# Steps that size and pick image variants read every image and the scanner.
+# The build cache keys images on size and mtime (build_cache.STAMPED_DIRS).
+IMAGE_INPUTS = ("images/**/*", "scripts/image_manifest.py")
+# The shell's feed links come from the feed definitions in generate_rss.py.
+SHELL_INPUTS = ("scripts/sync_site_shell.py", "scripts/generate_rss.py")
+
+STEPS = [
+    Step(
+        "bargaining news",
+        bargaining_news_step,
+        (
+            "data/higher-ed-bargaining-updates.json",
+            "news/news.json",
+            "scripts/generate_bargaining_news.py",
+            *SHELL_INPUTS,
+            "scripts/content.py",
+            *IMAGE_INPUTS,
+        ),
+    ),
+    Step(
+        "static content",
+        static_content_step,
+        (
+            "news/news.json",
+            "events/events.json",
+            "index.html",
+            "news.html",
+            "events.html",
+            "scripts/generate_static_content.py",
+            "scripts/site_templates.py",
+            "scripts/content.py",
+            *IMAGE_INPUTS,
+        ),
+    ),
+    Step("rss", rss_step, ("news/news.json", "events/events.json", "scripts/generate_rss.py", "scripts/site_templates.py", "scripts/content.py")),
+    Step(
+        "content api",
+        content_api_step,
+        (
+            "news/news.json",
+            "events/events.json",
+            "scripts/generate_content_api.py",
+            "scripts/generate_static_content.py",
+            "scripts/content.py",
+            *IMAGE_INPUTS,
+        ),
+    ),
+    Step(
+        "short redirects",
+        short_redirects_step,
+        ("data/short-urls.json", "scripts/generate_short_redirects.py", *SHELL_INPUTS),
+    ),
+    Step(
+        "site shell",
+        site_shell_step,
+        (*SHELL_INPUTS, "scripts/public_pages.py"),
+        page_inputs=True,
+        after=PAGE_GENERATORS,
+    ),
+    # The sitemap reads the same pages the shell rewrites; waiting for the shell
+    # keeps the page hashes it records stable.
+    Step(
+        "sitemap",
+        sitemap_step,
+        ("robots.txt", "scripts/generate_sitemap.py", "scripts/public_pages.py", "scripts/lcp_image_audit.py", *SHELL_INPUTS),
+        page_inputs=True,
+        after=(*PAGE_GENERATORS, "site shell"),
+    ),
+    # The index holds each page's text as the shell leaves it.
+    Step(
+        "search index",
+        search_index_step,
+        ("scripts/generate_search_index.py", "scripts/public_pages.py", *SHELL_INPUTS),
+        page_inputs=True,
+        after=(*PAGE_GENERATORS, "site shell"),
+    ),
+    # Tailwind scans every HTML file for class names, including generated pages.
+    Step(
+        "css",
+        css_step,
+        ("**/*.html", "js/**/*.js", "styles/tailwind-input.css", "tailwind.config.cjs", "scripts/build_css.sh"),
+        after=(*PAGE_GENERATORS, "site shell"),
+    ),
+]
+
+
+# Hot paths that get their own spans under --profile, with a function that
+# turns the call's arguments into trace labels.
+PROFILED_FUNCTIONS: tuple[tuple[object, str, Callable[..., dict[str, object]] | None], ...] = (
+    (generate_static_content, "splice_regions", lambda source, elements=None, **_: {"elements": len(elements or ())}),
+    (generate_rss, "build_feed", lambda items=(), **_: {"items": len(items)}),
+    (sync_site_shell, "sync_source", lambda source, relative_path: {"page": relative_path}),
+)
+
+
+def step_inputs(step: Step, context: BuildContext) -> list[str]:
+    root = context.root
+    paths = {
+        path.relative_to(root).as_posix()
+        for pattern in step.inputs
+        for path in root.glob(pattern)
+        if path.is_file()
     }
+    # Missing literal inputs still count, so creating them invalidates the step.
+    paths.update(pattern for pattern in step.inputs if not any(char in pattern for char in "*?["))
+    if step.inputs:
+        paths.update(BUILD_INPUTS)
+    if step.page_inputs:
+        paths.update(page.path.relative_to(root).as_posix() for page in context.public_pages())
+    return sorted(paths)
 
 
-def restore(files: dict[str, bytes | None]) -> None:
-    for relative, content in files.items():
-        path = ROOT / relative
-        if content is None:
-            path.unlink(missing_ok=True)
-        else:
-            path.write_bytes(content)
+def execute(step: Step, context: BuildContext) -> list[Path]:
+    """Run one step, in this process or a pool worker, naming it in any failure."""
+
+    try:
+        return list(step.action(context) or [])
+    except subprocess.CalledProcessError:
+        raise
+    except Exception as error:
+        raise BuildStepError(f"{step.name}: {error}") from error
+
+
+def execute_in_worker(step: Step, context: BuildContext) -> tuple[list[Path], SiteOutput]:
+    """Run a step in a pool worker and return its outputs with the worker's write counts.
+
+    The worker writes through a copy of the output, so its counts have to
+    travel back to the parent explicitly.
+    """
+
+    context.output.reset_counts()
+    return execute(step, context), context.output
+
+
+def is_stale(
+    step: Step,
+    context: BuildContext,
+    cache: BuildCache | None,
+    changed: set[str] | None,
+    written: set[str],
+) -> bool:
+    inputs = step_inputs(step, context)
+    if changed is not None:
+        return bool(set(inputs) & (changed | written))
+    if cache is not None:
+        return not cache.is_current(step.name, digests(context.root, inputs), context.root)
+    return True
+
+
+def run(
+    steps: list[Step],
+    context: BuildContext,
+    *,
+    cache: BuildCache | None = None,
+    changed: set[str] | None = None,
+    jobs: int = 1,
+    profiler: Profiler | None = None,
+) -> list[str]:
+    """Run steps in dependency order and return the names of the steps that ran.
+
+    With ``changed`` (from ``--since``), a step runs when one of its inputs is
+    in that set or was written by an earlier step. Otherwise, with a cache, a
+    step runs when an input or recorded output hash differs from the last
+    build. With neither, every step runs.
+
+    With ``jobs`` above one, steps whose dependencies have finished run
+    concurrently in a process pool. The first failure cancels every step that
+    has not started and is re-raised once running steps have stopped.
+
+    A ``profiler`` records a span around each step; profiled builds run
+    serially so every span is measured in this process.
+    """
+
+    known = {step.name for step in steps}
+    waiting = list(steps)
+    finished: set[str] = set()
+    written: set[str] = set()
+    ran: list[str] = []
+    running: dict[Future[tuple[list[Path], SiteOutput]], Step] = {}
+    executor = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 and profiler is None else None
+    if executor is not None:
+        context.preload()
+
+    def finish(step: Step, outputs: list[Path]) -> None:
+        relative = sorted({path.relative_to(context.root).as_posix() for path in outputs})
+        written.update(relative)
+        ran.append(step.name)
+        if cache is not None:
+            cache.record(step.name, digests(context.root, step_inputs(step, context)), digests(context.root, relative))
+        finished.add(step.name)
+
+    try:
+        while waiting or running:
+            ready = [step for step in waiting if all(name in finished or name not in known for name in step.after)]
+            if not ready and not running:
+                raise BuildStepError("build steps have circular dependencies: " + ", ".join(step.name for step in waiting))
+            for step in ready:
+                waiting.remove(step)
+                if not is_stale(step, context, cache, changed, written):
+                    print(f"= {step.name} (inputs unchanged)", flush=True)
+                    finished.add(step.name)
+                    continue
+                print(f"+ {step.name}", flush=True)
+                if executor is None:
+                    with profiler.span(step.name) if profiler else nullcontext():
+                        outputs = execute(step, context)
+                    finish(step, outputs)
+                else:
+                    running[executor.submit(execute_in_worker, step, context)] = step
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                step = running.pop(future)
+                outputs, worker_output = future.result()
+                context.output.merge(worker_output)
+                finish(step, outputs)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+    return ran
+
+
+def drift(output: OverlayOutput, root: Path) -> list[str]:
+    """Compare a check overlay's output hashes with the committed files, and list the files it would delete."""
+
+    changed = [
+        relative
+        for relative, data in output.written().items()
+        if hashlib.sha256(data).hexdigest() != file_digest(root / relative)
+    ]
+    return sorted([*changed, *output.deleted_paths()])
+
+
+def watched_paths(steps: list[Step], root: Path) -> list[str]:
+    """Return every input of every step: the files whose edits trigger a rebuild."""
+
+    context = BuildContext(root)
+    return sorted({relative for step in steps for relative in step_inputs(step, context)})
+
+
+def preview(
+    steps: list[Step],
+    *,
+    cache: BuildCache | None,
+    jobs: int,
+    watch: bool,
+    serve: bool,
+    port: int,
+    polling: bool,
+) -> int:
+    """Serve the site and/or rebuild the steps affected by each saved change until interrupted."""
+
+    server = PreviewServer(ROOT, port, live_reload=watch) if serve else None
+    if server is not None:
+        threading.Thread(target=server.serve_forever, name="preview-server", daemon=True).start()
+        print(f"Serving {ROOT} at {server.url}")
+    watcher = FileWatcher(ROOT, lambda: watched_paths(steps, ROOT), polling=polling) if watch else None
+    if watcher is not None:
+        print(f"Watching {len(watcher.signatures)} file(s) for changes ({watcher.mode}). Press Ctrl+C to stop.")
+    try:
+        if watcher is None:
+            threading.Event().wait()
+        while watcher is not None:
+            changed = watcher.wait()
+            started = time.perf_counter()
+            print(f"Changed: {', '.join(sorted(changed))}", flush=True)
+            output = SiteOutput(ROOT)
+            try:
+                ran = run(steps, BuildContext(ROOT, output, jobs=jobs), cache=cache, changed=changed, jobs=jobs)
+            except subprocess.CalledProcessError as error:
+                print(f"Rebuild failed because a build step failed ({error.returncode}); still watching.", file=sys.stderr)
+                continue
+            except BuildStepError as error:
+                print(f"Rebuild failed: {error}; still watching.", file=sys.stderr)
+                continue
+            finally:
+                # Our own writes are not edits; new pages become watch targets.
+                watcher.absorb(output.updated)
+                watcher.retarget()
+            if cache is not None:
+                cache.save()
+            if server is not None:
+                server.notify_reload()
+            written, skipped = output.counts()
+            elapsed = (time.perf_counter() - started) * 1000
+            print(f"Rebuilt {len(ran)} step(s) in {elapsed:.0f} ms: {written} file(s) written, {skipped} unchanged.", flush=True)
+    except KeyboardInterrupt:
+        print("Stopped.")
+    finally:
+        if watcher is not None:
+            watcher.close()
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+    return 0
 
 
 def main() -> int:
     parser = argparse.ArgumentParser(description=__doc__)
-    parser.add_argument("--check", action="store_true", help="Fail if rebuilding changes a generated file, then restore it.")
+    parser.add_argument("--check", action="store_true", help="Fail if rebuilding would change a generated file. The working tree is never modified.")
     parser.add_argument("--skip-css", action="store_true", help="Skip Tailwind compilation (intended for focused generator tests).")
+    parser.add_argument("--force", action="store_true", help="Rebuild every step even when the build cache says its inputs are unchanged.")
+    parser.add_argument("--since", metavar="GIT_REF", help="Rebuild only steps whose inputs differ from GIT_REF (plus steps downstream of them).")
+    parser.add_argument("--jobs", type=int, default=1, metavar="N", help="Run up to N independent steps at once in worker processes (default: 1).")
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=str(ROOT / CACHE_DIR_NAME / "build-profile.json"),
+        metavar="PATH",
+        help="Write a Chrome trace of step and sub-stage timings, I/O and peak memory to PATH (default: .build-cache/build-profile.json) "
+        "and a summary table beside it. Implies --jobs 1; combine with --force to profile every step.",
+    )
+    parser.add_argument("--watch", action="store_true", help="After building, rebuild the affected steps whenever a source, script or page changes.")
+    parser.add_argument("--serve", action="store_true", help="Serve the site locally; with --watch, open pages reload after each rebuild.")
+    parser.add_argument("--port", type=int, default=8000, help="Port for --serve (default: 8000).")
+    parser.add_argument("--poll", action="store_true", help="With --watch, poll file mtimes instead of using inotify.")
     args = parser.parse_args()
+    if args.check and (args.watch or args.serve):
+        parser.error("--check cannot be combined with --watch or --serve")
 
-    paths = [path for path in GENERATED_PATHS if not args.skip_css or path != "styles/tailwind.css"]
-    before = snapshot(paths) if args.check else {}
-
-    try:
-        run(["python3", "scripts/generate_bargaining_news.py"])
-        run(["python3", "scripts/generate_static_content.py"])
-        run(["python3", "scripts/generate_rss.py"])
-        run(["python3", "scripts/generate_sitemap.py"])
-        run(["python3", "scripts/generate_short_redirects.py"])
-        shell_command = ["python3", "scripts/sync_site_shell.py"]
-        if args.check:
-            shell_command.append("--check")
-        run(shell_command)
-        if not args.skip_css:
-            run(["bash", "scripts/build_css.sh"])
-    except subprocess.CalledProcessError as error:
-        if args.check:
-            restore(before)
-        print(f"Site build stopped because a build step failed ({error.returncode}).", file=sys.stderr)
-        return error.returncode or 1
-    except BaseException:
+    jobs = max(1, args.jobs)
+    steps = [step for step in STEPS if not args.skip_css or step.name != "css"]
+    # --check always rebuilds from scratch: CI has no cache, and a stale local
+    # cache must never hide drift.
+    cache = None if args.check or args.force else BuildCache.load(ROOT / CACHE_DIR_NAME / "build-steps.json")
+    with tempfile.TemporaryDirectory(prefix="local083-check-") as scratch:
+        # Pool workers cannot see each other's memory, so a parallel check
+        # shares a temporary directory instead.
         if args.check:
-            restore(before)
-        raise
-    if args.check:
-        after = snapshot(paths)
-        changed = [path for path in paths if before[path] != after[path]]
-        restore(before)
-        if changed:
-            print("Generated site files are out of date:", file=sys.stderr)
-            for path in changed:
-                print(f"- {path}", file=sys.stderr)
-            print("Run `python3 scripts/build_site.py` and commit the results.", file=sys.stderr)
+            output: SiteOutput = OverlayOutput(ROOT, Path(scratch) if jobs > 1 else None)
+        else:
+            output = SiteOutput(ROOT)
+        profiler = Profiler() if args.profile else None
+        try:
+            changed = changed_since(ROOT, args.since) if args.since and not args.check else None
+            if profiler is not None:
+                profiler.install_io_counters()
+                for module, name, label in PROFILED_FUNCTIONS:
+                    profiler.instrument(module, name, label)
+                profiler.start()
+            # Profiled builds sync pages in this process too, so each gets a span.
+            context = BuildContext(ROOT, output, jobs=1 if profiler else jobs)
+            run(steps, context, cache=cache, changed=changed, jobs=jobs, profiler=profiler)
+        except subprocess.CalledProcessError as error:
+            print(f"Site build stopped because a build step failed ({error.returncode}).", file=sys.stderr)
+            return error.returncode or 1
+        except BuildStepError as error:
+            print(f"Site build stopped because a build step failed: {error}", file=sys.stderr)
             return 1
-    print("Site build complete.")
+        finally:
+            if profiler is not None:
+                profiler.stop()
+        if profiler is not None:
+            summary_path = profiler.write(Path(args.profile))
+            print(profiler.summary(), end="")
+            print(f"Wrote build profile to {args.profile} and {summary_path}")
+        if cache is not None:
+            cache.save()
+        if isinstance(output, OverlayOutput):
+            changed_paths = drift(output, ROOT)
+            if changed_paths:
+                print("Generated site files are out of date:", file=sys.stderr)
+                for path in changed_paths:
+                    print(f"- {path}", file=sys.stderr)
+                print("Run `python3 scripts/build_site.py` and commit the results.", file=sys.stderr)
+                return 1
+    written, skipped = output.counts()
+    verb = "would change" if args.check else "written"
+    print(f"Site build complete: {written} file(s) {verb}, {skipped} unchanged.")
+    if args.watch or args.serve:
+        return preview(steps, cache=cache, jobs=jobs, watch=args.watch, serve=args.serve, port=args.port, polling=args.poll)
     return 0
 
 
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""Typed news, event and bargaining-update records, parsed once at load time.
+
+The generators used to pass the raw JSON dicts around and re-parse the same
+date strings in every sort key and template. These records parse and
+normalise dates, tags and URLs once; each keeps its source mapping as
+``data`` for the places that must echo the JSON back unchanged, such as the
+committed fallback arrays.
+
+Loading is lenient: a date that does not parse becomes ``None`` so
+``site_quality_check`` can report it. Generators skip or reject such records
+where they need the value.
+
+The ``read_*`` functions load a source through a pickle cache under
+``.build-cache/content`` keyed by the source's hash, so repeated generator
+runs on unchanged content skip JSON decoding and parsing.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import pickle
+import re
+import tempfile
+import unicodedata
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterable, Mapping, TypeVar
+from zoneinfo import ZoneInfo
+
+
+# Bump when the records change shape, so pickles of the old shape are ignored.
+CONTENT_SCHEMA_VERSION = 1
+CONTENT_CACHE = Path(".build-cache") / "content"
+OREGON_TZ = ZoneInfo("America/Los_Angeles")
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+DAY_RE = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})")
+
+T = TypeVar("T")
+
+
+def parse_day(value: object) -> date | None:
+    """Parse an editorial ``YYYY-MM-DD`` date; anything else is ``None``.
+
+    Accepts what ``strptime(value, "%Y-%m-%d")`` accepts, several times faster.
+    """
+
+    match = DAY_RE.fullmatch(value) if isinstance(value, str) else None
+    if match is None:
+        return None
+    try:
+        return date(*map(int, match.groups()))
+    except ValueError:
+        return None
+
+
+def oregon_midnight(day: date) -> datetime:
+    """Editorial dates are Oregon dates. Treating date-only values as UTC would
+    expose scheduled stories at 4 or 5 p.m. Pacific the day before."""
+
+    return datetime(day.year, day.month, day.day, tzinfo=OREGON_TZ).astimezone(timezone.utc)
+
+
+def parse_instant(value: object, day: date | None = None) -> datetime | None:
+    """Parse a date or ISO timestamp into a UTC instant.
+
+    ``day`` is ``parse_day(value)`` when the caller already has it.
+    """
+
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip()
+    if len(value) == 10:
+        day = day or parse_day(value)
+        return oregon_midnight(day) if day else None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=OREGON_TZ)
+    return parsed.astimezone(timezone.utc)
+
+
+def text(value: object) -> str:
+    return value if isinstance(value, str) else ""
+
+
+def normalize_url(value: object) -> str:
+    return text(value).strip()
+
+
+def normalize_tags(value: object) -> tuple[str, ...]:
+    """Return the stripped, non-empty string tags in order, without repeats."""
+
+    if not isinstance(value, list):
+        return ()
+    return tuple(dict.fromkeys(tag.strip() for tag in value if isinstance(tag, str) and tag.strip()))
+
+
+def tag_slug(tag: str) -> str:
+    """Return the ASCII, hyphenated name a tag's API shard and feeds are published under.
+
+    A tag with no ASCII letters or digits is named after a hash of itself.
+    """
+
+    ascii_tag = unicodedata.normalize("NFKD", tag).encode("ascii", "ignore").decode("ascii")
+    slug = re.sub(r"[^a-z0-9]+", "-", ascii_tag.lower()).strip("-")
+    return slug or "tag-" + hashlib.sha256(tag.encode("utf-8")).hexdigest()[:8]
+
+
+def group_by_tag(items: Iterable[T], tags: Callable[[T], Iterable[str]]) -> dict[str, tuple[str, list[T]]]:
+    """Return ``(label, items)`` by tag slug, ordered by label.
+
+    Tags that share a slug, such as "Español" and "Espanol", form one group
+    labelled with the first spelling in case-insensitive order. An item
+    carrying both spellings is listed once.
+    """
+
+    spellings: dict[str, set[str]] = {}
+    members: dict[str, list[T]] = {}
+    for item in items:
+        slugs = set()
+        for tag in tags(item):
+            slug = tag_slug(tag)
+            spellings.setdefault(slug, set()).add(tag)
+            if slug not in slugs:
+                slugs.add(slug)
+                members.setdefault(slug, []).append(item)
+    labels = {slug: min(names, key=lambda name: (name.casefold(), name)) for slug, names in spellings.items()}
+    ordered = sorted(labels, key=lambda slug: (labels[slug].casefold(), labels[slug]))
+    return {slug: (labels[slug], members[slug]) for slug in ordered}
+
+
+def record_digest(data: Mapping[str, object]) -> str:
+    return hashlib.sha256(pickle.dumps(data, protocol=5)).hexdigest()
+
+
+@dataclass(frozen=True, slots=True)
+class NewsArticle:
+    """One ``news/news.json`` entry.
+
+    ``status`` defaults to ``published`` when missing or blank. The
+    ``*_on`` dates are set only for the ``YYYY-MM-DD`` form the site uses;
+    ``published_at`` also accepts ISO timestamps.
+    """
+
+    title: str
+    description: str
+    url: str
+    image: str
+    alt: str
+    tags: tuple[str, ...]
+    author: str
+    status: str
+    published: str
+    published_on: date | None
+    published_at: datetime | None
+    created_on: date | None
+    created_at: datetime | None
+    updated_on: date | None
+    featured: bool
+    language: str
+    data: dict = field(repr=False, compare=False)
+    digest: str = field(repr=False, compare=False)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> NewsArticle:
+        status = data.get("status")
+        author = data.get("author")
+        published_on = parse_day(data.get("publishedAt"))
+        created_on = parse_day(data.get("createdAt"))
+        return cls(
+            title=text(data.get("title")),
+            description=text(data.get("description")),
+            url=normalize_url(data.get("url")),
+            image=normalize_url(data.get("image")),
+            alt=text(data.get("alt")),
+            tags=normalize_tags(data.get("tags")),
+            author=text(author.get("name")) if isinstance(author, dict) else "",
+            status=status.strip() if isinstance(status, str) and status.strip() else "published",
+            published=text(data.get("publishedAt")),
+            published_on=published_on,
+            published_at=parse_instant(data.get("publishedAt"), published_on),
+            created_on=created_on,
+            created_at=parse_instant(data.get("createdAt"), created_on),
+            updated_on=parse_day(data.get("updatedAt")),
+            featured=bool(data.get("featured")),
+            language=text(data.get("language")),
+            data=data,
+            digest=record_digest(data),
+        )
+
+    @property
+    def dated_at(self) -> datetime | None:
+        """When the story counts as published, falling back to when it was created."""
+
+        return self.published_at or self.created_at
+
+
+@dataclass(frozen=True, slots=True)
+class Event:
+    """One entry of the ``events`` array in ``events/events.json``."""
+
+    title: str
+    description: str
+    url: str
+    type: str
+    time: str
+    location: str
+    calendar_link: str
+    featured: bool
+    date_text: str
+    date: date | None
+    starts_at: datetime | None
+    data: dict = field(repr=False, compare=False)
+    digest: str = field(repr=False, compare=False)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Event:
+        day = parse_day(data.get("date"))
+        return cls(
+            title=text(data.get("title")),
+            description=text(data.get("description")),
+            url=normalize_url(data.get("url")),
+            type=text(data.get("type")),
+            time=text(data.get("time")),
+            location=text(data.get("location_detail")),
+            calendar_link=normalize_url(data.get("calendar_link")),
+            featured=bool(data.get("featured")),
+            date_text=text(data.get("date")),
+            date=day,
+            starts_at=parse_instant(data.get("date"), day),
+            data=data,
+            digest=record_digest(data),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class EventCalendar:
+    """``events/events.json``: the editorial ``asOf`` date and every event."""
+
+    as_of: date | None
+    events: tuple[Event, ...]
+    entries: list = field(repr=False, compare=False)
+
+
+@dataclass(frozen=True, slots=True)
+class BargainingUpdate:
+    """One update in ``data/higher-ed-bargaining-updates.json`` with its translations."""
+
+    date_text: str
+    date: date
+    tags: tuple[str, ...]
+    source_url: str
+    languages: Mapping[str, dict]
+    data: dict = field(repr=False, compare=False)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> BargainingUpdate:
+        parsed = parse_day(data.get("date"))
+        if parsed is None:
+            raise ValueError(f"Bargaining update date must use YYYY-MM-DD: {data.get('date')!r}")
+        return cls(
+            date_text=data["date"],
+            date=parsed,
+            tags=normalize_tags(data.get("tags")),
+            source_url=normalize_url(data.get("sourceUrl")),
+            languages=data["languages"],
+            data=data,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class BargainingManifest:
+    """``data/higher-ed-bargaining-updates.json``: the shared byline and source, and every update."""
+
+    author: Mapping[str, str]
+    source: Mapping[str, str]
+    updates: tuple[BargainingUpdate, ...]
+
+
+def load_news(items: Iterable[object]) -> list[NewsArticle]:
+    """Return a record for every object in ``news/news.json``, in file order."""
+
+    return [NewsArticle.from_dict(item) for item in items if isinstance(item, dict)]
+
+
+def load_events(payload: object) -> EventCalendar:
+    if not isinstance(payload, dict) or not isinstance(payload.get("events"), list):
+        raise ValueError("events/events.json must contain an object with an `events` array")
+    entries = payload["events"]
+    events = tuple(Event.from_dict(item) for item in entries if isinstance(item, dict))
+    return EventCalendar(parse_day(payload.get("asOf")), events, entries)
+
+
+def load_bargaining(payload: object) -> BargainingManifest:
+    if not isinstance(payload, dict):
+        raise ValueError("The bargaining manifest must be a JSON object")
+    updates = tuple(BargainingUpdate.from_dict(update) for update in payload["updates"])
+    return BargainingManifest(payload["author"], payload["source"], updates)
+
+
+@lru_cache(maxsize=None)
+def content_revision() -> str:
+    """Hash of this module, so cached records never outlive the code that parsed them."""
+
+    return hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+
+
+def read_cached(path: Path, parse: Callable[[object], T], cache_dir: Path | None, *, persist: bool = True) -> T:
+    """Return ``parse(json.loads(path))``, from a pickle under ``cache_dir`` when current.
+
+    The pickle starts with a header line naming the schema version, this
+    module's revision and the SHA-256 of the source bytes, so a warm start
+    costs one hash of the source and one unpickle: no JSON decoding or record
+    parsing. Any unreadable or stale cache is rebuilt; without ``cache_dir``
+    nothing is cached, and without ``persist`` a current cache is read but
+    never written.
+    """
+
+    source = path.read_bytes()
+    if cache_dir is None:
+        return parse(json.loads(source))
+    header = f"{CONTENT_SCHEMA_VERSION} {content_revision()} {hashlib.sha256(source).hexdigest()}\n".encode("ascii")
+    cache_path = cache_dir / f"{path.name}.{hashlib.sha256(str(path).encode('utf-8')).hexdigest()[:12]}.pickle"
+    try:
+        with cache_path.open("rb") as handle:
+            if handle.readline() == header:
+                return pickle.load(handle)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, TypeError, ValueError):
+        pass
+
+    value = parse(json.loads(source))
+    if not persist:
+        return value
+    temporary: str | None = None
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("wb", dir=cache_dir, prefix=".tmp-", delete=False) as handle:
+            temporary = handle.name
+            handle.write(header)
+            pickle.dump(value, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, cache_path)
+        temporary = None
+    except OSError:
+        pass
+    finally:
+        # A failed write, of any kind, must not leave a partial pickle behind.
+        if temporary is not None:
+            with contextlib.suppress(OSError):
+                os.unlink(temporary)
+    return value
+
+
+def read_news(root: Path, *, cache: bool = True, persist: bool = True) -> list[NewsArticle]:
+    return read_cached(root / "news" / "news.json", load_news, root / CONTENT_CACHE if cache else None, persist=persist)  # type: ignore[arg-type]
+
+
+def read_events(root: Path, *, cache: bool = True, persist: bool = True) -> EventCalendar:
+    return read_cached(root / "events" / "events.json", load_events, root / CONTENT_CACHE if cache else None, persist=persist)
+
+
+def read_bargaining(root: Path, *, cache: bool = True, persist: bool = True) -> BargainingManifest:
+    return read_cached(
+        root / "data" / "higher-ed-bargaining-updates.json", load_bargaining, root / CONTENT_CACHE if cache else None, persist=persist
+    )
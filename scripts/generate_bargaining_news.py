@@ -6,10 +6,14 @@ from __future__ import annotations
 import argparse
 import html
 import json
-from datetime import datetime
+from datetime import date
 from pathlib import Path
+from typing import Iterable
 
-from sync_site_shell import render_footer, render_header
+from content import BargainingManifest, BargainingUpdate, read_bargaining, read_news
+from image_manifest import ImageManifest, ResponsiveImage, scan as scan_images
+from site_output import SiteOutput
+from sync_site_shell import render_feed_links, render_footer, render_header
 
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -74,46 +78,63 @@ def esc(value: object) -> str:
     return html.escape(str(value or ""), quote=True)
 
 
-def display_date(value: str, language: str) -> str:
-    date = datetime.strptime(value, "%Y-%m-%d")
+def display_date(day: date, language: str) -> str:
     if language == "es":
-        return f"{date.day} de {SPANISH_MONTHS[date.month]} de {date.year}"
-    return f"{date.strftime('%B')} {date.day}, {date.year}"
+        return f"{day.day} de {SPANISH_MONTHS[day.month]} de {day.year}"
+    return f"{day.strftime('%B')} {day.day}, {day.year}"
 
 
-def entries(payload: dict) -> list[tuple[dict, str, dict, dict]]:
+def entries(updates: Iterable[BargainingUpdate]) -> list[tuple[BargainingUpdate, str, dict, dict]]:
     rows = []
-    for update in payload["updates"]:
+    for update in updates:
         for language in ("en", "es"):
-            article = update["languages"][language]
-            alternate = update["languages"]["es" if language == "en" else "en"]
+            article = update.languages[language]
+            alternate = update.languages["es" if language == "en" else "en"]
             rows.append((update, language, article, alternate))
     return rows
 
 
-def article_tags(update: dict, language: str) -> list[str]:
-    tags = list(update["tags"])
+def article_tags(update: BargainingUpdate, language: str) -> list[str]:
+    tags = list(update.tags)
     if language == "es":
         tags.append("Español")
     return tags
 
 
+def hero_image(article: dict, images: ImageManifest) -> tuple[ResponsiveImage, int, int]:
+    """The hero ``<img>`` and the full-size width and height for ``og:image``.
+
+    Sizes come from the image itself when it is under ``images/``; the
+    manifest's ``heroWidth`` and ``heroHeight`` are used otherwise.
+    """
+
+    entry = images.get(article["heroImage"])
+    if entry is None:
+        width, height = article["heroWidth"], article["heroHeight"]
+        return ResponsiveImage(article["heroImage"], "", width, height), width, height
+    return entry.responsive(), entry.width, entry.height
+
+
 def render_page(
-    payload: dict,
-    update: dict,
+    manifest: BargainingManifest,
+    update: BargainingUpdate,
     language: str,
     article: dict,
     alternate: dict,
     header: str,
     footer: str,
+    feeds: str,
+    images: ImageManifest,
 ) -> str:
     ui = UI[language]
-    author = payload["author"]["name"]
+    hero, hero_width, hero_height = hero_image(article, images)
+    hero_srcset = f' srcset="{esc(hero.srcset)}" sizes="(max-width: 767px) calc(100vw - 2.5rem), 56rem"' if hero.srcset else ""
+    author = manifest.author["name"]
     url = f"{BASE_URL}{article['url']}"
     alternate_url = f"{BASE_URL}{alternate['url']}"
-    en_url = f"{BASE_URL}{update['languages']['en']['url']}"
-    es_url = f"{BASE_URL}{update['languages']['es']['url']}"
-    source_url = payload["source"]["spanish" if language == "es" else "english"]
+    en_url = f"{BASE_URL}{update.languages['en']['url']}"
+    es_url = f"{BASE_URL}{update.languages['es']['url']}"
+    source_url = manifest.source["spanish" if language == "es" else "english"]
     page_title = f"{article['title']} - SEIU Local 503 at Oregon State University"
     tags = article_tags(update, language)
     body_html = "\n".join(line.rstrip() for line in article["bodyHtml"].splitlines())
@@ -155,8 +176,8 @@ def render_page(
                 "headline": article["title"],
                 "description": article["description"],
                 "image": f"{BASE_URL}{article['heroImage']}",
-                "datePublished": update["date"],
-                "dateModified": payload["source"]["accessedAt"],
+                "datePublished": update.date_text,
+                "dateModified": manifest.source["accessedAt"],
                 "inLanguage": language,
                 "articleSection": "Bargaining",
                 "keywords": tags,
@@ -221,10 +242,10 @@ def render_page(
     <meta property="og:description" content="{esc(article['description'])}">
     <meta property="og:image" content="{BASE_URL}{esc(article['heroImage'])}">
     <meta property="og:image:alt" content="{esc(article['heroAlt'])}">
-    <meta property="og:image:width" content="{article['heroWidth']}">
-    <meta property="og:image:height" content="{article['heroHeight']}">
+    <meta property="og:image:width" content="{hero_width}">
+    <meta property="og:image:height" content="{hero_height}">
     <meta property="og:site_name" content="SEIU Local 503 at Oregon State University">
-    <meta property="article:published_time" content="{update['date']}">
+    <meta property="article:published_time" content="{update.date_text}">
     <meta property="article:section" content="Bargaining">
 {tag_meta}
     <meta name="twitter:card" content="summary_large_image">
@@ -237,6 +258,7 @@ def render_page(
 {json.dumps(schema, ensure_ascii=False, indent=2)}
     </script>
     <script src="/js/analytics.js" defer></script>
+    {feeds}
 </head>
 <body class="bg-brand-light">
     <a href="#main-content" class="sr-only focus:not-sr-only focus:fixed focus:top-4 focus:left-4 focus:z-50 focus:bg-white focus:text-brand-purple-dark focus:px-4 focus:py-2 focus:rounded focus:shadow-lg">{esc(ui['skip'])}</a>
@@ -254,12 +276,12 @@ def render_page(
                 <p class="mt-3 max-w-4xl mx-auto text-center text-base md:mt-4 md:text-lg text-text-secondary">{esc(article['description'])}</p>
                 <div class="mt-6 flex flex-col items-center gap-2 text-center text-sm text-text-secondary">
                     <p>{esc(ui['by'])} <span class="font-semibold">{esc(author)}</span></p>
-                    <p>{esc(ui['published'])} <time datetime="{update['date']}">{esc(display_date(update['date'], language))}</time></p>
+                    <p>{esc(ui['published'])} <time datetime="{update.date_text}">{esc(display_date(update.date, language))}</time></p>
                 </div>
             </header>
 
             <figure class="px-5 pt-6 sm:px-8 md:px-12 md:pt-8">
-                <img src="{esc(article['heroImage'])}" alt="{esc(article['heroAlt'])}" class="w-full max-h-[42rem] h-auto object-contain rounded-xl bg-gray-50" decoding="async" width="{article['heroWidth']}" height="{article['heroHeight']}">
+                <img src="{esc(hero.src)}"{hero_srcset} alt="{esc(article['heroAlt'])}" class="w-full max-h-[42rem] h-auto object-contain rounded-xl bg-gray-50" fetchpriority="high" width="{hero.width}" height="{hero.height}">
                 <figcaption class="mt-2 text-center text-sm text-text-secondary">{esc(ui['credit'])}</figcaption>
             </figure>
 
@@ -291,8 +313,8 @@ def render_page(
 '''
 
 
-def news_entry(payload: dict, update: dict, language: str, article: dict) -> dict:
-    author = payload["author"]
+def news_entry(manifest: BargainingManifest, update: BargainingUpdate, language: str, article: dict) -> dict:
+    author = manifest.author
     return {
         "status": "published",
         "title": article["title"],
@@ -302,39 +324,56 @@ def news_entry(payload: dict, update: dict, language: str, article: dict) -> dic
         "alt": article["heroAlt"],
         "tags": article_tags(update, language),
         "author": {"name": author["name"], "title": author["title"]},
-        "publishedAt": update["date"],
-        "createdAt": update["date"],
-        "updatedAt": payload["source"]["accessedAt"],
-        "featured": language == "en" and update["date"] == payload["updates"][0]["date"],
+        "publishedAt": update.date_text,
+        "createdAt": update.date_text,
+        "updatedAt": manifest.source["accessedAt"],
+        "featured": language == "en" and update.date_text == manifest.updates[0].date_text,
         "language": language,
     }
 
 
-def sync_index(payload: dict) -> None:
-    imported = [news_entry(payload, update, language, article) for update, language, article, _ in entries(payload)]
+def sync_index(manifest: BargainingManifest, output: SiteOutput | None = None) -> None:
+    imported = [news_entry(manifest, update, language, article) for update, language, article, _ in entries(manifest.updates)]
     imported_urls = {item["url"] for item in imported}
     existing = json.loads(NEWS_INDEX.read_text(encoding="utf-8"))
     merged = imported + [item for item in existing if item.get("url") not in imported_urls]
-    NEWS_INDEX.write_text(json.dumps(merged, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    (output or SiteOutput(ROOT)).write_text(NEWS_INDEX, json.dumps(merged, ensure_ascii=False, indent=2) + "\n")
     print(f"Synced {len(imported)} bargaining stories into {NEWS_INDEX}")
 
 
-def build(*, update_index: bool = False) -> list[Path]:
-    payload = json.loads(MANIFEST.read_text(encoding="utf-8"))
+def build(
+    *,
+    update_index: bool = False,
+    root: Path = ROOT,
+    manifest: BargainingManifest | None = None,
+    news_index: list[dict] | None = None,
+    output: SiteOutput | None = None,
+    images: ImageManifest | None = None,
+) -> list[Path]:
+    """Write every bilingual page; the site build passes already-loaded records and images."""
+
+    output = output or SiteOutput(root)
+    if manifest is None:
+        manifest = read_bargaining(root)
+    if images is None:
+        images = scan_images(root)
+    rows = entries(manifest.updates)
     written = []
-    for update, language, article, alternate in entries(payload):
-        path = ROOT / article["url"].lstrip("/")
-        path.parent.mkdir(parents=True, exist_ok=True)
-        relative_path = path.relative_to(ROOT).as_posix()
+    for update, language, article, alternate in rows:
+        path = root / article["url"].lstrip("/")
+        relative_path = path.relative_to(root).as_posix()
         header = render_header(relative_path)
         footer = render_footer(relative_path)
-        path.write_text(render_page(payload, update, language, article, alternate, header, footer), encoding="utf-8")
+        feeds = render_feed_links(relative_path)
+        output.write_text(path, render_page(manifest, update, language, article, alternate, header, footer, feeds, images))
         written.append(path)
     if update_index:
-        sync_index(payload)
+        sync_index(manifest, output)
     else:
-        indexed_urls = {item.get("url") for item in json.loads(NEWS_INDEX.read_text(encoding="utf-8"))}
-        missing = [article["url"] for _, _, article, _ in entries(payload) if article["url"] not in indexed_urls]
+        if news_index is None:
+            news_index = [article.data for article in read_news(root)]
+        indexed_urls = {item.get("url") for item in news_index}
+        missing = [article["url"] for _, _, article, _ in rows if article["url"] not in indexed_urls]
         if missing:
             raise ValueError("Bargaining news pages are missing from news/news.json: " + ", ".join(missing))
     return written
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""Write the static JSON API: small, pre-sorted shards of the public news and events.
+
+``news/news.json`` and ``events/events.json`` hold every field of every entry,
+drafts and history included, so a page that fetches them downloads far more
+than it shows and then filters, sorts and formats on the phone. The shards
+under ``api/`` hold only public entries, already in display order and with
+display dates formatted and image sizes, variants and thumbnails resolved
+from ``images/``, so each view fetches just what it renders:
+
+* ``api/news/latest.json``: the newest stories plus any featured story;
+* ``api/news/years/<year>.json`` and ``api/news/tags/<slug>.json``;
+* ``api/events/upcoming.json`` and ``api/events/years/<year>.json``;
+* ``api/manifest.json``: every shard with its item count and a content hash
+  for cache busting.
+
+News shards are JSON arrays, like ``news.json``; event shards are objects
+with ``asOf`` and ``events``, like ``events.json``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+from collections import defaultdict
+from datetime import date
+from pathlib import Path
+
+from content import Event, EventCalendar, NewsArticle, group_by_tag, read_events, read_news
+from generate_static_content import DEFAULT_IMAGE, event_order, event_payload, long_date, public_news, renderable_events, short_date
+from image_manifest import ImageManifest, scan as scan_images
+from site_output import SiteOutput
+
+
+ROOT = Path(__file__).resolve().parents[1]
+API_DIR = Path("api")
+API_VERSION = 1
+LATEST_NEWS_LIMIT = 12
+
+
+def news_item(article: NewsArticle, images: ImageManifest) -> dict:
+    """The fields the news views render, with their dates formatted and image resolved for display."""
+
+    data = article.data
+    author = data.get("author")
+    image = article.image or DEFAULT_IMAGE
+    media = images.responsive(image)
+    item = {
+        "title": article.title,
+        "description": article.description,
+        "url": article.url,
+        "image": article.image,
+        "alt": article.alt,
+        "imageSrc": media.src,
+        "imageWidth": media.width,
+        "imageHeight": media.height,
+        "thumbnail": images.thumbnail(image),
+        "tags": list(article.tags),
+        "author": {key: author[key] for key in ("name", "title") if key in author} if isinstance(author, dict) else {},
+        "publishedAt": article.published,
+        "displayDate": short_date(article.published_on),  # type: ignore[arg-type]
+        "displayDateLong": long_date(article.published_on),  # type: ignore[arg-type]
+        "featured": article.featured,
+    }
+    if media.srcset:
+        item["imageSrcset"] = media.srcset
+    if article.created_on:
+        item["createdAt"] = data["createdAt"]
+    if article.updated_on:
+        item["updatedAt"] = data["updatedAt"]
+        item["displayUpdated"] = long_date(article.updated_on)
+    if article.language:
+        item["language"] = article.language
+    return item
+
+
+def event_item(event: Event) -> dict:
+    day: date = event.date  # type: ignore[assignment]
+    item = {
+        "date": event.date_text,
+        "displayDate": f"{day.strftime('%a')}, {short_date(day)}",
+        "displayDateLong": f"{day.strftime('%A')}, {long_date(day)}",
+        "monthShort": day.strftime("%b"),
+        "day": day.day,
+        "time": event.time,
+        "title": event.title,
+        "description": event.description,
+        "type": event.type,
+        "url": event.url,
+        "location_detail": event.location,
+        "featured": event.featured,
+    }
+    if event.calendar_link:
+        item["calendar_link"] = event.calendar_link
+    return item
+
+
+def encode(value: object) -> bytes:
+    return (json.dumps(value, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def shards(articles: list[NewsArticle], event_calendar: EventCalendar, images: ImageManifest) -> dict[str, object]:
+    """Map each shard's path under ``api/`` to its content, the manifest last."""
+
+    news = public_news(articles)
+    items = {id(article): news_item(article, images) for article in news}
+    as_of, event_calendar = event_payload(event_calendar)
+    events = sorted(renderable_events(event_calendar.events), key=event_order)
+    events_payload = lambda selected: {"asOf": as_of.isoformat(), "events": [event_item(event) for event in selected]}  # noqa: E731
+
+    latest = {id(article) for article in news[:LATEST_NEWS_LIMIT]} | {id(article) for article in news if article.featured}
+    output: dict[str, object] = {"news/latest.json": [items[id(article)] for article in news if id(article) in latest]}
+    by_year: dict[int, list[dict]] = defaultdict(list)
+    for article in news:
+        by_year[article.published_on.year].append(items[id(article)])  # type: ignore[union-attr]
+    for year in sorted(by_year, reverse=True):
+        output[f"news/years/{year}.json"] = by_year[year]
+    # Tags that differ only in case or accents share a slug, and so one shard.
+    by_tag = group_by_tag(news, lambda article: article.tags)
+    for slug, (_, tagged) in by_tag.items():
+        output[f"news/tags/{slug}.json"] = [items[id(article)] for article in tagged]
+
+    output["events/upcoming.json"] = events_payload([event for event in events if event.date >= as_of])
+    for year in sorted({event.date.year for event in events}, reverse=True):  # type: ignore[union-attr]
+        output[f"events/years/{year}.json"] = events_payload([event for event in events if event.date.year == year])  # type: ignore[union-attr]
+
+    def entry(path: str, **fields: object) -> dict:
+        content = output[path]
+        count = len(content) if isinstance(content, list) else len(content["events"])  # type: ignore[index]
+        return {**fields, "path": f"/{API_DIR.as_posix()}/{path}", "count": count, "hash": hashlib.sha256(encode(content)).hexdigest()[:12]}
+
+    output["manifest.json"] = {
+        "version": API_VERSION,
+        "asOf": as_of.isoformat(),
+        "news": {
+            "count": len(news),
+            "latest": entry("news/latest.json"),
+            "years": [entry(f"news/years/{year}.json", year=year) for year in sorted(by_year, reverse=True)],
+            "tags": [entry(f"news/tags/{slug}.json", tag=tag, slug=slug) for slug, (tag, _) in by_tag.items()],
+        },
+        "events": {
+            "count": len(events),
+            "upcoming": entry("events/upcoming.json"),
+            "years": [
+                entry(f"events/years/{year}.json", year=year)
+                for year in sorted({event.date.year for event in events}, reverse=True)  # type: ignore[union-attr]
+            ],
+        },
+    }
+    return output
+
+
+def build(
+    root: Path = ROOT,
+    *,
+    articles: list[NewsArticle] | None = None,
+    event_calendar: EventCalendar | None = None,
+    output: SiteOutput | None = None,
+    images: ImageManifest | None = None,
+) -> list[Path]:
+    """Write every shard and the manifest; return their paths.
+
+    Writing in place also deletes shards left over from a tag or year that
+    no longer has public entries.
+    """
+
+    if articles is None:
+        articles = read_news(root)
+    if event_calendar is None:
+        event_calendar = read_events(root)
+    if images is None:
+        images = scan_images(root)
+    output = output or SiteOutput(root)
+    api = root / API_DIR
+    written = []
+    for relative, content in shards(articles, event_calendar, images).items():
+        path = api / relative
+        output.write_bytes(path, encode(content))
+        written.append(path)
+    for stale in sorted(set(api.rglob("*.json")) - set(written)):
+        output.delete(stale)
+    return written
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--root", type=Path, default=ROOT, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    root = args.root.resolve()
+    output = SiteOutput(root)
+    written = build(root, output=output)
+    print(f"Wrote {len(output.updated)} of {len(written)} API file(s) under {API_DIR.as_posix()}/")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""Generate the missing responsive WebP variants and thumbnails under ``images/``.
+
+Every image shown on a public page or used by a news story gets a
+``<stem>-<N>w.webp`` variant for each width in ``VARIANT_WIDTHS`` narrower
+than the original, and every news image a centred square
+``<stem>-192.webp`` thumbnail. The image manifest picks them up on the next
+build, so pages, the JSON API and the newsroom script list them in
+``srcset``.
+
+Encoding runs ``cwebp`` (the ``webp`` package) in a process pool.
+``.build-cache/image-derivatives.json`` records the source hash and
+encoder settings behind each generated file: an unchanged source is never
+encoded again, and a derivative the cache did not produce, such as one made
+by hand, is never overwritten.
+
+The report lists, per public page, the image bytes a phone downloads with
+the current markup and with every image served from its best-fitting
+variant, which is what the generated ``srcset`` attributes deliver. Sizes of
+variants not yet encoded (with ``--dry-run`` or without ``cwebp``) are
+estimated from the source's bytes per pixel.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Callable, Iterable
+
+from content import read_news
+from image_manifest import IMAGE_SUFFIXES, ImageEntry, ImageManifest, scan as scan_images
+from public_pages import ROOT, PageCorpus, discover_public_pages
+
+
+DERIVATIVE_CACHE = Path(".build-cache") / "image-derivatives.json"
+DERIVATIVE_CACHE_VERSION = 1
+VARIANT_WIDTHS = (480, 960, 1440)
+THUMBNAIL_SIZE = 192
+WEBP_QUALITY = 78
+ENCODER = "cwebp"
+# Device pixels a phone asks for when an image spans its screen: a 412 CSS px
+# wide viewport at a device pixel ratio of 2.
+MOBILE_WIDTH = 824
+
+
+@dataclass(frozen=True)
+class Derivative:
+    """One WebP file to encode from ``source``, optionally cropped first."""
+
+    source: Path
+    target: Path
+    width: int
+    height: int
+    crop: tuple[int, int, int, int] | None = None
+
+    @property
+    def settings(self) -> str:
+        crop = "x".join(map(str, self.crop)) if self.crop else "none"
+        return f"q{WEBP_QUALITY} {self.width}x{self.height} crop {crop}"
+
+
+def sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def load_cache(path: Path) -> dict[str, dict[str, str]]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("version") == DERIVATIVE_CACHE_VERSION and isinstance(data.get("files"), dict):
+            return data["files"]
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {}
+
+
+def save_cache(path: Path, files: dict[str, dict[str, str]]) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"version": DERIVATIVE_CACHE_VERSION, "files": files}, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    except OSError:
+        return
+
+
+def used_images(root: Path, corpus: PageCorpus, news_images: Iterable[str]) -> set[str]:
+    """Site URLs of the images that public pages show or news stories use."""
+
+    urls = set(news_images)
+    for page in discover_public_pages(root, include_404=True, corpus=corpus):
+        for tag, values, _ in corpus.page(page.path).summary.references:
+            if tag == "img" and values.get("src", "").startswith("/images/"):
+                urls.add(values["src"].split("?")[0])
+    return urls
+
+
+def derivatives(root: Path, entry: ImageEntry, *, thumbnail: bool) -> list[Derivative]:
+    """Every derivative ``entry`` should have, whether or not it exists yet."""
+
+    source = root / entry.url.lstrip("/")
+    stem = PurePosixPath(entry.url).stem
+    planned = [
+        Derivative(source, source.with_name(f"{stem}-{width}w.webp"), width, round(entry.height * width / entry.width))
+        for width in VARIANT_WIDTHS
+        if width < entry.width
+    ]
+    if thumbnail and min(entry.width, entry.height) >= THUMBNAIL_SIZE:
+        side = min(entry.width, entry.height)
+        crop = ((entry.width - side) // 2, (entry.height - side) // 2, side, side)
+        planned.append(Derivative(source, source.with_name(f"{stem}-{THUMBNAIL_SIZE}.webp"), THUMBNAIL_SIZE, THUMBNAIL_SIZE, crop))
+    return planned
+
+
+def plan(
+    root: Path,
+    manifest: ImageManifest,
+    used: set[str],
+    news_images: set[str],
+    cache: dict[str, dict[str, str]],
+) -> list[Derivative]:
+    """The derivatives to encode: missing ones, and ones this tool made from an older source.
+
+    A derivative on disk is kept when the cache did not produce it, or
+    when it was edited after being generated.
+    """
+
+    pending = []
+    for url in sorted(used):
+        entry = manifest.get(url)
+        if entry is None or PurePosixPath(url).suffix not in IMAGE_SUFFIXES:
+            continue
+        for derivative in derivatives(root, entry, thumbnail=url in news_images):
+            if not derivative.target.exists():
+                pending.append(derivative)
+                continue
+            record = cache.get(derivative.target.relative_to(root).as_posix())
+            if record is None or record.get("output") != sha256(derivative.target):
+                continue
+            if record.get("source") != sha256(derivative.source) or record.get("settings") != derivative.settings:
+                pending.append(derivative)
+    return pending
+
+
+def encode(derivative: Derivative) -> Derivative:
+    """Write one derivative with ``cwebp``, replacing the target only once encoding succeeded."""
+
+    command = [ENCODER, "-quiet", "-q", str(WEBP_QUALITY), "-metadata", "none"]
+    if derivative.crop:
+        command += ["-crop", *map(str, derivative.crop)]
+    command += ["-resize", str(derivative.width), str(derivative.height), str(derivative.source)]
+    handle, scratch = tempfile.mkstemp(dir=derivative.target.parent, prefix=".tmp-", suffix=".webp")
+    os.close(handle)
+    try:
+        subprocess.run([*command, "-o", scratch], check=True, capture_output=True)
+        os.replace(scratch, derivative.target)
+    finally:
+        if os.path.exists(scratch):
+            os.unlink(scratch)
+    return derivative
+
+
+def generate(
+    root: Path,
+    pending: list[Derivative],
+    cache: dict[str, dict[str, str]],
+    *,
+    jobs: int = 1,
+    encoder: Callable[[Derivative], Derivative] = encode,
+) -> list[Path]:
+    """Encode ``pending`` in up to ``jobs`` processes, recording each result in ``cache``."""
+
+    def record(derivative: Derivative) -> None:
+        cache[derivative.target.relative_to(root).as_posix()] = {
+            "source": sha256(derivative.source),
+            "settings": derivative.settings,
+            "output": sha256(derivative.target),
+        }
+
+    if jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            done = list(executor.map(encoder, pending))
+    else:
+        done = [encoder(derivative) for derivative in pending]
+    for derivative in done:
+        record(derivative)
+    return [derivative.target for derivative in done]
+
+
+@dataclass(frozen=True)
+class PageImages:
+    page: str
+    images: int
+    current: int
+    responsive: int
+
+    @property
+    def saved(self) -> int:
+        return self.current - self.responsive
+
+
+def fitting(candidates: list[tuple[int, str]], width: int = MOBILE_WIDTH) -> str:
+    """The candidate a browser picks from ``(width, url)`` for a slot ``width`` device pixels wide."""
+
+    wide_enough = [candidate for candidate in sorted(candidates) if candidate[0] >= width]
+    return (wide_enough[0] if wide_enough else max(candidates))[1]
+
+
+def page_images(root: Path, manifest: ImageManifest, corpus: PageCorpus, pending: Iterable[Derivative] = ()) -> list[PageImages]:
+    """Phone image bytes per public page, now and with every image served from its variants.
+
+    Each image counts once per page and at its full-screen phone width, so
+    the figures are an upper bound for images shown smaller. ``pending``
+    width variants count at a size scaled from their source by pixel count.
+    """
+
+    originals = {variant.url: entry for entry in manifest.entries.values() for variant in entry.variants}
+    originals.update(manifest.entries)
+    sizes = {}
+    for entry in manifest.entries.values():
+        sizes[entry.url] = entry.width
+        sizes.update((variant.url, variant.width) for variant in entry.variants)
+    planned: dict[str, list[tuple[int, str]]] = {}
+    estimates: dict[str, int] = {}
+    for derivative in pending:
+        url = "/" + derivative.target.relative_to(root).as_posix()
+        entry = originals.get("/" + derivative.source.relative_to(root).as_posix())
+        if derivative.crop is None and entry is not None:
+            planned.setdefault(entry.url, []).append((derivative.width, url))
+            pixels = derivative.width * derivative.height / (entry.width * entry.height)
+            estimates[url] = round(derivative.source.stat().st_size * pixels)
+
+    def size_of(url: str) -> int:
+        if url in estimates:
+            return estimates[url]
+        path = root / url.lstrip("/")
+        return path.stat().st_size if path.is_file() else 0
+
+    rows = []
+    for page in discover_public_pages(root, include_404=False, corpus=corpus):
+        current: dict[str, int] = {}
+        responsive: dict[str, int] = {}
+        for tag, values, _ in corpus.page(page.path).summary.references:
+            src = values.get("src", "").split("?")[0]
+            entry = originals.get(src)
+            if tag != "img" or entry is None:
+                continue
+            listed = [candidate.rsplit(" ", 1) for candidate in values.get("srcset", "").split(",") if candidate.strip().endswith("w")]
+            candidates = [(int(descriptor[:-1]), url.strip()) for url, descriptor in listed if url.strip() in sizes]
+            current[entry.url] = max(current.get(entry.url, 0), size_of(fitting(candidates) if candidates else src))
+            every = [(entry.width, entry.url), *((variant.width, variant.url) for variant in entry.variants), *planned.get(entry.url, ())]
+            responsive[entry.url] = min(current[entry.url], size_of(fitting(every)))
+        if current:
+            relative = page.path.relative_to(root).as_posix()
+            rows.append(PageImages(relative, len(current), sum(current.values()), sum(responsive.values())))
+    return sorted(rows, key=lambda row: (-row.saved, row.page))
+
+
+def kib(size: int) -> str:
+    return f"{size / 1024:,.0f} KiB"
+
+
+def write_report(path: Path, rows: list[PageImages], written: list[Path], remaining: list[Derivative]) -> None:
+    current = sum(row.current for row in rows)
+    responsive = sum(row.responsive for row in rows)
+    lines = [
+        "# Image Derivatives Report",
+        "",
+        f"- Derivatives written: {len(written)}",
+        f"- Derivatives still missing: {len(remaining)}{' (their sizes below are estimates)' if remaining else ''}",
+        f"- Phone image bytes across {len(rows)} page(s): {kib(current)} now, {kib(responsive)} from variants ({kib(current - responsive)} saved)",
+        "",
+        f"Sizes assume each image fills a {MOBILE_WIDTH} device-pixel-wide phone screen and is downloaded once per page.",
+        "",
+        "| Page | Images | Now | From variants | Saved |",
+        "| --- | ---: | ---: | ---: | ---: |",
+    ]
+    lines += [f"| `{row.page}` | {row.images} | {kib(row.current)} | {kib(row.responsive)} | {kib(row.saved)} |" for row in rows]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", type=Path, default=ROOT, help=argparse.SUPPRESS)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Encoder processes (default: one per CPU).")
+    parser.add_argument("--dry-run", action="store_true", help="List the derivatives to encode and write the report without encoding.")
+    parser.add_argument("--report", default="image-derivatives-report.md", help="Output markdown report path (repo-relative).")
+    args = parser.parse_args()
+
+    root = args.root.resolve()
+    corpus = PageCorpus(root)
+    news_images = {article.image for article in read_news(root) if article.image}
+    cache_path = root / DERIVATIVE_CACHE
+    cache = load_cache(cache_path)
+    pending = plan(root, scan_images(root), used_images(root, corpus, news_images), news_images, cache)
+
+    written: list[Path] = []
+    if args.dry_run:
+        for derivative in pending:
+            print(f"Would write {derivative.target.relative_to(root).as_posix()} ({derivative.width}x{derivative.height})")
+    elif pending:
+        if shutil.which(ENCODER) is None:
+            parser.error(f"{ENCODER} is not installed; install the webp package, or pass --dry-run to list the {len(pending)} missing derivative(s)")
+        written = generate(root, pending, cache, jobs=max(1, args.jobs))
+        save_cache(cache_path, cache)
+        for path in written:
+            print(f"Wrote {path.relative_to(root).as_posix()}")
+
+    remaining = [derivative for derivative in pending if not derivative.target.exists()]
+    rows = page_images(root, scan_images(root), corpus, remaining)
+    report_path = root / args.report
+    write_report(report_path, rows, written, remaining)
+    current = sum(row.current for row in rows)
+    responsive = sum(row.responsive for row in rows)
+    print(f"{len(pending)} derivative(s) {'to write' if args.dry_run else 'needed'}, {len(written)} written.")
+    print(f"Phone image bytes: {kib(current)} now, {kib(responsive)} from variants. Report: {report_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
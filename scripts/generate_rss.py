@@ -1,13 +1,40 @@
 #!/usr/bin/env python3
-
+"""Write the news, events, combined and per-tag feeds as RSS 2.0, Atom and JSON Feed 1.1.
+
+Items are built and sorted once per feed; each format renders the same
+list. Every feed's RSS version sits at its ``rss.xml`` path (``/feed.xml``
+for the combined feed) with ``atom.xml`` and ``feed.json`` beside it. Each
+public news tag gets its own feeds under ``news/tags/<slug>/``.
+
+RSS is written as text, one item at a time, in the indented layout
+``xml.dom.minidom`` used to produce, without building or re-parsing a DOM.
+
+Each feed carries its newest ``FEED_WINDOW`` items. Older items move into
+RFC 5005 archive feeds of ``ARCHIVE_PAGE_SIZE`` items each, beside the feed
+in ``<name>-archive/<n>.xml``, oldest first, linked by ``prev-archive`` and
+``next-archive``. Only full pages are archived, so the feed may hold up to
+``ARCHIVE_PAGE_SIZE - 1`` items beyond its window. Pages are cut by count
+from the oldest item, so new items never change an archived page; a story
+backdated behind archived items, or removed from them, shifts every page
+after it, and those pages are rendered again. ``.build-cache/feed-archives.json`` records what each
+archive page was rendered from; a page whose items and links are unchanged
+is not rendered again. Atom and JSON Feed carry the same window but are
+not archived.
+"""
+
+import hashlib
 import json
+import re
 from datetime import datetime, timezone
 from email.utils import format_datetime
-from pathlib import Path
-from typing import List, Optional
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
-from zoneinfo import ZoneInfo
+from pathlib import Path, PurePosixPath
+from urllib.parse import quote
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import site_templates
+from content import EPOCH, Event, EventCalendar, NewsArticle, group_by_tag, read_events, read_news
+from site_output import SiteOutput
+from site_templates import content_digest
 
 
 BASE_URL = "https://www.local083.org"
@@ -19,8 +46,40 @@ EVENTS_RSS_PATH = ROOT / "events" / "rss.xml"
 COMBINED_RSS_PATH = ROOT / "feed.xml"
 
 ATOM_NS = "http://www.w3.org/2005/Atom"
-ET.register_namespace("atom", ATOM_NS)
-OREGON_TZ = ZoneInfo("America/Los_Angeles")
+JSON_FEED_VERSION = "https://jsonfeed.org/version/1.1"
+AUTHOR = "SEIU Local 503 at OSU"
+# Atom ids must be IRIs; GUIDs that are not URLs become tag URIs under this prefix.
+TAG_URI_PREFIX = "tag:www.local083.org,2025:"
+HISTORY_NS = "http://purl.org/syndication/history/1.0"
+FEED_WINDOW = 30
+ARCHIVE_PAGE_SIZE = 20
+ARCHIVE_LEDGER = Path(".build-cache") / "feed-archives.json"
+ARCHIVE_LEDGER_VERSION = 1
+SITE_FEEDS = {
+    "news": {
+        "title": "SEIU Local 503 at OSU - News",
+        "description": "News and updates from SEIU Local 503 at Oregon State University.",
+        "self_path": "/news/rss.xml",
+    },
+    "events": {
+        "title": "SEIU Local 503 at OSU - Events",
+        "description": "Upcoming events from SEIU Local 503 at Oregon State University.",
+        "self_path": "/events/rss.xml",
+    },
+    "all": {
+        "title": "SEIU Local 503 at OSU - News and Events",
+        "description": "Combined news and event updates from SEIU Local 503 at Oregon State University.",
+        "self_path": "/feed.xml",
+    },
+}
+# Each format's file name beside the RSS feed, media type and display name.
+FEED_FORMATS = {
+    "rss": (None, "application/rss+xml", "RSS"),
+    "atom": ("atom.xml", "application/atom+xml", "Atom"),
+    "json": ("feed.json", "application/feed+json", "JSON Feed"),
+}
+# Characters XML 1.0 cannot represent, even escaped.
+INVALID_XML_RE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
 
 
 def absolute_url(path: str) -> str:
@@ -31,44 +90,66 @@ def absolute_url(path: str) -> str:
     return f"{BASE_URL}{path}"
 
 
-def parse_date(value: Optional[str]) -> datetime:
-    if not value:
-        return datetime(1970, 1, 1, tzinfo=timezone.utc)
-    value = value.strip()
-    if len(value) == 10:
-        # Editorial dates are Oregon dates. Treating date-only values as UTC
-        # would expose scheduled stories at 4 or 5 p.m. Pacific the day before.
-        return datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=OREGON_TZ).astimezone(timezone.utc)
-    return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc)
-
-
-def get_article_status(article: dict) -> str:
-    status = article.get("status")
-    return status if isinstance(status, str) and status.strip() else "published"
-
-
-def is_public_news_article(article: dict, now: Optional[datetime] = None) -> bool:
-    status = get_article_status(article)
-    published_at = parse_date(article.get("publishedAt") or article.get("createdAt"))
+def is_public_news_article(article: Union[NewsArticle, dict], now: Optional[datetime] = None) -> bool:
+    if isinstance(article, dict):
+        article = NewsArticle.from_dict(article)
     # Scheduled publishing promotes due stories to `published` in a separate
     # workflow. Requiring that explicit state keeps feed generation deterministic
     # and prevents a scheduled page from appearing before its noindex tag is
     # removed.
-    return status == "published" and published_at != datetime(1970, 1, 1, tzinfo=timezone.utc)
+    return article.status == "published" and (article.dated_at or EPOCH) != EPOCH
 
 
 def to_rfc2822(value: datetime) -> str:
     return format_datetime(value.astimezone(timezone.utc), usegmt=True)
 
 
-def prettify_xml(element: ET.Element) -> str:
-    raw = ET.tostring(element, encoding="utf-8")
-    parsed = minidom.parseString(raw)
-    return parsed.toprettyxml(indent="  ", encoding="utf-8").decode("utf-8")
+def to_rfc3339(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def format_path(self_path: str, kind: str) -> str:
+    """Return the path of the ``kind`` version of the feed whose RSS lives at ``self_path``."""
+
+    name = FEED_FORMATS[kind][0]
+    return self_path if name is None else str(PurePosixPath(self_path).with_name(name))
+
+
+def discovery_links(section: Optional[str]) -> List[Tuple[str, str, str]]:
+    """Return ``(type, title, url)`` for the feeds a page in ``section`` should advertise.
 
+    Pages under ``news/`` and ``events/`` list their own feeds before the
+    combined feed; every other page lists only the combined feed.
+    """
 
-def add_item(
-    channel: ET.Element,
+    keys = ([section] if section in ("news", "events") else []) + ["all"]
+    return [
+        (media_type, f"{SITE_FEEDS[key]['title']} ({name})", absolute_url(format_path(SITE_FEEDS[key]["self_path"], kind)))
+        for key in keys
+        for kind, (_, media_type, name) in FEED_FORMATS.items()
+    ]
+
+
+def escape(value: str) -> str:
+    """Escape text or an attribute value the way the feeds have always been written.
+
+    Line breaks are normalized to ``\\n``, as an XML parser would, and double
+    quotes are escaped in text as well as in attributes.
+    """
+
+    if INVALID_XML_RE.search(value):
+        raise ValueError(f"Feed text contains a character XML cannot represent: {value!r}")
+    value = value.replace("\r\n", "\n").replace("\r", "\n")
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace('"', "&quot;").replace(">", "&gt;")
+
+
+def text_element(indent: str, tag: str, text: Optional[str], attributes: str = "") -> str:
+    if not text:
+        return f"{indent}<{tag}{attributes}/>\n"
+    return f"{indent}<{tag}{attributes}>{escape(text)}</{tag}>\n"
+
+
+def render_item(
     title: str,
     link: str,
     description: str,
@@ -76,17 +157,55 @@ def add_item(
     guid: str,
     guid_is_permalink: bool,
     categories: Optional[List[str]] = None,
-) -> None:
-    item = ET.SubElement(channel, "item")
-    ET.SubElement(item, "title").text = title
-    ET.SubElement(item, "link").text = link
-    guid_el = ET.SubElement(item, "guid")
-    guid_el.set("isPermaLink", "true" if guid_is_permalink else "false")
-    guid_el.text = guid
-    ET.SubElement(item, "description").text = description
-    ET.SubElement(item, "pubDate").text = to_rfc2822(pub_date)
-    for category in categories or []:
-        ET.SubElement(item, "category").text = category
+) -> str:
+    indent = "      "
+    parts = [
+        "    <item>\n",
+        text_element(indent, "title", title),
+        text_element(indent, "link", link),
+        text_element(indent, "guid", guid, f' isPermaLink="{"true" if guid_is_permalink else "false"}"'),
+        text_element(indent, "description", description),
+        text_element(indent, "pubDate", to_rfc2822(pub_date)),
+        *(text_element(indent, "category", category) for category in categories or []),
+        "    </item>\n",
+    ]
+    return "".join(parts)
+
+
+def feed_chunks(
+    *,
+    title: str,
+    description: str,
+    self_path: str,
+    items: Sequence[dict],
+    links: Sequence[Tuple[str, str]] = (),
+    archive: bool = False,
+) -> Iterator[str]:
+    """Yield the feed's text: the channel header, then each item as it is rendered.
+
+    ``links`` are extra ``(rel, path)`` Atom links such as ``prev-archive``;
+    ``archive`` marks the document as an RFC 5005 archive.
+    """
+
+    latest_item_date = latest_date(items)
+    indent = "    "
+    yield '<?xml version="1.0" encoding="utf-8"?>\n'
+    namespaces = f'xmlns:atom="{ATOM_NS}"' + (f' xmlns:fh="{HISTORY_NS}"' if archive else "")
+    yield f'<rss {namespaces} version="2.0">\n'
+    yield "  <channel>\n"
+    yield text_element(indent, "title", title)
+    yield text_element(indent, "link", BASE_URL)
+    yield text_element(indent, "description", description)
+    yield text_element(indent, "language", "en-us")
+    yield text_element(indent, "lastBuildDate", to_rfc2822(latest_item_date))
+    yield f'{indent}<atom:link href="{escape(absolute_url(self_path))}" rel="self" type="application/rss+xml"/>\n'
+    for rel, path in links:
+        yield f'{indent}<atom:link href="{escape(absolute_url(path))}" rel="{rel}" type="application/rss+xml"/>\n'
+    if archive:
+        yield f"{indent}<fh:archive/>\n"
+    for item in items:
+        yield render_item(**item)
+    yield "  </channel>\n</rss>\n"
 
 
 def build_feed(
@@ -94,92 +213,280 @@ def build_feed(
     title: str,
     description: str,
     self_path: str,
-    items: List[dict],
-) -> ET.Element:
-    rss = ET.Element("rss", version="2.0")
-    channel = ET.SubElement(rss, "channel")
-
-    ET.SubElement(channel, "title").text = title
-    ET.SubElement(channel, "link").text = BASE_URL
-    ET.SubElement(channel, "description").text = description
-    ET.SubElement(channel, "language").text = "en-us"
-    latest_item_date = max((item["pub_date"] for item in items), default=datetime(1970, 1, 1, tzinfo=timezone.utc))
-    ET.SubElement(channel, "lastBuildDate").text = to_rfc2822(latest_item_date)
-
-    atom_link = ET.SubElement(channel, f"{{{ATOM_NS}}}link")
-    atom_link.set("href", absolute_url(self_path))
-    atom_link.set("rel", "self")
-    atom_link.set("type", "application/rss+xml")
-
+    items: Sequence[dict],
+    links: Sequence[Tuple[str, str]] = (),
+    archive: bool = False,
+) -> str:
+    return "".join(feed_chunks(title=title, description=description, self_path=self_path, items=items, links=links, archive=archive))
+
+
+def latest_date(items: Sequence[dict]) -> datetime:
+    return max((item["pub_date"] for item in items), default=datetime(1970, 1, 1, tzinfo=timezone.utc))
+
+
+def atom_id(guid: str) -> str:
+    if guid.startswith("http://") or guid.startswith("https://"):
+        return guid
+    return TAG_URI_PREFIX + quote(guid, safe=":/")
+
+
+def render_entry(item: dict) -> str:
+    indent = "    "
+    published = to_rfc3339(item["pub_date"])
+    parts = [
+        "  <entry>\n",
+        text_element(indent, "title", item["title"]),
+        f'{indent}<link href="{escape(item["link"])}" rel="alternate" type="text/html"/>\n',
+        text_element(indent, "id", atom_id(item["guid"])),
+        text_element(indent, "published", published),
+        text_element(indent, "updated", published),
+        text_element(indent, "summary", item["description"]) if item["description"] else "",
+        *(f'{indent}<category term="{escape(category)}"/>\n' for category in item.get("categories") or [] if category),
+        "  </entry>\n",
+    ]
+    return "".join(parts)
+
+
+def atom_chunks(*, title: str, description: str, self_path: str, items: Sequence[dict]) -> Iterator[str]:
+    """Yield an Atom feed's text: the feed header, then each entry."""
+
+    indent = "  "
+    atom_path = format_path(self_path, "atom")
+    yield '<?xml version="1.0" encoding="utf-8"?>\n'
+    yield f'<feed xmlns="{ATOM_NS}" xml:lang="en-us">\n'
+    yield text_element(indent, "title", title)
+    yield text_element(indent, "subtitle", description)
+    yield f'{indent}<link href="{BASE_URL}/" rel="alternate" type="text/html"/>\n'
+    yield f'{indent}<link href="{escape(absolute_url(atom_path))}" rel="self" type="application/atom+xml"/>\n'
+    yield text_element(indent, "id", absolute_url(atom_path))
+    yield text_element(indent, "updated", to_rfc3339(latest_date(items)))
+    yield f"{indent}<author>\n{indent}  <name>{escape(AUTHOR)}</name>\n{indent}</author>\n"
     for item in items:
-        add_item(channel=channel, **item)
+        yield render_entry(item)
+    yield "</feed>\n"
+
+
+def build_atom_feed(*, title: str, description: str, self_path: str, items: Sequence[dict]) -> str:
+    return "".join(atom_chunks(title=title, description=description, self_path=self_path, items=items))
+
+
+def json_feed_item(item: dict) -> dict:
+    entry = {
+        "id": item["guid"],
+        "url": item["link"],
+        "title": item["title"],
+        "content_text": item["description"],
+        "date_published": to_rfc3339(item["pub_date"]),
+    }
+    tags = [category for category in item.get("categories") or [] if category]
+    if tags:
+        entry["tags"] = tags
+    return entry
+
+
+def build_json_feed(*, title: str, description: str, self_path: str, items: Sequence[dict]) -> str:
+    payload = {
+        "version": JSON_FEED_VERSION,
+        "title": title,
+        "home_page_url": f"{BASE_URL}/",
+        "feed_url": absolute_url(format_path(self_path, "json")),
+        "description": description,
+        "language": "en-US",
+        "authors": [{"name": AUTHOR, "url": f"{BASE_URL}/"}],
+        "items": [json_feed_item(item) for item in items],
+    }
+    return json.dumps(payload, ensure_ascii=False, indent=2) + "\n"
+
+
+def split_archives(items: Sequence[dict], *, window: int = FEED_WINDOW, page_size: int = ARCHIVE_PAGE_SIZE) -> Tuple[List[dict], List[List[dict]]]:
+    """Split a feed into the items it keeps and its archive pages, oldest page first.
+
+    Pages are filled from the oldest item, and only as many as the items
+    outside the window fill completely. Every part keeps the feed's order.
+    An item inserted or removed among the archived ones moves the page
+    boundaries after it.
+    """
+
+    newest_first = sorted(range(len(items)), key=lambda index: items[index]["pub_date"], reverse=True)
+    archived = max(0, len(items) - window) // page_size * page_size
+    page_of = {index: (archived - 1 - rank) // page_size for rank, index in enumerate(newest_first[len(items) - archived :])}
+    current = [item for index, item in enumerate(items) if index not in page_of]
+    pages: List[List[dict]] = [[] for _ in range(archived // page_size)]
+    for index, item in enumerate(items):
+        if index in page_of:
+            pages[page_of[index]].append(item)
+    return current, pages
+
+
+def archive_url(self_path: str, number: int) -> str:
+    path = PurePosixPath(self_path)
+    return str(path.with_name(f"{path.stem}-archive") / f"{number}.xml")
+
+
+def ledger_revision() -> str:
+    return hashlib.sha256(b"".join(Path(module).read_bytes() for module in (__file__, site_templates.__file__))).hexdigest()
+
+
+def load_ledger(path: Path) -> Dict[str, Dict[str, str]]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("version") == ARCHIVE_LEDGER_VERSION and data.get("revision") == ledger_revision() and isinstance(data.get("pages"), dict):
+            return data["pages"]
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {}
+
+
+def save_ledger(path: Path, pages: Dict[str, Dict[str, str]]) -> None:
+    payload = {"version": ARCHIVE_LEDGER_VERSION, "revision": ledger_revision(), "pages": dict(sorted(pages.items()))}
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+    except OSError:
+        return
+
+
+def write_feeds(
+    root: Path,
+    feed: dict,
+    output: SiteOutput,
+    ledger: Dict[str, Dict[str, str]],
+    *,
+    window: int = FEED_WINDOW,
+    page_size: int = ARCHIVE_PAGE_SIZE,
+) -> List[Path]:
+    """Write a feed in every format and its RSS archive pages; return their paths, the RSS feed first.
+
+    An archive page is rendered only when its items or links differ from
+    the ledger's record, or the file no longer holds what was written.
+    """
+
+    current, pages = split_archives(feed["items"], window=window, page_size=page_size)
+    self_path = feed["self_path"]
+    links = [("prev-archive", archive_url(self_path, len(pages)))] if pages else []
+    feed_path = root / self_path.lstrip("/")
+    write_xml(feed_path, build_feed(**{**feed, "items": current, "links": links}), output)
+    atom_path = root / format_path(self_path, "atom").lstrip("/")
+    write_xml(atom_path, build_atom_feed(**{**feed, "items": current}), output)
+    json_path = root / format_path(self_path, "json").lstrip("/")
+    output.write_text(json_path, build_json_feed(**{**feed, "items": current}))
+    written = [feed_path, atom_path, json_path]
+    for number, page in enumerate(pages, start=1):
+        page_links = [("current", self_path)]
+        if number > 1:
+            page_links.append(("prev-archive", archive_url(self_path, number - 1)))
+        if number < len(pages):
+            page_links.append(("next-archive", archive_url(self_path, number + 1)))
+        spec = {
+            **feed,
+            "title": f"{feed['title']} - Archive {number}",
+            "self_path": archive_url(self_path, number),
+            "items": page,
+            "links": page_links,
+            "archive": True,
+        }
+        path = root / spec["self_path"].lstrip("/")
+        relative = path.relative_to(root).as_posix()
+        key = content_digest(spec)
+        record = ledger.get(relative)
+        if record and record["key"] == key and output.exists(path) and hashlib.sha256(output.read_bytes(path)).hexdigest() == record["output"]:
+            output.keep(path)
+        else:
+            text = build_feed(**spec)
+            write_xml(path, text, output)
+            ledger[relative] = {"key": key, "output": hashlib.sha256(text.encode("utf-8")).hexdigest()}
+        written.append(path)
+    archive_dir = feed_path.with_name(f"{feed_path.stem}-archive")
+    for stale in sorted(set(archive_dir.glob("*.xml")) - set(written)):
+        output.delete(stale)
+    return written
+
+
+def tag_feeds(news_items: List[dict]) -> List[dict]:
+    """Return one news feed per tag, in tag order, each filtered from the sorted news items.
+
+    Tags that differ only in case or accents share a slug and so one feed.
+    """
+
+    feeds = []
+    for slug, (tag, items) in group_by_tag(news_items, lambda item: item["categories"]).items():
+        feeds.append(
+            {
+                "title": f"{SITE_FEEDS['news']['title']}: {tag}",
+                "description": f"News tagged {tag} from SEIU Local 503 at Oregon State University.",
+                "self_path": f"/news/tags/{slug}/rss.xml",
+                "items": items,
+            }
+        )
+    return feeds
+
+
+def prune_tag_feeds(root: Path, written: List[Path], output: Optional[SiteOutput] = None) -> None:
+    """Delete the feeds of tags no public story uses any more."""
 
-    return rss
+    output = output or SiteOutput(root)
+    kept = set(written)
+    tags_dir = root / "news" / "tags"
+    names = [name for name, _, _ in FEED_FORMATS.values() if name] + ["rss.xml"]
+    for folder in sorted(tags_dir.glob("*/")):
+        stale = [path for path in [*(folder / name for name in names), *folder.glob("rss-archive/*.xml")] if path.is_file() and path not in kept]
+        for path in stale:
+            output.delete(path)
+        if not output.in_place:
+            continue
+        for directory in (folder / "rss-archive", folder):
+            if directory.is_dir() and not any(directory.iterdir()):
+                directory.rmdir()
 
 
-def build_news_items(news_data: List[dict]) -> List[dict]:
-    public_news = [article for article in news_data if is_public_news_article(article)]
-    sorted_news = sorted(
-        public_news,
-        key=lambda n: parse_date(n.get("publishedAt") or n.get("createdAt")),
-        reverse=True,
-    )
+def build_news_items(articles: List[NewsArticle]) -> List[dict]:
+    public_news = [article for article in articles if is_public_news_article(article)]
+    sorted_news = sorted(public_news, key=lambda article: article.dated_at or EPOCH, reverse=True)
 
     items: List[dict] = []
     for article in sorted_news:
-        link = absolute_url(article.get("url", ""))
-        description = article.get("description", "")
+        link = absolute_url(article.url)
         items.append(
             {
-                "title": article.get("title", "Untitled News"),
+                "title": article.title or "Untitled News",
                 "link": link,
-                "description": description,
-                "pub_date": parse_date(article.get("publishedAt") or article.get("createdAt")),
+                "description": article.description,
+                "pub_date": article.dated_at or EPOCH,
                 "guid": link,
                 "guid_is_permalink": True,
-                "categories": article.get("tags", []),
+                "categories": list(article.tags),
             }
         )
     return items
 
 
-def build_event_items(events_data: List[dict]) -> List[dict]:
-    sorted_events = sorted(events_data, key=lambda e: parse_date(e.get("date")))
+def build_event_items(events: Iterable[Event]) -> List[dict]:
+    sorted_events = sorted(events, key=lambda event: event.starts_at or EPOCH)
     items: List[dict] = []
     for event in sorted_events:
-        link = absolute_url(event.get("url", ""))
-        event_date = event.get("date", "")
-        time_text = event.get("time", "").strip()
-        location = event.get("location_detail", "").strip()
-        description_parts = [event.get("description", "").strip()]
-        if event_date:
-            description_parts.append(f"Date: {event_date}")
-        if time_text:
-            description_parts.append(f"Time: {time_text}")
-        if location:
-            description_parts.append(f"Location: {location}")
+        title = event.title or "Untitled Event"
+        description_parts = [event.description.strip()]
+        if event.date_text:
+            description_parts.append(f"Date: {event.date_text}")
+        if event.time.strip():
+            description_parts.append(f"Time: {event.time.strip()}")
+        if event.location.strip():
+            description_parts.append(f"Location: {event.location.strip()}")
         description = " | ".join([part for part in description_parts if part])
-        event_guid = f"event:{event_date}:{event.get('title', 'Untitled Event')}"
         items.append(
             {
-                "title": event.get("title", "Untitled Event"),
-                "link": link,
+                "title": title,
+                "link": absolute_url(event.url),
                 "description": description,
-                "pub_date": parse_date(event.get("date")),
-                "guid": event_guid,
+                "pub_date": event.starts_at or EPOCH,
+                "guid": f"event:{event.date_text}:{title}",
                 "guid_is_permalink": False,
-                "categories": [event.get("type", "Event")] if event.get("type") else ["Event"],
+                "categories": [event.type or "Event"],
             }
         )
     return items
 
 
-def event_entries(payload: object) -> List[dict]:
-    if not isinstance(payload, dict) or not isinstance(payload.get("events"), list):
-        raise ValueError("events/events.json must contain an object with an `events` array")
-    return payload["events"]
-
-
 def build_combined_items(news_items: List[dict], event_items: List[dict]) -> List[dict]:
     combined: List[dict] = []
     for item in news_items:
@@ -203,45 +510,48 @@ def build_combined_items(news_items: List[dict], event_items: List[dict]) -> Lis
     return sorted(combined, key=lambda i: i["pub_date"], reverse=True)
 
 
-def write_xml(path: Path, xml_root: ET.Element) -> None:
-    content = prettify_xml(xml_root)
-    path.write_text(content, encoding="utf-8")
-
+def write_xml(path: Path, content: str, output: Optional[SiteOutput] = None) -> None:
+    (output or SiteOutput(path.parent)).write_text(path, content)
 
-def main() -> None:
-    news_data = json.loads(NEWS_JSON_PATH.read_text(encoding="utf-8"))
-    events_data = event_entries(json.loads(EVENTS_JSON_PATH.read_text(encoding="utf-8")))
 
-    news_items = build_news_items(news_data)
-    event_items = build_event_items(events_data)
+def generate(
+    root: Path = ROOT,
+    *,
+    articles: Optional[List[NewsArticle]] = None,
+    event_calendar: Optional[EventCalendar] = None,
+    output: Optional[SiteOutput] = None,
+    window: int = FEED_WINDOW,
+    page_size: int = ARCHIVE_PAGE_SIZE,
+) -> List[Path]:
+    """Write every feed in every format, and the RSS archives; return the written paths."""
+
+    if articles is None:
+        articles = read_news(root)
+    if event_calendar is None:
+        event_calendar = read_events(root)
+
+    news_items = build_news_items(articles)
+    event_items = build_event_items(event_calendar.events)
     combined_items = build_combined_items(news_items, event_items)
 
-    news_feed = build_feed(
-        title="SEIU Local 503 at OSU - News",
-        description="News and updates from SEIU Local 503 at Oregon State University.",
-        self_path="/news/rss.xml",
-        items=news_items,
-    )
-    events_feed = build_feed(
-        title="SEIU Local 503 at OSU - Events",
-        description="Upcoming events from SEIU Local 503 at Oregon State University.",
-        self_path="/events/rss.xml",
-        items=event_items,
-    )
-    combined_feed = build_feed(
-        title="SEIU Local 503 at OSU - News and Events",
-        description="Combined news and event updates from SEIU Local 503 at Oregon State University.",
-        self_path="/feed.xml",
-        items=combined_items,
-    )
-
-    write_xml(NEWS_RSS_PATH, news_feed)
-    write_xml(EVENTS_RSS_PATH, events_feed)
-    write_xml(COMBINED_RSS_PATH, combined_feed)
-
-    print(f"Wrote {NEWS_RSS_PATH}")
-    print(f"Wrote {EVENTS_RSS_PATH}")
-    print(f"Wrote {COMBINED_RSS_PATH}")
+    items = {"news": news_items, "events": event_items, "all": combined_items}
+    feeds = [{**feed, "items": items[key]} for key, feed in SITE_FEEDS.items()] + tag_feeds(news_items)
+    output = output or SiteOutput(root)
+    ledger_path = root / ARCHIVE_LEDGER
+    ledger = load_ledger(ledger_path)
+    written: List[Path] = []
+    for feed in feeds:
+        written += write_feeds(root, feed, output, ledger, window=window, page_size=page_size)
+    prune_tag_feeds(root, written, output)
+    if output.in_place:
+        kept = {path.relative_to(root).as_posix() for path in written}
+        save_ledger(ledger_path, {relative: record for relative, record in ledger.items() if relative in kept})
+    return written
+
+
+def main() -> None:
+    for path in generate():
+        print(f"Wrote {path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""Build the static site-search index from every public page.
+
+The visible text of each indexed page, without the shared header and footer,
+goes into an inverted index: each term maps to the pages that contain it,
+with a weight favouring matches in the title and description. The index is
+split into shards by the first two characters of each term, and a shard
+over ``MAX_SHARD_BYTES`` is split again by the next character, so the search
+page downloads only the shards for the words being typed:
+
+* ``search/index.json``: the manifest, with the shard prefixes and a revision
+  hash that clients add to shard URLs for cache busting;
+* ``search/terms/<prefix>.json``: ``{term: [page, weight, page, weight, ...]}``;
+* ``search/pages/<n>.json``: title, URL and description for a block of pages.
+
+``tokens`` and ``lookup`` define the matching that ``js/site-search.js``
+implements in the browser.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Callable, Iterable
+
+from public_pages import BASE_URL, ROOT, PageCorpus, PublicPage, discover_public_pages
+from site_output import SiteOutput
+from sync_site_shell import MARKED_FOOTER_RE, MARKED_HEADER_RE
+
+
+SEARCH_DIR = Path("search")
+SEARCH_INDEX_VERSION = 1
+PREFIX_LENGTH = 2
+MAX_PREFIX_LENGTH = 4
+MAX_SHARD_BYTES = 32 * 1024
+PAGES_PER_SHARD = 100
+TITLE_WEIGHT = 8
+DESCRIPTION_WEIGHT = 3
+SKIPPED_TAGS = {"head", "script", "style", "noscript", "template", "svg", "iframe"}
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or our that the their this to was we were will with you your".split()
+)
+
+
+@dataclass(frozen=True)
+class SearchDocument:
+    url: str
+    title: str
+    description: str
+    text: str
+
+
+class VisibleTextParser(HTMLParser):
+    """Collect a page's title, meta description and the text a reader sees."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.title: list[str] = []
+        self.description = ""
+        self.text: list[str] = []
+        self.skipping: list[str] = []
+        self.in_title = False
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag == "title":
+            self.in_title = True
+        elif tag == "meta":
+            values = {key.lower(): value or "" for key, value in attrs}
+            if values.get("name", "").lower() == "description":
+                self.description = values.get("content", "")
+        if tag in SKIPPED_TAGS:
+            self.skipping.append(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "title":
+            self.in_title = False
+        if tag in SKIPPED_TAGS and tag in self.skipping:
+            while self.skipping.pop() != tag:
+                pass
+
+    def handle_data(self, data: str) -> None:
+        if self.in_title:
+            self.title.append(data)
+        elif not self.skipping:
+            self.text.append(data)
+
+
+def extract_document(url: str, source: str) -> SearchDocument:
+    """Return the searchable parts of one page; the site shell is left out."""
+
+    source = MARKED_FOOTER_RE.sub("", MARKED_HEADER_RE.sub("", source))
+    parser = VisibleTextParser()
+    parser.feed(source)
+    parser.close()
+    title = " ".join("".join(parser.title).split())
+    return SearchDocument(url, title, " ".join(parser.description.split()), " ".join(" ".join(parser.text).split()))
+
+
+def tokens(text: str) -> list[str]:
+    """Lower-case ASCII terms of two or more characters, accents folded, stop words dropped."""
+
+    folded = "".join(char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char))
+    return [term for term in TOKEN_RE.findall(folded.lower()) if len(term) >= PREFIX_LENGTH and term not in STOP_WORDS]
+
+
+def encode(value: object) -> bytes:
+    return (json.dumps(value, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def build_index(documents: list[SearchDocument]) -> dict[str, object]:
+    """Map each index file's path under ``search/`` to its content, the manifest last."""
+
+    postings: dict[str, dict[int, int]] = defaultdict(dict)
+    for number, document in enumerate(documents):
+        weights: Counter[str] = Counter(tokens(document.text))
+        for term in tokens(document.title):
+            weights[term] += TITLE_WEIGHT
+        for term in tokens(document.description):
+            weights[term] += DESCRIPTION_WEIGHT
+        for term, weight in weights.items():
+            postings[term][number] = weight
+
+    groups: dict[str, dict[str, list[int]]] = defaultdict(dict)
+    for term in sorted(postings):
+        groups[term[:PREFIX_LENGTH]][term] = [value for item in sorted(postings[term].items()) for value in item]
+    shards: dict[str, dict[str, list[int]]] = {}
+    for prefix, terms in groups.items():
+        split_shard(prefix, terms, shards)
+
+    files: dict[str, object] = {f"terms/{prefix}.json": terms for prefix, terms in sorted(shards.items())}
+    for start in range(0, len(documents), PAGES_PER_SHARD):
+        files[f"pages/{start // PAGES_PER_SHARD}.json"] = [
+            [document.url, document.title, document.description] for document in documents[start : start + PAGES_PER_SHARD]
+        ]
+    revision = hashlib.sha256()
+    for path, content in files.items():
+        revision.update(path.encode("utf-8") + encode(content))
+    files["index.json"] = {
+        "version": SEARCH_INDEX_VERSION,
+        "prefixLength": PREFIX_LENGTH,
+        "pagesPerShard": PAGES_PER_SHARD,
+        "pages": len(documents),
+        "stopWords": sorted(STOP_WORDS),
+        "prefixes": sorted(shards),
+        "revision": revision.hexdigest()[:12],
+    }
+    return files
+
+
+def split_shard(prefix: str, terms: dict[str, list[int]], shards: dict[str, dict[str, list[int]]]) -> None:
+    """Add ``terms`` to ``shards`` under ``prefix``, or under longer prefixes if they are too large.
+
+    A term no longer than ``prefix`` stays in a shard named by the prefix itself.
+    """
+
+    if len(prefix) >= MAX_PREFIX_LENGTH or len(terms) == 1 or len(encode(terms)) <= MAX_SHARD_BYTES:
+        shards[prefix] = terms
+        return
+    groups: dict[str, dict[str, list[int]]] = defaultdict(dict)
+    for term, posting in terms.items():
+        groups[term[: len(prefix) + 1]][term] = posting
+    for longer, group in groups.items():
+        if longer == prefix:
+            shards[prefix] = group
+        else:
+            split_shard(longer, group, shards)
+
+
+def shards_for(term: str, prefixes: Iterable[str]) -> list[str]:
+    """The shards that can hold index terms starting with ``term``."""
+
+    return [prefix for prefix in prefixes if term.startswith(prefix) or prefix.startswith(term)]
+
+
+def lookup(query: str, load: Callable[[str], dict], prefixes: Iterable[str]) -> list[tuple[int, int]]:
+    """Return ``(page, score)`` for pages matching every query term, best first.
+
+    Each query term matches the index terms it is a prefix of, so results
+    update as a word is typed. ``prefixes`` names the shards, as listed in
+    the manifest, and ``load`` returns the ``terms/<prefix>.json`` shard.
+    """
+
+    prefixes = list(prefixes)
+    scores: dict[int, int] | None = None
+    for query_term in dict.fromkeys(tokens(query)):
+        matched: dict[int, int] = defaultdict(int)
+        for prefix in shards_for(query_term, prefixes):
+            for term, posting in load(prefix).items():
+                if term.startswith(query_term):
+                    for index in range(0, len(posting), 2):
+                        matched[posting[index]] += posting[index + 1]
+        if scores is None:
+            scores = dict(matched)
+        else:
+            scores = {page: score + matched[page] for page, score in scores.items() if page in matched}
+        if not scores:
+            return []
+    return sorted((scores or {}).items(), key=lambda item: (-item[1], item[0]))
+
+
+def relative_url(canonical_url: str) -> str:
+    return canonical_url.removeprefix(BASE_URL) or "/"
+
+
+def documents(pages: Iterable[PublicPage], corpus: PageCorpus) -> list[SearchDocument]:
+    """Search documents for every page the sitemap lists; noindex pages are skipped."""
+
+    return [extract_document(relative_url(page.canonical_url), corpus.text(page.path)) for page in pages if page.in_sitemap]
+
+
+def build(
+    root: Path = ROOT,
+    *,
+    pages: list[PublicPage] | None = None,
+    corpus: PageCorpus | None = None,
+    output: SiteOutput | None = None,
+) -> list[Path]:
+    """Write the search index; return the written paths.
+
+    Writing in place also deletes shards that the new index no longer has.
+    """
+
+    output = output or SiteOutput(root)
+    corpus = corpus or PageCorpus(root, output=output)
+    if pages is None:
+        pages = discover_public_pages(root, include_404=False, corpus=corpus)
+    directory = root / SEARCH_DIR
+    written = []
+    for relative, content in build_index(documents(pages, corpus)).items():
+        path = directory / relative
+        output.write_bytes(path, encode(content))
+        written.append(path)
+    for stale in sorted(set(directory.rglob("*.json")) - set(written)):
+        output.delete(stale)
+    return written
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--root", type=Path, default=ROOT, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    root = args.root.resolve()
+    output = SiteOutput(root)
+    written = build(root, output=output)
+    size = sum(path.stat().st_size for path in written)
+    print(f"Wrote {len(output.updated)} of {len(written)} search index file(s) under {SEARCH_DIR.as_posix()}/ ({size / 1024:.0f} KiB)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -10,6 +10,7 @@ from pathlib import Path
 from urllib.parse import urlparse
 
 from public_pages import BASE_URL, ROOT
+from site_output import SiteOutput
 from sync_site_shell import sync_source
 
 
@@ -98,13 +99,17 @@ def load_manifest(path: Path = MANIFEST) -> list[dict[str, str]]:
     return entries
 
 
-def generate(root: Path = ROOT, entries: list[dict[str, str]] | None = None) -> list[Path]:
+def generate(
+    root: Path = ROOT,
+    entries: list[dict[str, str]] | None = None,
+    output: SiteOutput | None = None,
+) -> list[Path]:
+    output = output or SiteOutput(root)
     output_paths: list[Path] = []
     for entry in entries if entries is not None else load_manifest():
-        output = root / entry["slug"] / "index.html"
-        output.parent.mkdir(parents=True, exist_ok=True)
-        output.write_text(render_redirect(entry), encoding="utf-8")
-        output_paths.append(output)
+        path = root / entry["slug"] / "index.html"
+        output.write_text(path, render_redirect(entry))
+        output_paths.append(path)
     return output_paths
 
 
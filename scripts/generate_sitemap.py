@@ -1,38 +1,247 @@
 #!/usr/bin/env python3
-"""Generate the public sitemap from the shared public-page manifest."""
+"""Generate the public sitemap index and per-section sitemaps from the shared public-page manifest.
+
+``sitemap.xml`` is a sitemap index. It lists one sitemap per section
+(``sitemaps/news.xml``, ``events.xml``, ``resources.xml``, ``bargaining.xml``
+and ``pages.xml`` for everything else), each with the newest ``lastmod`` of
+its pages, so crawlers re-fetch only the sections that changed. Each URL
+carries its own ``<lastmod>`` and, when the page has one, its lead image:
+the first ``<img>`` in ``<main>``.
+
+``lastmod`` comes from ``data/sitemap-ledger.json``, committed with the
+pages. The ledger holds a hash of each page's content, with the shared site
+shell left out, and the date that hash was first seen. A page whose hash is
+unchanged keeps its date and recorded image without being parsed again, so
+a rebuild on a later day reproduces the same sitemaps.
+
+Pages are not re-read to find that out. ``.build-cache/sitemap-pages.json``
+keeps each page's hash beside the size and mtime the page index saw, and
+only a page whose size or mtime differs, or that a build step rewrote, is
+read and hashed again.
+"""
 
 from __future__ import annotations
 
+import hashlib
+import json
+from datetime import datetime
 from pathlib import Path
+from typing import Callable
+from urllib.parse import urljoin
 from xml.sax.saxutils import escape
 
-from public_pages import BASE_URL, ROOT, sitemap_urls
+from content import OREGON_TZ
+from lcp_image_audit import main_images
+from public_pages import BASE_URL, ROOT, PageCorpus, PublicPage, discover_public_pages
+from site_output import SiteOutput
+from sync_site_shell import MARKED_FEEDS_RE, MARKED_FOOTER_RE, MARKED_HEADER_RE
+
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+IMAGE_NS = "http://www.google.com/schemas/sitemap-image/1.1"
+SITEMAP_DIR = Path("sitemaps")
+LEDGER = Path("data") / "sitemap-ledger.json"
+LEDGER_VERSION = 1
+HASH_CACHE = Path(".build-cache") / "sitemap-pages.json"
+HASH_CACHE_VERSION = 1
+# Repo-relative path prefixes of each section; other pages go in ``pages``.
+SECTIONS = (
+    ("news", ("news/", "news.html")),
+    ("events", ("events/", "events.html")),
+    ("resources", ("resources/", "resources.html")),
+    ("bargaining", ("2026-bargaining/",)),
+)
+DEFAULT_SECTION = "pages"
+
+
+def section_of(url: str) -> str:
+    relative = url.removeprefix(BASE_URL).lstrip("/")
+    for name, prefixes in SECTIONS:
+        if relative.startswith(prefixes):
+            return name
+    return DEFAULT_SECTION
+
+
+def content_hash(text: str) -> str:
+    """Hash a page without its shared header, footer and feed links, which change site-wide."""
+
+    for region in (MARKED_HEADER_RE, MARKED_FOOTER_RE, MARKED_FEEDS_RE):
+        text = region.sub("", text)
+    return hashlib.sha256(text.encode("utf-8", errors="surrogateescape")).hexdigest()[:16]
+
+
+def lead_image(url: str, text: str) -> str:
+    images = main_images(text)
+    src = images[0].attrs.get("src", "").strip() if images else ""
+    if not src or src.startswith("data:"):
+        return ""
+    return urljoin(url, src)
+
+
+def load_ledger(path: Path, output: SiteOutput) -> dict[str, dict[str, str]]:
+    try:
+        data = json.loads(output.read_text(path)) if output.exists(path) else {}
+    except ValueError:
+        return {}
+    if not isinstance(data, dict) or data.get("version") != LEDGER_VERSION or not isinstance(data.get("pages"), dict):
+        return {}
+    return data["pages"]
+
+
+def load_hashes(path: Path) -> dict[str, list]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != HASH_CACHE_VERSION or not isinstance(data.get("pages"), dict):
+        return {}
+    return data["pages"]
+
+
+def save_hashes(path: Path, hashes: dict[str, list]) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"version": HASH_CACHE_VERSION, "pages": hashes}, sort_keys=True, separators=(",", ":")) + "\n", encoding="utf-8")
+    except OSError:
+        return
+
 
+def page_hashes(root: Path, paths: dict[str, Path], corpus: PageCorpus, output: SiteOutput) -> dict[str, str]:
+    """Return the content hash of each page in ``paths`` (path by URL), reading only pages changed on disk.
 
-def render_sitemap(urls: list[str]) -> str:
+    The hash cache is only saved by in-place builds, so a check build leaves the tree untouched.
+    """
+
+    # Discovery attaches the page index's size and mtime to each page; in a build it has already run.
+    corpus.public_pages()
+    cache_path = root / HASH_CACHE
+    cached = load_hashes(cache_path)
+    hashes: dict[str, list] = {}
+    digests = {}
+    for url, path in paths.items():
+        relative = path.relative_to(root).as_posix()
+        # Pages a build step rewrote carry no metadata; their text is already in memory.
+        metadata = corpus.page(path).metadata
+        stat = [metadata.size, metadata.mtime_ns] if metadata else None
+        entry = cached.get(relative)
+        if stat and entry and entry[:2] == stat:
+            digests[url] = entry[2]
+        else:
+            digests[url] = content_hash(corpus.text(path))
+        if stat:
+            hashes[relative] = [*stat, digests[url]]
+    if output.in_place and hashes != cached:
+        save_hashes(cache_path, hashes)
+    return digests
+
+
+def update_ledger(
+    ledger: dict[str, dict[str, str]],
+    digests: dict[str, str],
+    read: Callable[[str], str],
+    today: str,
+) -> dict[str, dict[str, str]]:
+    """Return the ledger for ``digests`` (content hash by URL).
+
+    Unchanged pages keep their record; changed ones date from ``today`` and
+    are read, through ``read(url)``, for their lead image.
+    """
+
+    updated = {}
+    for url, digest in sorted(digests.items()):
+        record = ledger.get(url)
+        if record and record.get("hash") == digest:
+            updated[url] = record
+            continue
+        updated[url] = {"hash": digest, "lastmod": today}
+        image = lead_image(url, read(url))
+        if image:
+            updated[url]["image"] = image
+    return updated
+
+
+def render_sitemap(entries: dict[str, dict[str, str]]) -> str:
     rows = [
         '<?xml version="1.0" encoding="UTF-8"?>',
-        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+        f'<urlset xmlns="{SITEMAP_NS}" xmlns:image="{IMAGE_NS}">',
     ]
-    for url in urls:
-        rows.extend(("  <url>", f"    <loc>{escape(url)}</loc>", "  </url>"))
+    for url, record in sorted(entries.items()):
+        rows.extend(("  <url>", f"    <loc>{escape(url)}</loc>", f"    <lastmod>{record['lastmod']}</lastmod>"))
+        if record.get("image"):
+            rows.extend(("    <image:image>", f"      <image:loc>{escape(record['image'])}</image:loc>", "    </image:image>"))
+        rows.append("  </url>")
     rows.append("</urlset>")
     return "\n".join(rows) + "\n"
 
 
-def ensure_robots_sitemap(robots_path: Path) -> None:
+def render_index(sitemaps: list[tuple[str, str]]) -> str:
+    rows = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        f'<sitemapindex xmlns="{SITEMAP_NS}">',
+    ]
+    for url, lastmod in sitemaps:
+        rows.extend(("  <sitemap>", f"    <loc>{escape(url)}</loc>", f"    <lastmod>{lastmod}</lastmod>", "  </sitemap>"))
+    rows.append("</sitemapindex>")
+    return "\n".join(rows) + "\n"
+
+
+def ensure_robots_sitemap(robots_path: Path, output: SiteOutput | None = None) -> None:
+    output = output or SiteOutput(robots_path.parent)
     entry = f"Sitemap: {BASE_URL}/sitemap.xml"
-    source = robots_path.read_text(encoding="utf-8") if robots_path.exists() else ""
+    source = output.read_text(robots_path) if output.exists(robots_path) else ""
     if entry in source.splitlines():
         return
-    robots_path.write_text(source.rstrip() + f"\n\n{entry}\n", encoding="utf-8")
+    output.write_text(robots_path, source.rstrip() + f"\n\n{entry}\n")
+
+
+def generate(
+    root: Path = ROOT,
+    pages: list[PublicPage] | None = None,
+    output: SiteOutput | None = None,
+    corpus: PageCorpus | None = None,
+    today: str | None = None,
+) -> list[Path]:
+    """Write the sitemap index, the section sitemaps and the ledger; return their paths, the index first."""
+
+    output = output or SiteOutput(root)
+    corpus = corpus or PageCorpus(root, output=output)
+    if pages is None:
+        pages = discover_public_pages(root, include_404=False, corpus=corpus)
+    today = today or datetime.now(OREGON_TZ).date().isoformat()
+    paths: dict[str, Path] = {}
+    for page in sorted(pages, key=lambda page: page.path):
+        if page.in_sitemap:
+            paths.setdefault(page.canonical_url, page.path)
+
+    ledger_path = root / LEDGER
+    digests = page_hashes(root, paths, corpus, output)
+    ledger = update_ledger(load_ledger(ledger_path, output), digests, lambda url: corpus.text(paths[url]), today)
+    output.write_text(ledger_path, json.dumps({"version": LEDGER_VERSION, "pages": ledger}, indent=2) + "\n")
+
+    by_section: dict[str, dict[str, dict[str, str]]] = {}
+    for url, record in ledger.items():
+        by_section.setdefault(section_of(url), {})[url] = record
+    written = []
+    index = []
+    for name in [name for name, _ in SECTIONS] + [DEFAULT_SECTION]:
+        if name not in by_section:
+            continue
+        path = root / SITEMAP_DIR / f"{name}.xml"
+        output.write_text(path, render_sitemap(by_section[name]))
+        written.append(path)
+        index.append((f"{BASE_URL}/{SITEMAP_DIR.as_posix()}/{name}.xml", max(record["lastmod"] for record in by_section[name].values())))
+    for stale in sorted(set((root / SITEMAP_DIR).glob("*.xml")) - set(written)):
+        output.delete(stale)
+
+    index_path = root / "sitemap.xml"
+    output.write_text(index_path, render_index(index))
+    ensure_robots_sitemap(root / "robots.txt", output)
+    return [index_path, *written, ledger_path]
 
 
 def main() -> None:
-    output = ROOT / "sitemap.xml"
-    output.write_text(render_sitemap(sitemap_urls(ROOT)), encoding="utf-8")
-    ensure_robots_sitemap(ROOT / "robots.txt")
-    print(f"Wrote {output}")
+    for path in generate():
+        print(f"Wrote {path}")
 
 
 if __name__ == "__main__":
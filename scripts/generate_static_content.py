@@ -9,50 +9,60 @@ from __future__ import annotations
 
 import argparse
 import calendar
-import html
+import hashlib
 import json
 import re
-from datetime import datetime
+from datetime import date
+from functools import lru_cache
 from pathlib import Path
-from typing import Callable
+from typing import Callable, Iterable
+
+import site_templates
+from content import Event, EventCalendar, NewsArticle, load_events, read_events, read_news
+from image_manifest import ImageManifest, ResponsiveImage, scan as scan_images
+from site_output import SiteOutput
+from site_templates import FragmentCache, Template, esc
 
 
 ROOT = Path(__file__).resolve().parents[1]
 BASE_URL = "https://www.local083.org"
+FRAGMENT_CACHE = Path(".build-cache") / "static-fragments.json"
+DEFAULT_IMAGE = "/images/card.webp"
 
+# The inline fallback arrays carry only what the page scripts render from;
+# the full sources are fetched as JSON.
+NEWS_FALLBACK_FIELDS = ("title", "description", "url", "image", "alt", "tags", "author", "publishedAt", "featured")
+EVENT_FALLBACK_FIELDS = ("date", "time", "title", "type", "url", "location_detail")
+FALLBACK_NEWS_LIMIT = 8
+FALLBACK_BUDGETS = {"fallbackNews": 10 * 1024, "fallbackEvents": 6 * 1024, "newsImages": 10 * 1024}
 
-def esc(value: object) -> str:
-    return html.escape(str(value or ""), quote=True)
-
-
-def date_value(value: str) -> datetime:
-    return datetime.strptime(value, "%Y-%m-%d")
 
+def long_date(day: date) -> str:
+    return f"{day.strftime('%B')} {day.day}, {day.year}"
 
-def long_date(value: str) -> str:
-    date = date_value(value)
-    return f"{date.strftime('%B')} {date.day}, {date.year}"
 
+def short_date(day: date) -> str:
+    return f"{day.strftime('%b')} {day.day}, {day.year}"
 
-def short_date(value: str) -> str:
-    date = date_value(value)
-    return f"{date.strftime('%b')} {date.day}, {date.year}"
 
+def public_news(items: list[NewsArticle]) -> list[NewsArticle]:
+    """Return only committed public stories; scheduling changes status first.
 
-def public_news(items: list[dict]) -> list[dict]:
-    """Return only committed public stories; scheduling changes status first."""
-    published = [item for item in items if item.get("status", "published") == "published"]
-    return sorted(published, key=lambda item: item.get("publishedAt", ""), reverse=True)
+    A story without a valid ``publishedAt`` has no date to show or sort by,
+    so it stays off the site like a draft.
+    """
+    published = [item for item in items if item.status == "published" and item.published_on]
+    return sorted(published, key=lambda item: item.published, reverse=True)
 
 
-def renderable_events(items: list[dict]) -> list[dict]:
-    valid = [item for item in items if item.get("date") and item.get("title") and item.get("url")]
+def renderable_events(items: Iterable[Event]) -> list[Event]:
+    valid = [item for item in items if item.date and item.title and item.url]
     if not valid:
         raise ValueError("events/events.json contains no renderable events")
     return valid
 
 
-def event_payload(data: object) -> tuple[datetime, list[dict]]:
+def event_payload(data: object) -> tuple[date, EventCalendar]:
     """Return the explicit editorial date and events from events.json.
 
     The committed fallback cannot use the build machine's clock without daily
@@ -60,37 +70,29 @@ def event_payload(data: object) -> tuple[datetime, list[dict]]:
     advance the calendar snapshot in the same JSON edit that adds new events.
     """
 
-    if not isinstance(data, dict):
-        raise ValueError("events/events.json must contain an object with `asOf` and `events`")
-    as_of = data.get("asOf")
-    events = data.get("events")
-    if not isinstance(as_of, str) or not re.fullmatch(r"\d{4}-\d{2}-\d{2}", as_of):
+    calendar_data = data if isinstance(data, EventCalendar) else load_events(data)
+    if calendar_data.as_of is None:
         raise ValueError("events/events.json `asOf` must use YYYY-MM-DD")
-    if not isinstance(events, list):
-        raise ValueError("events/events.json `events` must be an array")
-    return date_value(as_of), events
+    return calendar_data.as_of, calendar_data
+
 
+def event_order(item: Event) -> tuple[date, str, str]:
+    return item.date, item.time, item.title  # type: ignore[return-value]
 
-def snapshot_event_month(items: list[dict], as_of: datetime) -> tuple[int, int, list[dict]]:
+
+def snapshot_event_month(items: Iterable[Event], as_of: date) -> tuple[int, int, list[Event]]:
     valid = renderable_events(items)
-    future = [item for item in valid if date_value(item["date"]) >= as_of]
-    candidate_months = {
-        (date_value(item["date"]).year, date_value(item["date"]).month)
-        for item in (future or valid)
-    }
-    year, month = min(candidate_months) if future else max(candidate_months)
+    future = [item for item in valid if item.date >= as_of]
+    year, month = (min if future else max)((item.date.year, item.date.month) for item in (future or valid))
     selected = sorted(
-        [item for item in valid if (date_value(item["date"]).year, date_value(item["date"]).month) == (year, month)],
-        key=lambda item: (item["date"], item.get("time", ""), item["title"]),
+        [item for item in valid if (item.date.year, item.date.month) == (year, month)],
+        key=event_order,
     )
     return year, month, selected
 
 
-def homepage_events(items: list[dict], as_of: datetime, limit: int = 2) -> list[dict]:
-    future = sorted(
-        (item for item in renderable_events(items) if date_value(item["date"]) >= as_of),
-        key=lambda item: (item["date"], item.get("time", ""), item["title"]),
-    )
+def homepage_events(items: Iterable[Event], as_of: date, limit: int = 2) -> list[Event]:
+    future = sorted((item for item in renderable_events(items) if item.date >= as_of), key=event_order)
     return future[:limit]
 
 
@@ -110,9 +112,9 @@ def event_icon(event_type: str = "") -> str:
     }[event_class(event_type)]
 
 
-def agenda_meta(event: dict) -> str:
-    raw = event.get("time", "")
-    location = event.get("location_detail") or "Details coming soon"
+def agenda_meta(event: Event) -> str:
+    raw = event.time
+    location = event.location or "Details coming soon"
     if raw == "12:00 PM - 1:00 PM":
         time = "Noon–1 p.m."
     elif raw.lower().startswith("evening"):
@@ -124,92 +126,202 @@ def agenda_meta(event: dict) -> str:
     return f"{time} · {location}" if time else location
 
 
+# One scan finds every splice point: the JSON-LD opener, `const x = [`
+# fallbacks and start tags that carry an id.
+SPLICE_POINT_RE = re.compile(
+    r"""(?P<json_ld><script\s+type=["']application/ld\+json["']>\s*)"""
+    r"""|(?P<array>const\s+(?P<variable>[A-Za-z_$][\w$]*)\s*=\s*\[)"""
+    r"""|(?P<element><(?P<tag>[a-zA-Z][\w:-]*)\b[^>]*\bid=["'](?P<id>[^"']*)["'][^>]*>)"""
+)
+JSON_LD_BODY_RE = re.compile(r"(\{.*?\})(\s*</script>)", re.DOTALL)
+JS_ARRAY_BODY_RE = re.compile(r".*?\];", re.DOTALL)
+
+
+@lru_cache(maxsize=None)
+def tag_token_re(tag: str) -> re.Pattern[str]:
+    return re.compile(rf"</?{re.escape(tag)}\b[^>]*>", re.IGNORECASE)
+
+
+def render_js_array(indent: str, variable: str, items: list[dict]) -> str:
+    rendered = json.dumps(items, ensure_ascii=False, indent=2).replace("</", "<\\/")
+    indented = rendered.replace("\n", "\n" + indent)
+    return f"{indent}const {variable} = {indented};"
+
+
+def element_end(source: str, tag: str, start: int) -> re.Match[str] | None:
+    """Return the closing tag that balances an element whose start tag ends at ``start``."""
+
+    depth = 1
+    for token in tag_token_re(tag).finditer(source, start):
+        if token.group(0).startswith("</"):
+            depth -= 1
+        elif not token.group(0).rstrip().endswith("/>"):
+            depth += 1
+        if depth == 0:
+            return token
+    return None
+
+
+def splice_regions(
+    source: str,
+    *,
+    elements: dict[str, str] | None = None,
+    arrays: dict[str, list[dict]] | None = None,
+    json_ld: Callable[[list[dict]], None] | None = None,
+) -> str:
+    """Replace generated regions of one page in a single forward scan.
+
+    ``elements`` maps element IDs to their new inner HTML, ``arrays`` maps
+    ``const`` fallback variables to their new items and ``json_ld`` updates
+    the ``@graph`` of the first JSON-LD block. The first match of each region
+    is replaced, as with one ``replace_element_inner`` call per region, but
+    the page is scanned once and the result assembled in one join, so the
+    cost no longer grows with the number of regions times the page size.
+    Requested regions may not nest; a nested one raises ``ValueError``.
+    """
+
+    elements = dict(elements or {})
+    arrays = dict(arrays or {})
+    edits: list[tuple[int, int, str]] = []
+    # The replaced element the scan is inside, and where its content ends.
+    # Its interior is still scanned so a requested region nested in it is
+    # reported as an overlap rather than as missing.
+    enclosing: tuple[str, int] | None = None
+    position = 0
+    while elements or arrays or json_ld:
+        match = SPLICE_POINT_RE.search(source, position)
+        if match is None:
+            break
+        position = match.end()
+        if enclosing is not None and match.start() >= enclosing[1]:
+            enclosing = None
+        if match.group("element") is not None:
+            element_id = match.group("id")
+            if element_id not in elements:
+                continue
+            if enclosing is not None:
+                raise ValueError(f"Generated regions overlap: #{element_id} is inside {enclosing[0]}")
+            end = element_end(source, match.group("tag"), match.end())
+            if end is None:
+                raise ValueError(f"Generated element is not closed: #{element_id}")
+            edits.append((match.end(), end.start(), "\n" + elements.pop(element_id).rstrip() + "\n"))
+            enclosing = (f"#{element_id}", end.start())
+        elif match.group("array") is not None:
+            variable = match.group("variable")
+            body = JS_ARRAY_BODY_RE.match(source, match.end()) if variable in arrays else None
+            if body is None:
+                continue
+            if enclosing is not None:
+                raise ValueError(f"Generated regions overlap: {variable} is inside {enclosing[0]}")
+            # The indentation before `const` is replaced along with the array.
+            line_start = match.start()
+            while line_start and source[line_start - 1] in " \t":
+                line_start -= 1
+            indent = source[line_start : match.start()]
+            edits.append((line_start, body.end(), render_js_array(indent, variable, arrays.pop(variable))))
+            position = body.end()
+        elif json_ld is not None:
+            body = JSON_LD_BODY_RE.match(source, match.end())
+            if body is None:
+                continue
+            if enclosing is not None:
+                raise ValueError(f"Generated regions overlap: the JSON-LD block is inside {enclosing[0]}")
+            data = json.loads(body.group(1))
+            graph = data.get("@graph") if isinstance(data, dict) else None
+            if not isinstance(graph, list):
+                raise ValueError("The first JSON-LD block has no @graph list")
+            json_ld(graph)
+            json_ld = None
+            edits.append((body.start(1), body.end(1), json.dumps(data, ensure_ascii=False, indent=2)))
+            position = body.end()
+
+    if elements:
+        raise ValueError(f"Required generated element is missing: #{next(iter(elements))}")
+    if arrays:
+        raise ValueError(f"Required JavaScript fallback is missing: {next(iter(arrays))}")
+    if json_ld is not None:
+        raise ValueError("Required @graph JSON-LD block was not found")
+
+    pieces: list[str] = []
+    previous = 0
+    for start, end, text in sorted(edits):
+        pieces += [source[previous:start], text]
+        previous = end
+    pieces.append(source[previous:])
+    return "".join(pieces)
+
+
 def replace_element_inner(source: str, element_id: str, inner: str) -> str:
+    """Replace one element's inner HTML; use ``splice_regions`` for several."""
+
     start = re.search(
         rf'<(?P<tag>[a-zA-Z][\w:-]*)\b[^>]*\bid=["\']{re.escape(element_id)}["\'][^>]*>',
         source,
     )
     if not start:
         raise ValueError(f"Required generated element is missing: #{element_id}")
-    tag = start.group("tag")
-    token_re = re.compile(rf'</?{re.escape(tag)}\b[^>]*>', re.IGNORECASE)
-    depth = 1
-    for token in token_re.finditer(source, start.end()):
-        if token.group(0).startswith("</"):
-            depth -= 1
-        elif not token.group(0).rstrip().endswith("/>"):
-            depth += 1
-        if depth == 0:
-            return source[: start.end()] + "\n" + inner.rstrip() + "\n" + source[token.start() :]
-    raise ValueError(f"Generated element is not closed: #{element_id}")
+    end = element_end(source, start.group("tag"), start.end())
+    if end is None:
+        raise ValueError(f"Generated element is not closed: #{element_id}")
+    return source[: start.end()] + "\n" + inner.rstrip() + "\n" + source[end.start() :]
 
 
 def replace_js_array(source: str, variable: str, items: list[dict]) -> str:
-    rendered = json.dumps(items, ensure_ascii=False, indent=2).replace("</", "<\\/")
-    pattern = re.compile(rf"(?P<indent>[ \t]*)const\s+{re.escape(variable)}\s*=\s*\[.*?\];", re.DOTALL)
-    match = pattern.search(source)
-    if not match:
-        raise ValueError(f"Required JavaScript fallback is missing: {variable}")
-    indent = match.group("indent")
-    indented = rendered.replace("\n", "\n" + indent)
-    return source[: match.start()] + f"{indent}const {variable} = {indented};" + source[match.end() :]
+    return splice_regions(source, arrays={variable: items})
 
 
 def update_json_ld(source: str, update: Callable[[list[dict]], None]) -> str:
-    pattern = re.compile(r'(<script\s+type=["\']application/ld\+json["\']>\s*)(\{.*?\})(\s*</script>)', re.DOTALL)
-    changed = False
-
-    def replace(match: re.Match[str]) -> str:
-        nonlocal changed
-        data = json.loads(match.group(2))
-        graph = data.get("@graph")
-        if not isinstance(graph, list):
-            return match.group(0)
-        update(graph)
-        changed = True
-        return match.group(1) + json.dumps(data, ensure_ascii=False, indent=2) + match.group(3)
-
-    rendered = pattern.sub(replace, source, count=1)
-    if not changed:
-        raise ValueError("Required @graph JSON-LD block was not found")
-    return rendered
+    return splice_regions(source, json_ld=update)
 
 
-def lead_image(article: dict) -> tuple[str, str, int, int]:
-    original = article.get("image") or "/images/card.webp"
-    if original == "/images/2cef7759-042d-4a05-9496-7eefff439a5e-june-30-rally-speaker-and-crowd.webp":
-        return (
-            "/images/2cef7759-042d-4a05-9496-7eefff439a5e-june-30-rally-speaker-and-crowd-960w.webp",
-            "/images/2cef7759-042d-4a05-9496-7eefff439a5e-june-30-rally-speaker-and-crowd-480w.webp 480w, /images/2cef7759-042d-4a05-9496-7eefff439a5e-june-30-rally-speaker-and-crowd-960w.webp 960w, /images/2cef7759-042d-4a05-9496-7eefff439a5e-june-30-rally-speaker-and-crowd-1440w.webp 1440w",
-            1800,
-            1084,
-        )
-    return original, "", 1200, 675
+@lru_cache(maxsize=None)
+def default_images() -> ImageManifest:
+    """The image manifest for renders outside build(); the site build scans once and passes it in."""
 
+    return scan_images(ROOT)
 
-def thumbnail_url(image: str) -> str:
-    known = {
-        "/images/card.webp": "/images/card-192.webp",
-        "/images/2026-bargaining-zoom-backgrounds.webp": "/images/2026-bargaining-zoom-backgrounds-192.webp",
-        "/images/3cd44f56-3666-4fa5-82ac-4bf3b8b00c0d-june-30-rally-speaker-with-camera.webp": "/images/3cd44f56-3666-4fa5-82ac-4bf3b8b00c0d-june-30-rally-speaker-with-camera-192.webp",
-        "/images/83a4a1c4-4d9a-482a-8ad9-a3e73c338df3-wngr-barg-update.webp": "/images/83a4a1c4-4d9a-482a-8ad9-a3e73c338df3-wngr-barg-update-192.webp",
-        "/images/2cef7759-042d-4a05-9496-7eefff439a5e-june-30-rally-speaker-and-crowd.webp": "/images/2cef7759-042d-4a05-9496-7eefff439a5e-june-30-rally-speaker-and-crowd-192.webp",
-    }.get(image)
-    if known:
-        return known
-    if image.endswith(".webp"):
-        candidate = image[:-5] + "-192.webp"
-        if (ROOT / candidate.lstrip("/")).is_file():
-            return candidate
-    return image or "/images/card.webp"
 
+def lead_image(article: NewsArticle, images: ImageManifest) -> ResponsiveImage:
+    return images.responsive(article.image or DEFAULT_IMAGE)
 
-def primary_topic(article: dict) -> str:
-    return (article.get("tags") or ["Update"])[0]
 
+def thumbnail_url(image: str, images: ImageManifest) -> str:
+    return images.thumbnail(image or DEFAULT_IMAGE)
 
-def news_theme(article: dict) -> str:
-    tags = set(article.get("tags") or [])
+
+def news_images(news: list[NewsArticle], images: ImageManifest) -> list[dict]:
+    """Sizes, variants and thumbnails of the news images, for the newsroom script.
+
+    Only the inline fallback stories need these; API stories carry their own.
+
+    ``src`` and ``thumbnail`` are left out when they are the image itself,
+    and ``srcset`` when there are no variants.
+    """
+
+    items = []
+    for url in dict.fromkeys(article.image or DEFAULT_IMAGE for article in news):
+        if images.get(url) is None:
+            continue
+        media = images.responsive(url)
+        item: dict[str, object] = {"image": url}
+        if media.src != url:
+            item["src"] = media.src
+        if media.srcset:
+            item["srcset"] = media.srcset
+        item.update(width=media.width, height=media.height)
+        thumbnail = images.thumbnail(url)
+        if thumbnail != url:
+            item["thumbnail"] = thumbnail
+        items.append(item)
+    return items
+
+
+def primary_topic(article: NewsArticle) -> str:
+    return (article.tags or ("Update",))[0]
+
+
+def news_theme(article: NewsArticle) -> str:
+    tags = set(article.tags)
     if tags & {"Events", "Membership Meetings"}:
         return "theme-events"
     if tags & {"Action", "Rally"}:
@@ -221,8 +333,8 @@ def news_theme(article: dict) -> str:
     return ""
 
 
-def news_icon(article: dict) -> tuple[str, str]:
-    tags = set(article.get("tags") or [])
+def news_icon(article: NewsArticle) -> tuple[str, str]:
+    tags = set(article.tags)
     if tags & {"Events", "Membership Meetings"}:
         return "◫", "latest-icon-events"
     if tags & {"Action", "Rally"}:
@@ -236,144 +348,309 @@ def news_icon(article: dict) -> tuple[str, str]:
     return "•", ""
 
 
-def choose_lead(news: list[dict]) -> dict:
-    return next((item for item in news if item.get("featured")), None) or next(
-        (item for item in news if item.get("image") and not item["image"].endswith("/card.webp")),
+def choose_lead(news: list[NewsArticle]) -> NewsArticle:
+    return next((item for item in news if item.featured), None) or next(
+        (item for item in news if item.image and not item.image.endswith("/card.webp")),
         news[0],
     )
 
 
-def render_news_flash(article: dict) -> str:
-    label = "Meeting update" if "Events" in (article.get("tags") or []) else "Latest update"
-    return f'''                <span class="flash-label">{esc(label)}</span>
-                <a href="{esc(article['url'])}">
-                    <span class="flash-copy"><strong>{esc(article['title'])}</strong> {esc(article.get('description'))}</span>
-                    <time class="flash-date" datetime="{esc(article['publishedAt'])}">{esc(short_date(article['publishedAt']))}</time>
-                </a>'''
+def choose_flash(news: list[NewsArticle]) -> NewsArticle:
+    return next((item for item in news if {"Events", "Update"}.issubset(set(item.tags))), news[0])
 
 
-def render_news_lead(article: dict) -> str:
-    src, srcset, width, height = lead_image(article)
-    responsive = f' srcset="{esc(srcset)}" sizes="(max-width: 767px) calc(100vw - 2rem), 55vw"' if srcset else ""
-    credit = '\n                        <span class="photo-credit">Photo by Sylv Sharp, SEIU 503</span>' if "mcnary-field-rally-recap" in article["url"] else ""
-    return f'''                    <a class="lead-image-wrap" href="{esc(article['url'])}">
-                        <img src="{esc(src)}"{responsive} alt="{esc(article.get('alt') or article['title'])}" width="{width}" height="{height}" fetchpriority="high">{credit}
-                    </a>
-                    <div class="lead-copy">
-                        <div class="story-kicker"><span>Lead story · {esc(primary_topic(article))}</span><time datetime="{esc(article['publishedAt'])}">{esc(long_date(article['publishedAt']))}</time></div>
-                        <h2>{esc(article['title'])}</h2>
-                        <p>{esc(article.get('description'))}</p>
-                        <a class="story-link" href="{esc(article['url'])}">Read the story <span aria-hidden="true">→</span></a>
-                    </div>'''
+def project(data: dict, fields: tuple[str, ...]) -> dict:
+    return {key: data[key] for key in fields if key in data}
 
 
-def render_latest(news: list[dict]) -> str:
-    rows = []
-    for article in news[:8]:
-        symbol, class_name = news_icon(article)
-        rows.append(f'''                        <a class="latest-item" href="{esc(article['url'])}">
-                            <span class="latest-thumb"><img src="{esc(thumbnail_url(article.get('image', '')))}" alt="" width="96" height="96" loading="lazy"><span class="latest-icon {class_name}" aria-hidden="true">{symbol}</span></span>
-                            <span class="latest-copy"><time class="latest-date" datetime="{esc(article['publishedAt'])}">{esc(short_date(article['publishedAt']))}</time><span class="latest-title">{esc(article['title'])}</span></span>
-                            <span class="latest-arrow" aria-hidden="true">→</span>
-                        </a>''')
-    return "\n".join(rows)
+def fallback_stories(news: list[NewsArticle], limit: int = FALLBACK_NEWS_LIMIT) -> list[NewsArticle]:
+    """The stories news.html needs to draw its first view without the API.
+
+    That is the latest ``limit`` stories plus the lead and flash stories,
+    which the client picks by the same rules from this shorter list.
+    """
 
+    keep = {id(item) for item in news[:limit]} | {id(choose_lead(news)), id(choose_flash(news))}
+    return [item for item in news if id(item) in keep]
 
-def render_story_card(article: dict, *, wide: bool = False) -> str:
-    src, srcset, width, height = lead_image(article)
-    responsive = f' srcset="{esc(srcset)}" sizes="(max-width: 767px) calc(100vw - 2rem), 50vw"' if srcset else ""
-    author = (article.get("author") or {}).get("name") or "SEIU Local 503, Local 083"
-    classes = " ".join(value for value in ("story-card", news_theme(article), "is-wide" if wide else "") if value)
-    return f'''                <article class="{classes}">
-                    <a class="story-image-link" href="{esc(article['url'])}"><img class="story-image" src="{esc(src)}"{responsive} alt="{esc(article.get('alt') or article['title'])}" width="{width}" height="{height}" loading="lazy"></a>
-                    <div class="story-body">
-                        <div class="story-meta"><span class="story-topic">{esc(primary_topic(article))}</span><time datetime="{esc(article['publishedAt'])}">{esc(long_date(article['publishedAt']))}</time></div>
-                        <h3><a href="{esc(article['url'])}">{esc(article['title'])}</a></h3>
-                        <p class="story-description">{esc(article.get('description'))}</p>
-                        <div class="story-footer"><span class="story-author">{esc(author)}</span><a class="story-read" href="{esc(article['url'])}" aria-label="Read {esc(article['title'])}">Read the story →</a></div>
-                    </div>
-                </article>'''
 
+def fallback_news(news: list[NewsArticle], limit: int = FALLBACK_NEWS_LIMIT) -> list[dict]:
+    """The inline ``fallbackNews`` entries for :func:`fallback_stories`.
 
-def render_home_news(news: list[dict]) -> str:
-    lead = choose_lead(news)
-    side = [item for item in news if item["url"] != lead["url"]][:2]
-    src, srcset, width, height = lead_image(lead)
-    responsive = f' srcset="{esc(srcset)}" sizes="(max-width: 767px) calc(100vw - 2rem), 55vw"' if srcset else ""
-    main = f'''                <article class="news-card bg-white rounded-2xl border border-border-color overflow-hidden group">
-                    <a href="{esc(lead['url'])}" class="block news-card-media aspect-[16/9]" aria-label="Read {esc(lead['title'])}"><img src="{esc(src)}"{responsive} alt="{esc(lead.get('alt') or lead['title'])}" loading="lazy" decoding="async" width="{width}" height="{height}"></a>
-                    <div class="p-6 md:p-8">
-                        <div class="flex items-center gap-3 text-sm mb-4"><span class="bg-brand-purple-light text-brand-purple-dark font-bold rounded-full px-3 py-1">{esc(primary_topic(lead))}</span><span class="text-text-secondary">{esc(long_date(lead['publishedAt']))}</span></div>
-                        <h3 class="font-bold text-3xl md:text-4xl leading-tight mb-4">{esc(lead['title'])}</h3>
-                        <p class="text-text-secondary leading-relaxed">{esc(lead.get('description'))}</p>
-                        <a href="{esc(lead['url'])}" class="text-brand-purple font-bold mt-5 inline-block group-hover:underline">Read the story →</a>
-                    </div>
-                </article>'''
-    side_rows = []
-    for article in side:
-        side_src, side_srcset, side_width, side_height = lead_image(article)
-        side_responsive = f' srcset="{esc(side_srcset)}" sizes="(max-width: 767px) calc(100vw - 2rem), 40vw"' if side_srcset else ""
-        side_rows.append(f'''                    <article class="news-card bg-white rounded-2xl border border-border-color overflow-hidden group">
-                        <a href="{esc(article['url'])}" class="block news-card-media aspect-[16/7]" aria-label="Read {esc(article['title'])}"><img src="{esc(side_src)}"{side_responsive} alt="{esc(article.get('alt') or article['title'])}" loading="lazy" decoding="async" width="{side_width}" height="{side_height}"></a>
-                        <div class="p-5 md:p-6"><div class="flex items-center gap-3 text-xs mb-3"><span class="font-bold uppercase tracking-wide text-brand-purple">{esc(primary_topic(article))}</span><span class="text-text-secondary">{esc(long_date(article['publishedAt']))}</span></div><h3 class="font-bold text-xl md:text-2xl leading-tight mb-3">{esc(article['title'])}</h3><p class="text-text-secondary text-sm leading-relaxed">{esc(article.get('description'))}</p><a href="{esc(article['url'])}" class="text-brand-purple font-bold mt-4 inline-block group-hover:underline">Read the story →</a></div>
-                    </article>''')
-    return main + '\n                <div class="space-y-6">\n' + "\n".join(side_rows) + "\n                </div>"
+    Every story here is published, which the client assumes when ``status``
+    is missing, so only the fields its renderer reads are kept.
+    """
 
+    items = []
+    for item in fallback_stories(news, limit):
+        entry = project(item.data, NEWS_FALLBACK_FIELDS)
+        if isinstance(entry.get("author"), dict):
+            entry["author"] = project(entry["author"], ("name",))
+        items.append(entry)
+    return items
 
-def render_home_event(event: dict) -> str:
-    date = date_value(event["date"])
-    featured = bool(event.get("featured"))
-    border = "border-2 border-brand-purple shadow-xl" if featured else "border border-border-color"
-    badge = "bg-brand-purple text-white" if featured else "bg-brand-purple-light text-brand-purple-dark"
-    footer = "bg-brand-purple-light" if featured else "bg-gray-50"
-    raw_time = event.get("time", "")
-    time = "Noon" if raw_time.startswith("12:00 PM") else "Evening" if raw_time.lower().startswith("evening") else raw_time.split(" - ")[0].replace(" PT", "")
-    return f'''                <article class="event-card bg-white rounded-2xl {border} overflow-hidden flex flex-col">
-                    <div class="p-6 md:p-7 flex-grow"><div class="flex items-start justify-between gap-4 mb-6"><div class="event-date" aria-label="{esc(date.strftime('%A'))}, {esc(long_date(event['date']))}"><span class="event-date-month">{esc(date.strftime('%b'))}</span><span class="event-date-day">{date.day}</span></div><div class="text-right"><div class="{badge} inline-flex font-bold rounded-full px-3 py-1 text-xs uppercase tracking-wide">{esc(event.get('type') or 'Event')}</div><div class="mt-3 text-sm font-semibold text-text-secondary"><span aria-hidden="true">●</span> {esc(time)}</div></div></div>
-                        <h3 class="font-bold text-2xl md:text-3xl mb-3">{esc(event['title'])}</h3><p class="text-text-secondary leading-relaxed">{esc(event.get('description'))}</p><p class="mt-3 text-sm text-text-secondary"><strong>Where:</strong> {esc(event.get('location_detail') or 'Details coming soon')}</p>
-                    </div>
-                    <div class="{footer} border-t border-border-color p-4 flex items-center justify-between gap-3"><span class="text-sm font-bold text-text-primary">{esc(date.strftime('%a'))}, {esc(short_date(event['date']))}</span><a href="{esc(event['url'])}" class="font-bold text-brand-purple hover:underline" aria-label="View {esc(event['title'])} details">View event details →</a></div>
-                </article>'''
 
+def fallback_events(events: Iterable[Event], as_of: date, year: int, month: int) -> list[dict]:
+    """The events events.html can show before its year shard loads.
 
-def render_home_events(events: list[dict]) -> str:
-    if events:
-        return "\n".join(render_home_event(item) for item in events)
-    return '''                <div class="col-span-full flex flex-col items-center justify-center py-12 px-6 bg-white rounded-xl border border-border-color border-dashed">
+    The client opens on the visitor's current month, which is on or after
+    ``as_of``, so events from earlier months are left to the shard.
+    """
+
+    start = min(date(year, month, 1), as_of.replace(day=1))
+    return [project(item.data, EVENT_FALLBACK_FIELDS) for item in renderable_events(events) if item.date >= start]
+
+
+def check_fallback_budget(page: str, variable: str, items: list[dict]) -> list[dict]:
+    """Return ``items``, or raise if their JSON is over the byte budget for ``variable``."""
+
+    size = len(json.dumps(items, ensure_ascii=False, indent=2).encode("utf-8"))
+    budget = FALLBACK_BUDGETS[variable]
+    if size > budget:
+        raise ValueError(
+            f"{page}: inline {variable} is {size:,} bytes, over its {budget:,}-byte budget; "
+            "trim the projected fields or the item count, or raise FALLBACK_BUDGETS deliberately"
+        )
+    return items
+
+
+NEWS_FLASH = Template("news-flash", """                <span class="flash-label">{label}</span>
+                <a href="{url}">
+                    <span class="flash-copy"><strong>{title}</strong> {description}</span>
+                    <time class="flash-date" datetime="{published}">{short_date}</time>
+                </a>""")
+NEWS_LEAD = Template("news-lead", """                    <a class="lead-image-wrap" href="{url}">
+                        <img src="{src}"{responsive|safe} alt="{alt}" width="{width|safe}" height="{height|safe}" fetchpriority="high">{credit|safe}
+                    </a>
+                    <div class="lead-copy">
+                        <div class="story-kicker"><span>Lead story · {topic}</span><time datetime="{published}">{long_date}</time></div>
+                        <h2>{title}</h2>
+                        <p>{description}</p>
+                        <a class="story-link" href="{url}">Read the story <span aria-hidden="true">→</span></a>
+                    </div>""")
+LATEST_ITEM = Template("latest-item", """                        <a class="latest-item" href="{url}">
+                            <span class="latest-thumb"><img src="{thumbnail}" alt="" width="96" height="96" loading="lazy" decoding="async"><span class="latest-icon {icon_class|safe}" aria-hidden="true">{icon|safe}</span></span>
+                            <span class="latest-copy"><time class="latest-date" datetime="{published}">{short_date}</time><span class="latest-title">{title}</span></span>
+                            <span class="latest-arrow" aria-hidden="true">→</span>
+                        </a>""")
+STORY_CARD = Template("story-card", """                <article class="{classes|safe}">
+                    <a class="story-image-link" href="{url}"><img class="story-image" src="{src}"{responsive|safe} alt="{alt}" width="{width|safe}" height="{height|safe}" loading="lazy" decoding="async"></a>
+                    <div class="story-body">
+                        <div class="story-meta"><span class="story-topic">{topic}</span><time datetime="{published}">{long_date}</time></div>
+                        <h3><a href="{url}">{title}</a></h3>
+                        <p class="story-description">{description}</p>
+                        <div class="story-footer"><span class="story-author">{author}</span><a class="story-read" href="{url}" aria-label="Read {title}">Read the story →</a></div>
+                    </div>
+                </article>""")
+HOME_LEAD = Template("home-lead", """                <article class="news-card bg-white rounded-2xl border border-border-color overflow-hidden group">
+                    <a href="{url}" class="block news-card-media aspect-[16/9]" aria-label="Read {title}"><img src="{src}"{responsive|safe} alt="{alt}" loading="lazy" decoding="async" width="{width|safe}" height="{height|safe}"></a>
+                    <div class="p-6 md:p-8">
+                        <div class="flex items-center gap-3 text-sm mb-4"><span class="bg-brand-purple-light text-brand-purple-dark font-bold rounded-full px-3 py-1">{topic}</span><span class="text-text-secondary">{long_date}</span></div>
+                        <h3 class="font-bold text-3xl md:text-4xl leading-tight mb-4">{title}</h3>
+                        <p class="text-text-secondary leading-relaxed">{description}</p>
+                        <a href="{url}" class="text-brand-purple font-bold mt-5 inline-block group-hover:underline">Read the story →</a>
+                    </div>
+                </article>""")
+HOME_SIDE_STORY = Template("home-side-story", """                    <article class="news-card bg-white rounded-2xl border border-border-color overflow-hidden group">
+                        <a href="{url}" class="block news-card-media aspect-[16/7]" aria-label="Read {title}"><img src="{src}"{responsive|safe} alt="{alt}" loading="lazy" decoding="async" width="{width|safe}" height="{height|safe}"></a>
+                        <div class="p-5 md:p-6"><div class="flex items-center gap-3 text-xs mb-3"><span class="font-bold uppercase tracking-wide text-brand-purple">{topic}</span><span class="text-text-secondary">{long_date}</span></div><h3 class="font-bold text-xl md:text-2xl leading-tight mb-3">{title}</h3><p class="text-text-secondary text-sm leading-relaxed">{description}</p><a href="{url}" class="text-brand-purple font-bold mt-4 inline-block group-hover:underline">Read the story →</a></div>
+                    </article>""")
+HOME_EVENT = Template("home-event", """                <article class="event-card bg-white rounded-2xl {border|safe} overflow-hidden flex flex-col">
+                    <div class="p-6 md:p-7 flex-grow"><div class="flex items-start justify-between gap-4 mb-6"><div class="event-date" aria-label="{weekday}, {long_date}"><span class="event-date-month">{month}</span><span class="event-date-day">{day|safe}</span></div><div class="text-right"><div class="{badge|safe} inline-flex font-bold rounded-full px-3 py-1 text-xs uppercase tracking-wide">{type}</div><div class="mt-3 text-sm font-semibold text-text-secondary"><span aria-hidden="true">●</span> {time}</div></div></div>
+                        <h3 class="font-bold text-2xl md:text-3xl mb-3">{title}</h3><p class="text-text-secondary leading-relaxed">{description}</p><p class="mt-3 text-sm text-text-secondary"><strong>Where:</strong> {location}</p>
+                    </div>
+                    <div class="{footer|safe} border-t border-border-color p-4 flex items-center justify-between gap-3"><span class="text-sm font-bold text-text-primary">{short_weekday}, {short_date}</span><a href="{url}" class="font-bold text-brand-purple hover:underline" aria-label="View {title} details">View event details →</a></div>
+                </article>""")
+AGENDA_CARD = Template("agenda-card", """                        <article class="agenda-card {event_class|safe}">
+                            <div class="agenda-date"><span>{short_weekday}</span><strong>{day|safe}</strong></div>
+                            <div class="agenda-copy"><span class="agenda-type"><span class="event-icon" aria-hidden="true">{icon|safe}</span>{type}</span><h3>{title}</h3><p>{meta}</p></div>
+                            <a class="agenda-link" href="{url}" aria-label="View {title} details">View event details →</a>
+                        </article>""")
+GLANCE_DATE = Template("glance-date", """                        <div class="glance-date {event_class|safe}">
+                            <strong>{day|safe}</strong><div class="glance-date-copy"><small>{short_weekday} · {month_name}</small><span>{icon|safe} {label}</span></div>
+                        </div>""")
+NO_HOME_EVENTS = """                <div class="col-span-full flex flex-col items-center justify-center py-12 px-6 bg-white rounded-xl border border-border-color border-dashed">
                     <svg xmlns="http://www.w3.org/2000/svg" class="h-12 w-12 text-gray-400 mb-4" fill="none" viewBox="0 0 24 24" stroke="currentColor" stroke-width="2" aria-hidden="true">
                         <path stroke-linecap="round" stroke-linejoin="round" d="M8 7V3m8 4V3m-9 8h10M5 21h14a2 2 0 002-2V7a2 2 0 00-2-2H5a2 2 0 00-2 2v12a2 2 0 002 2z" />
                     </svg>
                     <h3 class="text-xl font-bold text-brand-purple-dark mb-2">No upcoming events</h3>
                     <p class="text-text-secondary mb-6 text-center max-w-md">No upcoming events are currently announced. Browse past events or check back for new dates.</p>
                     <a href="/events.html#past-events" class="btn btn-outline">View past events</a>
-                </div>'''
+                </div>"""
+
+# Renders outside build() share one in-memory cache; the site build hands
+# build() the persistent one from ``load_fragments``.
+FRAGMENTS = FragmentCache()
+
+
+def load_fragments(root: Path = ROOT) -> FragmentCache:
+    """Load the fragments saved by the last build, discarded if the renderers changed."""
+
+    revision = hashlib.sha256(b"".join(Path(module).read_bytes() for module in (__file__, site_templates.__file__))).hexdigest()
+    return FragmentCache.load(root / FRAGMENT_CACHE, revision=revision)
+
+
+def article_fields(article: NewsArticle) -> dict[str, object]:
+    """Slot values every news template uses, computed once per article content."""
+
+    return {
+        "url": article.url,
+        "title": article.title,
+        "description": article.description,
+        "alt": article.alt or article.title,
+        "published": article.published,
+        "long_date": long_date(article.published_on),
+        "short_date": short_date(article.published_on),
+        "topic": primary_topic(article),
+    }
 
 
-def render_agenda(events: list[dict]) -> str:
+def image_fields(media: ResponsiveImage) -> dict[str, object]:
+    return {"src": media.src, "srcset": media.srcset, "width": media.width, "height": media.height}
+
+
+def event_fields(event: Event) -> dict[str, object]:
+    """Slot values every event template uses, computed once per event content."""
+
+    return {
+        "url": event.url,
+        "title": event.title,
+        "day": event.date.day,
+        "short_weekday": event.date.strftime("%a"),
+        "event_class": event_class(event.type),
+        "icon": event_icon(event.type),
+    }
+
+
+def responsive_attributes(fields: dict[str, object], sizes: str) -> str:
+    return f' srcset="{esc(fields["srcset"])}" sizes="{sizes}"' if fields["srcset"] else ""
+
+
+def render_news_flash(article: NewsArticle, fragments: FragmentCache | None = None) -> str:
+    def values() -> dict[str, object]:
+        label = "Meeting update" if "Events" in article.tags else "Latest update"
+        return {**cache.memo(article_fields, article, article.digest), "label": label}
+
+    cache = fragments or FRAGMENTS
+    return cache.render(NEWS_FLASH, article.digest, values)
+
+
+def render_news_lead(article: NewsArticle, fragments: FragmentCache | None = None, images: ImageManifest | None = None) -> str:
+    def values() -> dict[str, object]:
+        fields = {**cache.memo(article_fields, article, article.digest), **image_fields(media)}
+        credit = '\n                        <span class="photo-credit">Photo by Sylv Sharp, SEIU 503</span>' if "mcnary-field-rally-recap" in article.url else ""
+        return {**fields, "responsive": responsive_attributes(fields, "(max-width: 767px) calc(100vw - 2rem), 55vw"), "credit": credit}
+
+    cache = fragments or FRAGMENTS
+    # The image's size and variants come from the files on disk, so they are
+    # part of the fragment's key alongside the article.
+    media = lead_image(article, images or default_images())
+    return cache.render(NEWS_LEAD, (article.digest, media), values)
+
+
+def render_latest(news: list[NewsArticle], fragments: FragmentCache | None = None, images: ImageManifest | None = None) -> str:
+    cache = fragments or FRAGMENTS
+    images = images or default_images()
     rows = []
-    for event in events:
-        date = date_value(event["date"])
-        rows.append(f'''                        <article class="agenda-card {event_class(event.get('type', ''))}">
-                            <div class="agenda-date"><span>{esc(date.strftime('%a'))}</span><strong>{date.day}</strong></div>
-                            <div class="agenda-copy"><span class="agenda-type"><span class="event-icon" aria-hidden="true">{event_icon(event.get('type', ''))}</span>{esc(event.get('type') or 'Local 083 event')}</span><h3>{esc(event['title'])}</h3><p>{esc(agenda_meta(event))}</p></div>
-                            <a class="agenda-link" href="{esc(event['url'])}" aria-label="View {esc(event['title'])} details">View event details →</a>
-                        </article>''')
+    for article in news[:8]:
+        thumbnail = thumbnail_url(article.image, images)
+
+        def values(article: NewsArticle = article, thumbnail: str = thumbnail) -> dict[str, object]:
+            symbol, class_name = news_icon(article)
+            return {**cache.memo(article_fields, article, article.digest), "thumbnail": thumbnail, "icon": symbol, "icon_class": class_name}
+
+        rows.append(cache.render(LATEST_ITEM, (article.digest, thumbnail), values))
     return "\n".join(rows)
 
 
-def render_glance(events: list[dict], month: int) -> str:
-    rows = []
-    for event in events[:2]:
-        date = date_value(event["date"])
-        rows.append(f'''                        <div class="glance-date {event_class(event.get('type', ''))}">
-                            <strong>{date.day}</strong><div class="glance-date-copy"><small>{esc(date.strftime('%a'))} · {esc(calendar.month_name[month])}</small><span>{event_icon(event.get('type', ''))} {esc(event.get('type') or event['title'])}</span></div>
-                        </div>''')
+def render_story_card(
+    article: NewsArticle, *, wide: bool = False, fragments: FragmentCache | None = None, images: ImageManifest | None = None
+) -> str:
+    def values() -> dict[str, object]:
+        fields = {**cache.memo(article_fields, article, article.digest), **image_fields(media)}
+        return {
+            **fields,
+            "responsive": responsive_attributes(fields, "(max-width: 767px) calc(100vw - 2rem), 50vw"),
+            "author": article.author or "SEIU Local 503, Local 083",
+            "classes": " ".join(value for value in ("story-card", news_theme(article), "is-wide" if wide else "") if value),
+        }
+
+    cache = fragments or FRAGMENTS
+    media = lead_image(article, images or default_images())
+    return cache.render(STORY_CARD, (article.digest, media, wide), values)
+
+
+def render_home_news(news: list[NewsArticle], fragments: FragmentCache | None = None, images: ImageManifest | None = None) -> str:
+    cache = fragments or FRAGMENTS
+    images = images or default_images()
+    lead = choose_lead(news)
+    side = [item for item in news if item.url != lead.url][:2]
+
+    def values(article: NewsArticle, media: ResponsiveImage, sizes: str) -> dict[str, object]:
+        fields = {**cache.memo(article_fields, article, article.digest), **image_fields(media)}
+        return {**fields, "responsive": responsive_attributes(fields, sizes)}
+
+    def render(template: Template, article: NewsArticle, sizes: str) -> str:
+        media = lead_image(article, images)
+        return cache.render(template, (article.digest, media), lambda: values(article, media, sizes))
+
+    main = render(HOME_LEAD, lead, "(max-width: 767px) calc(100vw - 2rem), 55vw")
+    side_rows = [render(HOME_SIDE_STORY, article, "(max-width: 767px) calc(100vw - 2rem), 40vw") for article in side]
+    return main + '\n                <div class="space-y-6">\n' + "\n".join(side_rows) + "\n                </div>"
+
+
+def render_home_event(event: Event, fragments: FragmentCache | None = None) -> str:
+    def values() -> dict[str, object]:
+        date = event.date
+        featured = event.featured
+        raw_time = event.time
+        return {
+            **cache.memo(event_fields, event, event.digest),
+            "border": "border-2 border-brand-purple shadow-xl" if featured else "border border-border-color",
+            "badge": "bg-brand-purple text-white" if featured else "bg-brand-purple-light text-brand-purple-dark",
+            "footer": "bg-brand-purple-light" if featured else "bg-gray-50",
+            "time": "Noon" if raw_time.startswith("12:00 PM") else "Evening" if raw_time.lower().startswith("evening") else raw_time.split(" - ")[0].replace(" PT", ""),
+            "weekday": date.strftime("%A"),
+            "month": date.strftime("%b"),
+            "long_date": long_date(date),
+            "short_date": short_date(date),
+            "type": event.type or "Event",
+            "description": event.description,
+            "location": event.location or "Details coming soon",
+        }
+
+    cache = fragments or FRAGMENTS
+    return cache.render(HOME_EVENT, event.digest, values)
+
+
+def render_home_events(events: list[Event], fragments: FragmentCache | None = None) -> str:
+    if events:
+        return "\n".join(render_home_event(item, fragments) for item in events)
+    return NO_HOME_EVENTS
+
+
+def render_agenda(events: list[Event], fragments: FragmentCache | None = None) -> str:
+    cache = fragments or FRAGMENTS
+
+    def values(event: Event) -> dict[str, object]:
+        return {**cache.memo(event_fields, event, event.digest), "type": event.type or "Local 083 event", "meta": agenda_meta(event)}
+
+    return "\n".join(cache.render(AGENDA_CARD, event.digest, lambda event=event: values(event)) for event in events)
+
+
+def render_glance(events: list[Event], month: int, fragments: FragmentCache | None = None) -> str:
+    cache = fragments or FRAGMENTS
+
+    def values(event: Event) -> dict[str, object]:
+        return {**cache.memo(event_fields, event, event.digest), "month_name": calendar.month_name[month], "label": event.type or event.title}
+
+    rows = [cache.render(GLANCE_DATE, (event.digest, month), lambda event=event: values(event)) for event in events[:2]]
     if len(events) > 2:
         rows.append(f'                        <span class="glance-more">+{len(events) - 2} more in the calendar</span>')
     return "\n".join(rows)
 
 
-def update_news_graph(graph: list[dict], news: list[dict]) -> None:
+def update_news_graph(graph: list[dict], news: list[NewsArticle]) -> None:
     item_list = next((item for item in graph if item.get("@type") == "ItemList"), None)
     if item_list is None:
         item_list = {"@type": "ItemList", "@id": f"{BASE_URL}/news.html#news-list"}
@@ -381,7 +658,7 @@ def update_news_graph(graph: list[dict], news: list[dict]) -> None:
     entries = news[:8]
     item_list["numberOfItems"] = len(entries)
     item_list["itemListElement"] = [
-        {"@type": "ListItem", "position": position, "url": f"{BASE_URL}{item['url']}", "name": item["title"]}
+        {"@type": "ListItem", "position": position, "url": f"{BASE_URL}{item.url}", "name": item.title}
         for position, item in enumerate(entries, 1)
     ]
 
@@ -419,13 +696,13 @@ def event_schema(event: dict) -> dict | None:
     return schema
 
 
-def update_events_graph(graph: list[dict], events: list[dict]) -> None:
+def update_events_graph(graph: list[dict], events: list[Event]) -> None:
     graph[:] = [item for item in graph if item.get("@type") != "Event"]
     item_list = next((item for item in graph if item.get("@type") == "ItemList"), None)
     if item_list is None:
         item_list = {"@type": "ItemList", "@id": f"{BASE_URL}/events.html#event-list"}
         graph.append(item_list)
-    schemas = [schema for event in events if (schema := event_schema(event)) is not None]
+    schemas = [schema for event in events if (schema := event_schema(event.data)) is not None]
     item_list["numberOfItems"] = len(schemas)
     item_list["itemListElement"] = [
         {"@type": "ListItem", "position": position, "item": {"@id": schema["@id"]}}
@@ -434,7 +711,7 @@ def update_events_graph(graph: list[dict], events: list[dict]) -> None:
     graph.extend(schemas)
 
 
-def update_home_graph(graph: list[dict], news: list[dict], events: list[dict]) -> None:
+def update_home_graph(graph: list[dict], news: list[NewsArticle], events: list[Event]) -> None:
     graph[:] = [item for item in graph if item.get("@id") not in {f"{BASE_URL}/#home-news-list", f"{BASE_URL}/#home-event-list"}]
     graph.extend((
         {
@@ -443,7 +720,7 @@ def update_home_graph(graph: list[dict], news: list[dict], events: list[dict]) -
             "name": "Latest Local 083 news",
             "numberOfItems": min(3, len(news)),
             "itemListElement": [
-                {"@type": "ListItem", "position": position, "url": f"{BASE_URL}{item['url']}", "name": item["title"]}
+                {"@type": "ListItem", "position": position, "url": f"{BASE_URL}{item.url}", "name": item.title}
                 for position, item in enumerate(news[:3], 1)
             ],
         },
@@ -453,53 +730,100 @@ def update_home_graph(graph: list[dict], news: list[dict], events: list[dict]) -
             "name": "Latest announced Local 083 events",
             "numberOfItems": min(2, len(events)),
             "itemListElement": [
-                {"@type": "ListItem", "position": position, "url": f"{BASE_URL}{item['url']}", "name": item["title"]}
+                {"@type": "ListItem", "position": position, "url": f"{BASE_URL}{item.url}", "name": item.title}
                 for position, item in enumerate(events[:2], 1)
             ],
         },
     ))
 
 
-def build(root: Path = ROOT) -> list[Path]:
-    news = public_news(json.loads((root / "news" / "news.json").read_text(encoding="utf-8")))
-    as_of, events_all = event_payload(json.loads((root / "events" / "events.json").read_text(encoding="utf-8")))
+def build(
+    root: Path = ROOT,
+    *,
+    articles: list[NewsArticle] | None = None,
+    event_calendar: EventCalendar | None = None,
+    output: SiteOutput | None = None,
+    fragments: FragmentCache | None = None,
+    images: ImageManifest | None = None,
+) -> list[Path]:
+    """Rewrite the JSON-driven regions of the homepage, newsroom and calendar.
+
+    The site build passes the content and image manifest it has already
+    loaded so one process reads each source once; the command-line entry
+    point reads them from disk. Rendered cards come from ``fragments`` when
+    their content is unchanged.
+    """
+
+    if articles is None:
+        articles = read_news(root)
+    if event_calendar is None:
+        event_calendar = read_events(root)
+    output = output or SiteOutput(root)
+    fragments = fragments or FRAGMENTS
+    images = images or scan_images(root)
+    news = public_news(articles)
+    as_of, event_calendar = event_payload(event_calendar)
     if not news:
         raise ValueError("news/news.json contains no published stories")
-    year, month, events = snapshot_event_month(events_all, as_of)
+    year, month, events = snapshot_event_month(event_calendar.events, as_of)
 
     news_path = root / "news.html"
-    source = news_path.read_text(encoding="utf-8")
-    flash = next((item for item in news if {"Events", "Update"}.issubset(set(item.get("tags") or []))), news[0])
+    source = output.read_text(news_path)
+    flash = choose_flash(news)
     lead = choose_lead(news)
-    archive = [item for item in news if item["url"] != lead["url"]][:7]
-    source = replace_element_inner(source, "news-flash", render_news_flash(flash))
-    source = replace_element_inner(source, "lead-story", render_news_lead(lead))
-    source = replace_element_inner(source, "latest-list", render_latest(news))
-    source = replace_element_inner(source, "stories-grid", "\n".join(render_story_card(item, wide=index == 0) for index, item in enumerate(archive)))
-    source = replace_element_inner(source, "latest-count", f"{min(8, len(news))} recent {'story' if len(news) == 1 else 'stories'}")
-    source = replace_element_inner(source, "results-status", f"Showing {len(archive)} of {max(0, len(news) - 1)} stories")
-    source = replace_js_array(source, "fallbackNews", news)
-    source = update_json_ld(source, lambda graph: update_news_graph(graph, news))
-    news_path.write_text(source, encoding="utf-8")
+    archive = [item for item in news if item.url != lead.url][:7]
+    source = splice_regions(
+        source,
+        elements={
+            "news-flash": render_news_flash(flash, fragments),
+            "lead-story": render_news_lead(lead, fragments, images),
+            "latest-list": render_latest(news, fragments, images),
+            "stories-grid": "\n".join(
+                render_story_card(item, wide=index == 0, fragments=fragments, images=images) for index, item in enumerate(archive)
+            ),
+            "latest-count": f"{min(8, len(news))} recent {'story' if len(news) == 1 else 'stories'}",
+            "results-status": f"Showing {len(archive)} of {max(0, len(news) - 1)} stories",
+        },
+        arrays={
+            "fallbackNews": check_fallback_budget("news.html", "fallbackNews", fallback_news(news)),
+            "newsImages": check_fallback_budget("news.html", "newsImages", news_images(fallback_stories(news), images)),
+        },
+        json_ld=lambda graph: update_news_graph(graph, news),
+    )
+    output.write_text(news_path, source)
 
     events_path = root / "events.html"
-    source = events_path.read_text(encoding="utf-8")
-    source = replace_element_inner(source, "agenda-list", render_agenda(events))
-    source = replace_element_inner(source, "intro-count-number", str(len(events)))
-    source = replace_element_inner(source, "intro-count-label", f"{'event' if len(events) == 1 else 'events'} announced<br>in {calendar.month_name[month]}")
-    source = replace_element_inner(source, "intro-date-list", render_glance(events, month))
-    source = replace_element_inner(source, "month-label", f"{calendar.month_name[month]} {year}")
-    source = replace_js_array(source, "fallbackEvents", events_all)
-    source = update_json_ld(source, lambda graph: update_events_graph(graph, events))
-    events_path.write_text(source, encoding="utf-8")
+    source = output.read_text(events_path)
+    source = splice_regions(
+        source,
+        elements={
+            "agenda-list": render_agenda(events, fragments),
+            "intro-count-number": str(len(events)),
+            "intro-count-label": f"{'event' if len(events) == 1 else 'events'} announced<br>in {calendar.month_name[month]}",
+            "intro-date-list": render_glance(events, month, fragments),
+            "month-label": f"{calendar.month_name[month]} {year}",
+        },
+        arrays={
+            "fallbackEvents": check_fallback_budget(
+                "events.html", "fallbackEvents", fallback_events(event_calendar.events, as_of, year, month)
+            ),
+        },
+        json_ld=lambda graph: update_events_graph(graph, events),
+    )
+    output.write_text(events_path, source)
 
     home_path = root / "index.html"
-    source = home_path.read_text(encoding="utf-8")
-    home_events = homepage_events(events_all, as_of)
-    source = replace_element_inner(source, "upcoming-events-container", render_home_events(home_events))
-    source = replace_element_inner(source, "news-grid-container", render_home_news(news))
-    source = update_json_ld(source, lambda graph: update_home_graph(graph, news, home_events))
-    home_path.write_text(source, encoding="utf-8")
+    source = output.read_text(home_path)
+    home_events = homepage_events(event_calendar.events, as_of)
+    source = splice_regions(
+        source,
+        elements={
+            "upcoming-events-container": render_home_events(home_events, fragments),
+            "news-grid-container": render_home_news(news, fragments, images),
+        },
+        json_ld=lambda graph: update_home_graph(graph, news, home_events),
+    )
+    output.write_text(home_path, source)
 
     return [home_path, news_path, events_path]
 
@@ -508,8 +832,11 @@ def main() -> None:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("--root", type=Path, default=ROOT, help=argparse.SUPPRESS)
     args = parser.parse_args()
-    for path in build(args.root.resolve()):
+    root = args.root.resolve()
+    fragments = load_fragments(root)
+    for path in build(root, fragments=fragments):
         print(f"Wrote {path}")
+    fragments.save()
 
 
 if __name__ == "__main__":
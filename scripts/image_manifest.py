@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""Intrinsic sizes and responsive variants of every image under ``images/``.
+
+Sizes come from each file's header (the WebP ``VP8``/``VP8L``/``VP8X``
+chunk, the PNG ``IHDR`` chunk or the JPEG start-of-frame marker), so no image
+is decoded. ``<stem>-192.webp`` is the square thumbnail of ``<stem>.<ext>``
+and ``<stem>-<N>w.webp`` a width variant of it; variants may use any of the
+formats, preferring an original of their own. Sizes are cached in
+``.build-cache/image-manifest.json`` keyed by each file's SHA-256, so a later
+scan only parses the headers of new or edited images.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import struct
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+
+from public_pages import ROOT
+
+
+IMAGES_DIR = Path("images")
+IMAGE_CACHE = Path(".build-cache") / "image-manifest.json"
+IMAGE_CACHE_VERSION = 1
+IMAGE_SUFFIXES = frozenset({".webp", ".png", ".jpg", ".jpeg"})
+VARIANT_RE = re.compile(r"^(?P<stem>.+)-(?:(?P<thumbnail>192)|(?P<width>\d+)w)$")
+# The ``src`` of a responsive image, for browsers without ``srcset``, is its
+# widest variant up to this width.
+DEFAULT_SRC_WIDTH = 960
+# The size assumed for images outside the manifest, such as external URLs.
+FALLBACK_SIZE = (1200, 675)
+# JPEG start-of-frame markers; C4, C8 and CC share the range but are not frames.
+JPEG_FRAME_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def image_size(data: bytes) -> tuple[int, int]:
+    """Return ``(width, height)`` from a WebP, PNG or JPEG header."""
+
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        chunk = data[12:16]
+        if chunk == b"VP8 " and data[23:26] == b"\x9d\x01\x2a":
+            width, height = struct.unpack("<HH", data[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+        if chunk == b"VP8L" and data[20:21] == b"\x2f":
+            bits = int.from_bytes(data[21:25], "little")
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b"VP8X":
+            return int.from_bytes(data[24:27], "little") + 1, int.from_bytes(data[27:30], "little") + 1
+        raise ValueError("unsupported WebP header")
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and data[12:16] == b"IHDR":
+        return struct.unpack(">II", data[16:24])
+    if data[:2] == b"\xff\xd8":
+        position = 2
+        while position + 4 <= len(data):
+            if data[position] != 0xFF:
+                raise ValueError("malformed JPEG marker")
+            marker = data[position + 1]
+            if marker == 0xFF:
+                position += 1
+                continue
+            if marker in (0x01, *range(0xD0, 0xD9)):
+                position += 2
+                continue
+            if marker in JPEG_FRAME_MARKERS:
+                height, width = struct.unpack(">HH", data[position + 5 : position + 9])
+                return width, height
+            position += 2 + struct.unpack(">H", data[position + 2 : position + 4])[0]
+        raise ValueError("JPEG has no frame header")
+    raise ValueError("not a WebP, PNG or JPEG image")
+
+
+@dataclass(frozen=True)
+class ImageSize:
+    url: str
+    width: int
+    height: int
+
+
+@dataclass(frozen=True)
+class ResponsiveImage:
+    """What an ``<img>`` needs: ``src``, ``srcset`` (empty without variants) and the size of ``src``."""
+
+    src: str
+    srcset: str
+    width: int
+    height: int
+
+
+@dataclass(frozen=True)
+class ImageEntry:
+    url: str
+    width: int
+    height: int
+    variants: tuple[ImageSize, ...] = ()
+    thumbnail: str | None = None
+
+    def responsive(self) -> ResponsiveImage:
+        if not self.variants:
+            return ResponsiveImage(self.url, "", self.width, self.height)
+        fitting = [variant for variant in self.variants if variant.width <= DEFAULT_SRC_WIDTH]
+        src = fitting[-1] if fitting else self.variants[0]
+        srcset = ", ".join(f"{variant.url} {variant.width}w" for variant in self.variants)
+        return ResponsiveImage(src.url, srcset, src.width, src.height)
+
+
+@dataclass(frozen=True)
+class ImageManifest:
+    """Every original image by site URL (``/images/...``), with its variants grouped under it."""
+
+    entries: dict[str, ImageEntry]
+
+    def get(self, url: str) -> ImageEntry | None:
+        return self.entries.get(url)
+
+    def responsive(self, url: str) -> ResponsiveImage:
+        entry = self.entries.get(url)
+        return entry.responsive() if entry else ResponsiveImage(url, "", *FALLBACK_SIZE)
+
+    def thumbnail(self, url: str) -> str:
+        entry = self.entries.get(url)
+        return entry.thumbnail if entry and entry.thumbnail else url
+
+
+def original_of(url: str, sizes: dict[str, tuple[int, int]]) -> str | None:
+    """The original that ``url`` is a thumbnail or width variant of, if any."""
+
+    path = PurePosixPath(url)
+    match = VARIANT_RE.match(path.stem)
+    if match is None:
+        return None
+    for suffix in (path.suffix, *sorted(IMAGE_SUFFIXES - {path.suffix})):
+        original = str(path.with_name(match.group("stem") + suffix))
+        if original in sizes:
+            return original
+    return None
+
+
+def group(sizes: dict[str, tuple[int, int]]) -> ImageManifest:
+    """Group ``{url: (width, height)}`` into originals with their thumbnails and width variants.
+
+    A variant whose original is missing is listed as an original of its own.
+    """
+
+    originals: dict[str, ImageSize] = {}
+    variants: dict[str, list[ImageSize]] = {}
+    thumbnails: dict[str, str] = {}
+    for url, (width, height) in sizes.items():
+        original = original_of(url, sizes)
+        match = VARIANT_RE.match(PurePosixPath(url).stem)
+        if original is None:
+            originals[url] = ImageSize(url, width, height)
+        elif match.group("thumbnail"):  # type: ignore[union-attr]
+            thumbnails[original] = url
+        else:
+            variants.setdefault(original, []).append(ImageSize(url, width, height))
+    return ImageManifest(
+        {
+            url: ImageEntry(
+                url,
+                size.width,
+                size.height,
+                tuple(sorted(variants.get(url, ()), key=lambda variant: (variant.width, variant.url))),
+                thumbnails.get(url),
+            )
+            for url, size in sorted(originals.items())
+        }
+    )
+
+
+def scan(root: Path = ROOT, *, cache: bool = True, persist: bool = True) -> ImageManifest:
+    """Read the size of every image under ``images/`` and group the variants.
+
+    Unreadable cache files are ignored and rewritten; without ``cache``
+    every header is parsed, and without ``persist`` the cache is read but
+    never written.
+    """
+
+    cache_path = root / IMAGE_CACHE
+    cached: dict[str, list[int]] = {}
+    if cache:
+        try:
+            data = json.loads(cache_path.read_text(encoding="utf-8"))
+            if data.get("version") == IMAGE_CACHE_VERSION and isinstance(data.get("sizes"), dict):
+                cached = data["sizes"]
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    sizes: dict[str, tuple[int, int]] = {}
+    current: dict[str, list[int]] = {}
+    for path in sorted((root / IMAGES_DIR).rglob("*")):
+        if path.suffix.lower() not in IMAGE_SUFFIXES or not path.is_file():
+            continue
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        size = cached.get(digest)
+        if size is None:
+            try:
+                size = list(image_size(data))
+            except (ValueError, struct.error) as error:
+                raise ValueError(f"Cannot read the size of {path.relative_to(root).as_posix()}: {error}") from error
+        current[digest] = size
+        sizes["/" + path.relative_to(root).as_posix()] = (size[0], size[1])
+
+    if cache and persist and current != cached:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_path.write_text(json.dumps({"version": IMAGE_CACHE_VERSION, "sizes": current}, sort_keys=True) + "\n", encoding="utf-8")
+        except OSError:
+            pass
+    return group(sizes)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--root", type=Path, default=ROOT, help=argparse.SUPPRESS)
+    parser.add_argument("--json", action="store_true", help="Print the manifest as JSON.")
+    args = parser.parse_args()
+    manifest = scan(args.root.resolve())
+    if args.json:
+        payload = {
+            url: {
+                "width": entry.width,
+                "height": entry.height,
+                "variants": [[variant.url, variant.width, variant.height] for variant in entry.variants],
+                "thumbnail": entry.thumbnail,
+            }
+            for url, entry in manifest.entries.items()
+        }
+        print(json.dumps(payload, indent=2))
+        return 0
+    variants = sum(len(entry.variants) for entry in manifest.entries.values())
+    thumbnails = sum(1 for entry in manifest.entries.values() if entry.thumbnail)
+    print(f"{len(manifest.entries)} image(s) with {variants} width variant(s) and {thumbnails} thumbnail(s).")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
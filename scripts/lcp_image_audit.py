@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""Check, and optionally fix, the loading hints on each public page's images.
+
+The first ``<img>`` in ``<main>`` is taken to be the page's largest
+contentful paint (LCP) element. It must not be lazy-loaded, must carry
+``fetchpriority="high"`` and must declare its ``width`` and ``height``.
+Every later image in ``<main>`` must have ``loading="lazy"`` and
+``decoding="async"`` and must not ask for high priority. Images in the
+shared header and footer, and in ``<template>`` or ``<noscript>`` markup, are
+not checked.
+
+With ``--fix`` the audit rewrites the offending ``<img>`` tags in
+hand-authored pages under ``events/``, ``resources/`` and
+``2026-bargaining/`` (or the given paths) and leaves the rest of each file
+untouched. Missing LCP dimensions are filled in from the image manifest.
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from pathlib import Path
+
+from image_manifest import scan as scan_images
+from public_pages import ROOT, PageCorpus, public_html_paths
+
+
+FIX_PATHS = ("events", "resources", "2026-bargaining")
+SKIPPED_CONTAINERS = {"template", "noscript"}
+
+
+def attribute_re(name: str) -> re.Pattern[str]:
+    return re.compile(rf"""\s+{name}(?:\s*=\s*(?:"[^"]*"|'[^']*'|[^\s"'>]+))?(?=[\s/>])""", re.IGNORECASE)
+
+
+@dataclass
+class ImageTag:
+    """One ``<img>`` start tag in ``<main>``: where it is in the page text and its attributes."""
+
+    start: int
+    text: str
+    attrs: dict[str, str]
+    lcp: bool
+
+    def problems(self) -> list[str]:
+        loading = self.attrs.get("loading", "").lower()
+        priority = self.attrs.get("fetchpriority", "").lower()
+        found = []
+        if self.lcp:
+            if loading == "lazy":
+                found.append('LCP image is lazy-loaded; remove `loading="lazy"`')
+            if priority != "high":
+                found.append('LCP image is missing `fetchpriority="high"`')
+            if not (self.attrs.get("width") and self.attrs.get("height")):
+                found.append("LCP image is missing `width` and `height`")
+        else:
+            if loading != "lazy":
+                found.append('below-the-fold image is missing `loading="lazy"`')
+            if self.attrs.get("decoding", "").lower() != "async":
+                found.append('below-the-fold image is missing `decoding="async"`')
+            if priority == "high":
+                found.append('only the LCP image should have `fetchpriority="high"`')
+        return found
+
+
+class ImageParser(HTMLParser):
+    """Find the ``<img>`` start tags inside ``<main>``, with their offsets."""
+
+    def __init__(self, text: str) -> None:
+        super().__init__(convert_charrefs=True)
+        self.line_starts = [0]
+        self.line_starts += [match.end() for match in re.finditer("\n", text)]
+        self.main_depth = 0
+        self.skipped_depth = 0
+        self.images: list[ImageTag] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag == "main":
+            self.main_depth += 1
+        elif tag in SKIPPED_CONTAINERS:
+            self.skipped_depth += 1
+        elif tag == "img" and self.main_depth and not self.skipped_depth:
+            line, column = self.getpos()
+            values = {key.lower(): (value or "") for key, value in attrs}
+            raw = self.get_starttag_text() or ""
+            self.images.append(ImageTag(self.line_starts[line - 1] + column, raw, values, lcp=not self.images))
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag == "img":
+            self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "main":
+            self.main_depth = max(0, self.main_depth - 1)
+        elif tag in SKIPPED_CONTAINERS:
+            self.skipped_depth = max(0, self.skipped_depth - 1)
+
+
+def main_images(text: str) -> list[ImageTag]:
+    parser = ImageParser(text)
+    parser.feed(text)
+    parser.close()
+    return parser.images
+
+
+@dataclass
+class Rewrite:
+    """The attributes to drop from a tag and the ones to set, in order."""
+
+    drop: list[str] = field(default_factory=list)
+    add: list[tuple[str, str]] = field(default_factory=list)
+
+    def apply(self, tag: str) -> str:
+        for name in self.drop + [name for name, _ in self.add]:
+            tag = attribute_re(name).sub("", tag)
+        body, gap, close = re.fullmatch(r"(.*?)(\s*)(/?>)", tag, re.DOTALL).groups()  # type: ignore[union-attr]
+        if "\n" in body:
+            # Multi-line tags list one attribute per line; keep that layout.
+            indent = re.search(r"\n([ \t]*)[^\n]*$", body).group(1)  # type: ignore[union-attr]
+            added = "".join(f'\n{indent}{name}="{value}"' for name, value in self.add)
+        else:
+            added = "".join(f' {name}="{value}"' for name, value in self.add)
+        return body + added + gap + close
+
+
+def rewrite(image: ImageTag, sizes: dict[str, tuple[int, int]]) -> Rewrite:
+    """What makes ``image`` pass; an empty rewrite when nothing can be fixed."""
+
+    change = Rewrite()
+    attrs = image.attrs
+    if image.lcp:
+        if attrs.get("loading", "").lower() == "lazy":
+            change.drop.append("loading")
+        if attrs.get("fetchpriority", "").lower() != "high":
+            change.add.append(("fetchpriority", "high"))
+        size = sizes.get(attrs.get("src", "").split("?")[0])
+        if not (attrs.get("width") and attrs.get("height")) and size:
+            change.add += [("width", str(size[0])), ("height", str(size[1]))]
+    else:
+        if attrs.get("loading", "").lower() != "lazy":
+            change.add.append(("loading", "lazy"))
+        if attrs.get("decoding", "").lower() != "async":
+            change.add.append(("decoding", "async"))
+        if attrs.get("fetchpriority", "").lower() == "high":
+            change.drop.append("fetchpriority")
+    return change
+
+
+def fix(text: str, sizes: dict[str, tuple[int, int]]) -> str:
+    """``text`` with every fixable image hint corrected, working from the end so offsets hold."""
+
+    for image in reversed(main_images(text)):
+        if not image.problems():
+            continue
+        change = rewrite(image, sizes)
+        if change.drop or change.add:
+            end = image.start + len(image.text)
+            text = text[: image.start] + change.apply(image.text) + text[end:]
+    return text
+
+
+def image_sizes(root: Path) -> dict[str, tuple[int, int]]:
+    sizes = {}
+    for entry in scan_images(root).entries.values():
+        sizes[entry.url] = (entry.width, entry.height)
+        sizes.update((variant.url, (variant.width, variant.height)) for variant in entry.variants)
+    return sizes
+
+
+def run(root: Path, corpus: PageCorpus | None = None) -> tuple[list[Path], list[str]]:
+    corpus = corpus or PageCorpus(root)
+    pages = public_html_paths(root, include_404=True, corpus=corpus)
+    findings = []
+    for page in pages:
+        for image in main_images(corpus.text(page)):
+            for problem in image.problems():
+                findings.append(f"`{page.relative_to(root).as_posix()}` {problem}: `{image.attrs.get('src', '')}`")
+    return pages, findings
+
+
+def fix_pages(root: Path, paths: list[str], corpus: PageCorpus | None = None) -> list[Path]:
+    """Rewrite the public pages under ``paths`` in place and return the ones that changed."""
+
+    corpus = corpus or PageCorpus(root)
+    scopes = [(root / path).resolve() for path in paths]
+    sizes = image_sizes(root)
+    changed = []
+    for page in public_html_paths(root, include_404=True, corpus=corpus):
+        if not any(page == scope or scope in page.parents for scope in scopes):
+            continue
+        text = corpus.text(page)
+        fixed = fix(text, sizes)
+        if fixed != text:
+            page.write_text(fixed, encoding="utf-8")
+            corpus.update(page, fixed)
+            changed.append(page)
+    return changed
+
+
+def main(argv: list[str] | None = None, corpus: PageCorpus | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--report", default="lcp-image-report.md")
+    parser.add_argument("--fix", nargs="*", metavar="PATH", help=f"Rewrite pages under these repo-relative paths (default: {', '.join(FIX_PATHS)}).")
+    args = parser.parse_args(argv)
+
+    corpus = corpus or PageCorpus(ROOT)
+    if args.fix is not None:
+        for page in fix_pages(ROOT, args.fix or list(FIX_PATHS), corpus):
+            print(f"Fixed {page.relative_to(ROOT).as_posix()}")
+    pages, findings = run(ROOT, corpus)
+    lines = [
+        "# LCP image audit",
+        "",
+        f"- Public pages checked: {len(pages)}",
+        f"- Findings: {len(findings)}",
+        "",
+    ]
+    if findings:
+        lines += ["## Findings", ""] + [f"- {finding}" for finding in findings]
+    else:
+        lines.append("Every page's first image in `<main>` loads eagerly at high priority with explicit dimensions, and every later image is lazy-loaded and decoded asynchronously.")
+    report = ROOT / args.report
+    report.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    print(f"Checked the images of {len(pages)} public pages: {len(findings)} findings")
+    print(f"Report: {report}")
+    return 1 if findings else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
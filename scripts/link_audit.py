@@ -4,37 +4,30 @@
 from __future__ import annotations
 
 import argparse
-from html.parser import HTMLParser
 from pathlib import Path
 import re
 import sys
 from urllib.parse import unquote, urlsplit
 
-from public_pages import public_html_paths
+from public_pages import PageCorpus, PageSummary, public_html_paths
 
 ROOT = Path(__file__).resolve().parents[1]
 LOCAL_HOSTS = {"local083.org", "www.local083.org"}
 
 
-class PageParser(HTMLParser):
-    def __init__(self) -> None:
-        super().__init__(convert_charrefs=True)
-        self.links: list[tuple[str, dict[str, str], int]] = []
-        self.ids: set[str] = set()
+def page_links(summary: PageSummary) -> list[tuple[str, dict[str, str], int]]:
+    """Return the references this audit follows: hrefs of links and srcs of embeds."""
 
-    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
-        values = {key.lower(): (value or "") for key, value in attrs}
-        if values.get("id"):
-            self.ids.add(values["id"])
-        if values.get("name") and tag.lower() == "a":
-            self.ids.add(values["name"])
-        attribute = "href" if tag.lower() in {"a", "area", "link"} else "src" if tag.lower() in {"img", "script", "iframe", "source"} else ""
+    links = []
+    for tag, values, line in summary.references:
+        attribute = "href" if tag in {"a", "area", "link"} else "src" if tag in {"img", "script", "iframe", "source"} else ""
         if attribute and values.get(attribute):
-            self.links.append((tag.lower(), values, self.getpos()[0]))
+            links.append((tag, values, line))
+    return links
 
 
-def public_pages() -> list[Path]:
-    return public_html_paths(ROOT, include_404=True)
+def public_pages(corpus: PageCorpus | None = None) -> list[Path]:
+    return public_html_paths(ROOT, include_404=True, corpus=corpus)
 
 
 def local_path(source: Path, raw_url: str) -> tuple[Path, str] | None:
@@ -88,23 +81,18 @@ def validate_download(path: Path) -> str | None:
     return None
 
 
-def main() -> int:
+def main(argv: list[str] | None = None, corpus: PageCorpus | None = None) -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument("--report", default="link-audit-report.md")
-    args = parser.parse_args()
-    pages = public_pages()
-    parsed_pages: dict[Path, PageParser] = {}
+    args = parser.parse_args(argv)
+    corpus = corpus or PageCorpus(ROOT)
+    pages = public_pages(corpus)
     findings: list[str] = []
     checked = 0
 
     for page in pages:
-        parsed = PageParser()
-        parsed.feed(page.read_text(encoding="utf-8", errors="replace"))
-        parsed_pages[page.resolve()] = parsed
-
-    for page, parsed in parsed_pages.items():
         rel = page.relative_to(ROOT)
-        for tag, attrs, line in parsed.links:
+        for tag, attrs, line in page_links(corpus.page(page).summary):
             url = attrs.get("href") or attrs.get("src") or ""
             checked += 1
             if url.startswith(("data:", "tel:", "javascript:")):
@@ -137,12 +125,7 @@ def main() -> int:
             if download_problem:
                 findings.append(f"`{rel}:{line}` {download_problem}: `{url}`")
             if fragment and target.suffix.lower() == ".html":
-                target_parser = parsed_pages.get(target)
-                if target_parser is None:
-                    target_parser = PageParser()
-                    target_parser.feed(target.read_text(encoding="utf-8", errors="replace"))
-                    parsed_pages[target] = target_parser
-                if fragment not in target_parser.ids:
+                if fragment not in corpus.page(target).summary.anchors:
                     findings.append(f"`{rel}:{line}` missing fragment `#{fragment}` in `{target.relative_to(ROOT)}`")
 
     report = ROOT / args.report
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""Measure what each public page costs to load and hold it to per-group budgets.
+
+For every public page this counts the HTML bytes (and the inline script and
+style bytes within them), the local stylesheets it links with everything
+they ``@import``, the fonts those stylesheets declare, its scripts, and its
+images. An image counts once at its smallest and once at its largest
+``src``/``srcset`` candidate, so the totals bracket what a phone and a wide
+screen download. Requests count the document, each distinct local asset and
+each external script, stylesheet, image or frame. Sizes are uncompressed
+file sizes, and every declared font is assumed to load.
+
+``page-weight-budgets.json`` assigns pages to groups by glob, first match
+wins, and sets each group's budgets. The audit fails when a page exceeds a
+budget, or when its largest total or request count has grown past
+``page-weight-baseline.json`` by more than the configured tolerance. Run with
+``--update-baseline`` to accept the current weights.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import statistics
+from dataclasses import asdict, dataclass, fields
+from fnmatch import fnmatch
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from public_pages import ROOT, PageCorpus, public_html_paths
+
+
+BUDGETS = Path("page-weight-budgets.json")
+BASELINE = Path("page-weight-baseline.json")
+LOCAL_HOSTS = {"local083.org", "www.local083.org"}
+FONT_SUFFIXES = {".woff2", ".woff", ".ttf", ".otf"}
+CSS_URL_RE = re.compile(r"""@import\s+(?:url\(\s*)?["']?([^"')\s;]+)|url\(\s*["']?([^"')\s]+)""")
+FETCHED_LINKS = {"stylesheet", "icon", "preload", "modulepreload"}
+
+
+@dataclass(frozen=True)
+class PageWeight:
+    page: str
+    group: str
+    html: int
+    inline_scripts: int
+    inline_styles: int
+    css: int
+    js: int
+    fonts: int
+    images_min: int
+    images_max: int
+    requests: int
+
+    @property
+    def total_min(self) -> int:
+        return self.html + self.css + self.js + self.fonts + self.images_min
+
+    @property
+    def total_max(self) -> int:
+        return self.html + self.css + self.js + self.fonts + self.images_max
+
+    def metric(self, name: str) -> int:
+        return getattr(self, name)
+
+
+METRICS = tuple(field.name for field in fields(PageWeight) if field.name not in {"page", "group"}) + ("total_min", "total_max")
+
+
+@dataclass(frozen=True)
+class PageGroup:
+    name: str
+    patterns: tuple[str, ...]
+    budgets: dict[str, int]
+
+
+@dataclass(frozen=True)
+class BudgetConfig:
+    groups: tuple[PageGroup, ...]
+    percent: float
+    bytes: int
+
+    def group_of(self, page: str) -> PageGroup | None:
+        return next((group for group in self.groups if any(fnmatch(page, pattern) for pattern in group.patterns)), None)
+
+
+def load_budgets(path: Path) -> BudgetConfig:
+    """Read the budget file, rejecting unknown metrics so a typo cannot disable a budget."""
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    groups = []
+    for item in data.get("groups", []):
+        unknown = set(item.get("budgets", {})) - set(METRICS)
+        if unknown:
+            raise ValueError(f"{path.name}: unknown budget metric(s) for {item.get('name')!r}: {', '.join(sorted(unknown))}")
+        groups.append(PageGroup(item["name"], tuple(item["pages"]), dict(item.get("budgets", {}))))
+    tolerance = data.get("regression", {})
+    return BudgetConfig(tuple(groups), float(tolerance.get("percent", 0)), int(tolerance.get("bytes", 0)))
+
+
+class AssetParser(HTMLParser):
+    """Collect the resources a page fetches and the size of its inline code."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=False)
+        self.stylesheets: list[str] = []
+        self.scripts: list[str] = []
+        self.fonts: list[str] = []
+        self.images: list[list[str]] = []
+        self.frames: list[str] = []
+        self.inline_scripts = 0
+        self.inline_styles = 0
+        self.inline: str | None = None
+        self.picture: list[str] | None = None
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        values = {key.lower(): (value or "") for key, value in attrs}
+        if tag == "script":
+            if values.get("src"):
+                self.scripts.append(values["src"])
+            else:
+                self.inline = "script"
+        elif tag == "style":
+            self.inline = "style"
+        elif tag == "link" and values.get("href"):
+            rels = set(values.get("rel", "").lower().split())
+            kind = values.get("as", "")
+            if "stylesheet" in rels or kind == "style":
+                self.stylesheets.append(values["href"])
+            elif "modulepreload" in rels or kind == "script":
+                self.scripts.append(values["href"])
+            elif kind == "font":
+                self.fonts.append(values["href"])
+            elif rels & FETCHED_LINKS:
+                self.images.append([values["href"]])
+        elif tag == "picture":
+            self.picture = []
+        elif tag == "source" and self.picture is not None:
+            self.picture += candidates(values.get("srcset", ""))
+        elif tag == "img":
+            found = [*(self.picture or ()), *candidates(values.get("srcset", ""))]
+            if values.get("src"):
+                found.append(values["src"])
+            if found:
+                self.images.append(found)
+        elif tag == "iframe" and values.get("src"):
+            self.frames.append(values["src"])
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in {"script", "style"}:
+            self.inline = None
+        elif tag == "picture":
+            self.picture = None
+
+    def handle_data(self, data: str) -> None:
+        if self.inline == "script":
+            self.inline_scripts += len(data.encode("utf-8"))
+        elif self.inline == "style":
+            self.inline_styles += len(data.encode("utf-8"))
+
+
+def candidates(srcset: str) -> list[str]:
+    return [candidate.split()[0] for candidate in srcset.split(",") if candidate.strip()]
+
+
+def local_target(root: Path, base: Path, url: str) -> Path | None:
+    """The file a same-site URL names, or ``None`` for external and non-file URLs."""
+
+    parsed = urlsplit(url)
+    if parsed.scheme in {"http", "https"}:
+        if parsed.hostname not in LOCAL_HOSTS:
+            return None
+    elif parsed.scheme or url.startswith("//"):
+        return None
+    path = unquote(parsed.path)
+    if not path:
+        return None
+    target = root / path.lstrip("/") if path.startswith("/") else base.parent / path
+    return target.resolve()
+
+
+class Assets:
+    """File sizes and stylesheet dependencies, measured once for the whole site."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root.resolve()
+        self.sizes: dict[Path, int] = {}
+        self.imports: dict[Path, list[Path]] = {}
+
+    def size(self, path: Path) -> int | None:
+        if path not in self.sizes:
+            self.sizes[path] = path.stat().st_size if path.is_file() else -1
+        return self.sizes[path] if self.sizes[path] >= 0 else None
+
+    def stylesheet(self, path: Path) -> list[Path]:
+        """``path`` and every local file it pulls in, depth first, each once."""
+
+        found: list[Path] = []
+
+        def visit(sheet: Path) -> None:
+            if sheet in found or self.size(sheet) is None:
+                return
+            found.append(sheet)
+            if sheet not in self.imports:
+                text = sheet.read_text(encoding="utf-8", errors="replace")
+                urls = [first or second for first, second in CSS_URL_RE.findall(text)]
+                self.imports[sheet] = [target for url in urls if (target := local_target(self.root, sheet, url)) is not None]
+            for target in self.imports[sheet]:
+                if target.suffix == ".css":
+                    visit(target)
+                elif target not in found and self.size(target) is not None:
+                    found.append(target)
+
+        visit(path)
+        return found
+
+
+def is_external(url: str) -> bool:
+    parsed = urlsplit(url)
+    return (parsed.scheme in {"http", "https"} and parsed.hostname not in LOCAL_HOSTS) or url.startswith("//")
+
+
+def weigh(root: Path, page: Path, text: str, group: str, assets: Assets) -> PageWeight:
+    parser = AssetParser()
+    parser.feed(text)
+    parser.close()
+    local: dict[Path, str] = {}
+    external: set[str] = set()
+
+    def add(url: str, kind: str) -> None:
+        target = local_target(assets.root, page, url)
+        if target is None:
+            if is_external(url):
+                external.add(url)
+        elif assets.size(target) is not None:
+            local.setdefault(target, kind)
+
+    for url in parser.stylesheets:
+        target = local_target(assets.root, page, url)
+        if target is None:
+            add(url, "css")
+            continue
+        for path in assets.stylesheet(target):
+            local.setdefault(path, "fonts" if path.suffix in FONT_SUFFIXES else "css" if path.suffix == ".css" else "images")
+    for url in parser.scripts:
+        add(url, "js")
+    for url in parser.fonts:
+        add(url, "fonts")
+    for url in parser.frames:
+        add(url, "frames")
+
+    totals = {"css": 0, "js": 0, "fonts": 0, "images": 0}
+    for path, kind in local.items():
+        if kind in totals:
+            totals[kind] += assets.size(path) or 0
+
+    images_min = images_max = totals["images"]
+    seen: set[frozenset[Path]] = set()
+    for urls in parser.images:
+        sizes: dict[Path, int] = {}
+        for url in urls:
+            target = local_target(assets.root, page, url)
+            if target is None:
+                if is_external(url):
+                    external.add(url)
+            elif (size := assets.size(target)) is not None:
+                sizes[target] = size
+        key = frozenset(sizes)
+        if sizes and key not in seen and not key & local.keys():
+            seen.add(key)
+            images_min += min(sizes.values())
+            images_max += max(sizes.values())
+
+    return PageWeight(
+        page=page.relative_to(root).as_posix(),
+        group=group,
+        html=len(text.encode("utf-8")),
+        inline_scripts=parser.inline_scripts,
+        inline_styles=parser.inline_styles,
+        css=totals["css"],
+        js=totals["js"],
+        fonts=totals["fonts"],
+        images_min=images_min,
+        images_max=images_max,
+        requests=1 + len(local) + len(seen) + len(external),
+    )
+
+
+def run(root: Path, config: BudgetConfig, corpus: PageCorpus | None = None) -> list[PageWeight]:
+    corpus = corpus or PageCorpus(root)
+    assets = Assets(root)
+    weights = []
+    for path in public_html_paths(root, include_404=True, corpus=corpus):
+        relative = path.relative_to(root).as_posix()
+        group = config.group_of(relative)
+        weights.append(weigh(root, path, corpus.text(path), group.name if group else "ungrouped", assets))
+    return weights
+
+
+def check(weights: list[PageWeight], config: BudgetConfig, baseline: dict[str, dict[str, int]]) -> list[str]:
+    """Budget overruns, then regressions of ``total_max`` or ``requests`` against the baseline."""
+
+    groups = {group.name: group for group in config.groups}
+    findings = []
+    for weight in weights:
+        group = groups.get(weight.group)
+        for metric, budget in (group.budgets.items() if group else ()):
+            if weight.metric(metric) > budget:
+                findings.append(f"`{weight.page}` {metric} is {weight.metric(metric):,}, over the {weight.group} budget of {budget:,}")
+        before = baseline.get(weight.page)
+        if before is None:
+            continue
+        allowed = before.get("total_max", 0) + max(config.bytes, round(before.get("total_max", 0) * config.percent / 100))
+        if weight.total_max > allowed:
+            findings.append(f"`{weight.page}` total_max grew from {before['total_max']:,} to {weight.total_max:,} bytes (allowed {allowed:,})")
+        if weight.requests > before.get("requests", weight.requests):
+            findings.append(f"`{weight.page}` requests grew from {before['requests']} to {weight.requests}")
+    return findings
+
+
+def baseline_of(weights: list[PageWeight]) -> dict[str, dict[str, int]]:
+    return {weight.page: {"requests": weight.requests, "total_max": weight.total_max, "total_min": weight.total_min} for weight in weights}
+
+
+def load_baseline(path: Path) -> dict[str, dict[str, int]]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))["pages"]
+    except FileNotFoundError:
+        return {}
+
+
+def kib(size: float) -> str:
+    return f"{size / 1024:,.1f} KiB"
+
+
+def markdown_report(weights: list[PageWeight], config: BudgetConfig, findings: list[str], baseline_pages: int) -> str:
+    lines = [
+        "# Page weight report",
+        "",
+        f"- Public pages: {len(weights)}",
+        f"- Pages in the baseline: {baseline_pages}",
+        f"- Findings: {len(findings)}",
+        "- Sizes are uncompressed; image totals use each image's smallest and largest candidate.",
+        "",
+        "## Page groups",
+        "",
+        "| Group | Pages | Median total | Largest total | Most requests | Budgets |",
+        "| --- | ---: | ---: | ---: | ---: | --- |",
+    ]
+    for name in [group.name for group in config.groups] + ["ungrouped"]:
+        members = [weight for weight in weights if weight.group == name]
+        if not members:
+            continue
+        group = config.group_of(members[0].page)
+        budgets = ", ".join(f"{metric} {value:,}" for metric, value in group.budgets.items()) if group and group.budgets else "none"
+        lines.append(
+            f"| {name} | {len(members)} | {kib(statistics.median(weight.total_max for weight in members))} "
+            f"| {kib(max(weight.total_max for weight in members))} | {max(weight.requests for weight in members)} | {budgets} |"
+        )
+    lines += ["", "## Findings", ""]
+    lines += [f"- {finding}" for finding in findings] or ["No page is over budget or heavier than its baseline."]
+    lines += [
+        "",
+        "## Pages",
+        "",
+        "| Page | Group | HTML | Inline JS | Inline CSS | CSS | JS | Fonts | Images (min–max) | Total (min–max) | Requests |",
+        "| --- | --- | ---: | ---: | ---: | ---: | ---: | ---: | ---: | ---: | ---: |",
+    ]
+    for weight in sorted(weights, key=lambda weight: (-weight.total_max, weight.page)):
+        lines.append(
+            f"| `{weight.page}` | {weight.group} | {kib(weight.html)} | {kib(weight.inline_scripts)} | {kib(weight.inline_styles)} "
+            f"| {kib(weight.css)} | {kib(weight.js)} | {kib(weight.fonts)} | {kib(weight.images_min)}–{kib(weight.images_max)} "
+            f"| {kib(weight.total_min)}–{kib(weight.total_max)} | {weight.requests} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main(argv: list[str] | None = None, corpus: PageCorpus | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--report", default="page-weight-report.md")
+    parser.add_argument("--json-report", default="page-weight-report.json")
+    parser.add_argument("--budgets", default=str(BUDGETS), help="Page groups and budgets (repo-relative).")
+    parser.add_argument("--baseline", default=str(BASELINE), help="Stored weights to compare against (repo-relative).")
+    parser.add_argument("--update-baseline", action="store_true", help="Record the current weights as the baseline.")
+    args = parser.parse_args(argv)
+
+    config = load_budgets(ROOT / args.budgets)
+    weights = run(ROOT, config, corpus)
+    baseline_path = ROOT / args.baseline
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps({"pages": baseline_of(weights)}, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Recorded the weights of {len(weights)} pages in {baseline_path}")
+    baseline = load_baseline(baseline_path)
+    findings = check(weights, config, baseline)
+
+    report = ROOT / args.report
+    report.write_text(markdown_report(weights, config, findings, len(baseline)), encoding="utf-8")
+    payload = {
+        "findings": findings,
+        "pages": [{**asdict(weight), "total_min": weight.total_min, "total_max": weight.total_max} for weight in weights],
+    }
+    (ROOT / args.json_report).write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+    print(f"Weighed {len(weights)} public pages: {len(findings)} findings")
+    print(f"Report: {report}")
+    return 1 if findings else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
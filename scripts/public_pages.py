@@ -2,20 +2,31 @@
 """Shared discovery rules for Local 083 public HTML pages.
 
 Keeping this logic in one place prevents the sitemap and quality audits from
-quietly checking different sets of pages.
+quietly checking different sets of pages. ``PageCorpus`` also lets tools that
+run in one process share a single read, and a single link/anchor parse, of
+every page.
 """
 
 from __future__ import annotations
 
+import hashlib
+import json
+import os
 import re
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, field
+from functools import cached_property
+from html.parser import HTMLParser
 from pathlib import Path
+from typing import Iterator
+
+from site_output import SiteOutput
 
 
 ROOT = Path(__file__).resolve().parents[1]
 BASE_URL = "https://www.local083.org"
 
 EXCLUDED_DIRS = {
+    ".build-cache",
     ".git",
     ".github",
     "jules-scratch",
@@ -29,6 +40,8 @@ EXCLUDED_DIRS = {
     "welcome",
 }
 EXCLUDED_FILES = {"test-pages.html"}
+PAGE_INDEX = Path(".build-cache") / "public-pages.json"
+PAGE_INDEX_VERSION = 1
 
 NOINDEX_RE = re.compile(
     r'<meta\s+[^>]*name=["\']robots["\'][^>]*content=["\'][^"\']*noindex[^"\']*["\'][^>]*>',
@@ -47,6 +60,224 @@ class PublicPage:
     in_sitemap: bool
 
 
+@dataclass
+class PageSummary:
+    """IDs, ``<a name>`` anchors and every start tag with an href or src, with its line."""
+
+    ids: list[str] = field(default_factory=list)
+    names: list[str] = field(default_factory=list)
+    references: list[tuple[str, dict[str, str], int]] = field(default_factory=list)
+
+    @property
+    def anchors(self) -> set[str]:
+        return {*self.ids, *self.names}
+
+
+class SummaryParser(HTMLParser):
+    """Collect the anchors and references every audit needs from one pass."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.summary = PageSummary()
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        values = {key.lower(): (value or "") for key, value in attrs}
+        if values.get("id"):
+            self.summary.ids.append(values["id"])
+        if tag == "a" and values.get("name"):
+            self.summary.names.append(values["name"])
+        if values.get("href") or values.get("src"):
+            self.summary.references.append((tag, values, self.getpos()[0]))
+
+
+class CorpusPage:
+    """One HTML file, read at most once, with the facts derived from it cached.
+
+    Canonical URL and noindex come from the page index when the file is
+    unchanged on disk, so discovering pages does not read them.
+    """
+
+    def __init__(self, path: Path, corpus: PageCorpus, *, text: str | None = None, metadata: PageMetadata | None = None) -> None:
+        self.path = path
+        self.corpus = corpus
+        self.metadata = metadata
+        if text is not None:
+            self.text = text
+
+    @property
+    def root(self) -> Path:
+        return self.corpus.root
+
+    @property
+    def relative(self) -> str:
+        return self.path.relative_to(self.root).as_posix()
+
+    @cached_property
+    def text(self) -> str:
+        return self.corpus.output.read_text(self.path, errors="replace")
+
+    @cached_property
+    def digest(self) -> str:
+        return hashlib.sha256(self.text.encode("utf-8", errors="surrogateescape")).hexdigest()
+
+    @cached_property
+    def canonical_url(self) -> str:
+        if self.metadata is not None:
+            return self.metadata.canonical_url
+        match = CANONICAL_RE.search(self.text)
+        return match.group(1) if match else default_url(self.path, self.root)
+
+    @cached_property
+    def noindex(self) -> bool:
+        if self.metadata is not None:
+            return self.metadata.noindex
+        return bool(NOINDEX_RE.search(self.text))
+
+    @property
+    def in_sitemap(self) -> bool:
+        return self.path.name != "404.html" and not self.noindex
+
+    @cached_property
+    def summary(self) -> PageSummary:
+        parser = SummaryParser()
+        parser.feed(self.text)
+        parser.close()
+        return parser.summary
+
+
+@dataclass(frozen=True)
+class PageMetadata:
+    size: int
+    mtime_ns: int
+    canonical_url: str
+    noindex: bool
+
+
+class PageIndex:
+    """Canonical URL and noindex per page, keyed by path, size and mtime.
+
+    Stored under ``.build-cache`` so discovering pages on an unchanged tree
+    needs only the directory walk's ``stat`` calls. A missing, unreadable or
+    outdated index is simply rebuilt.
+    """
+
+    def __init__(self, path: Path, entries: dict[str, PageMetadata] | None = None) -> None:
+        self.path = path
+        self.entries = entries or {}
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: Path) -> PageIndex:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data.get("version") != PAGE_INDEX_VERSION:
+                return cls(path)
+            return cls(path, {relative: PageMetadata(**entry) for relative, entry in data["pages"].items()})
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            return cls(path)
+
+    def lookup(self, relative: str, stat: os.stat_result) -> PageMetadata | None:
+        entry = self.entries.get(relative)
+        if entry is None or entry.size != stat.st_size or entry.mtime_ns != stat.st_mtime_ns:
+            return None
+        return entry
+
+    def record(self, relative: str, stat: os.stat_result, page: CorpusPage) -> PageMetadata:
+        entry = PageMetadata(stat.st_size, stat.st_mtime_ns, page.canonical_url, page.noindex)
+        self.entries[relative] = entry
+        self.dirty = True
+        return entry
+
+    def prune(self, relatives: set[str]) -> None:
+        stale = set(self.entries) - relatives
+        for relative in stale:
+            del self.entries[relative]
+        self.dirty = self.dirty or bool(stale)
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        payload = {"version": PAGE_INDEX_VERSION, "pages": {relative: asdict(entry) for relative, entry in sorted(self.entries.items())}}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps(payload, separators=(",", ":")) + "\n", encoding="utf-8")
+        except OSError:
+            return
+        self.dirty = False
+
+
+def walk_public_html(root: Path = ROOT) -> Iterator[tuple[Path, os.stat_result]]:
+    """Yield public HTML files with their ``stat``, never entering excluded directories."""
+
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in EXCLUDED_DIRS:
+                        stack.append(Path(entry.path))
+                elif entry.name.endswith(".html") and entry.name not in EXCLUDED_FILES and entry.is_file():
+                    yield Path(entry.path), entry.stat()
+
+
+class PageCorpus:
+    """Every page a set of tools looks at, each read from disk (or ``output``) at most once.
+
+    Pages are read on first request, whether or not they are public, so link
+    targets share the cache too. A build step that rewrites a page calls
+    ``update`` so later readers see the new text. With ``use_index``, page
+    metadata for files unchanged on disk comes from the page index.
+    """
+
+    def __init__(self, root: Path = ROOT, *, output: SiteOutput | None = None, use_index: bool = True) -> None:
+        self.root = root
+        self.output = output or SiteOutput(root)
+        self.use_index = use_index
+        self._pages: dict[Path, CorpusPage] = {}
+        self._public: list[Path] | None = None
+
+    def page(self, path: Path) -> CorpusPage:
+        if path not in self._pages:
+            self._pages[path] = CorpusPage(path, self)
+        return self._pages[path]
+
+    def text(self, path: Path) -> str:
+        return self.page(path).text
+
+    def update(self, path: Path, text: str) -> None:
+        self._pages[path] = CorpusPage(path, self, text=text)
+
+    def public_pages(self, *, include_404: bool = True) -> list[CorpusPage]:
+        if self._public is None:
+            self._public = self._discover()
+        return [self.page(path) for path in self._public if include_404 or path.name != "404.html"]
+
+    def _discover(self) -> list[Path]:
+        found = dict(walk_public_html(self.root))
+        created = [path for path in self.output.created_paths() if path.suffix == ".html" and is_public_path(path, self.root)]
+        if self.use_index:
+            index = PageIndex.load(self.root / PAGE_INDEX)
+            for path, stat in found.items():
+                # Pages a check build has rewritten in its overlay differ from disk.
+                if path in self._pages or self.output.overrides(path):
+                    continue
+                relative = path.relative_to(self.root).as_posix()
+                page = CorpusPage(path, self, metadata=index.lookup(relative, stat))
+                if page.metadata is None:
+                    page.metadata = index.record(relative, stat, page)
+                self._pages[path] = page
+            index.prune({path.relative_to(self.root).as_posix() for path in found})
+            # A check build's overlay must leave the tree, index included, as it found it.
+            if self.output.in_place:
+                index.save()
+        return sorted({*found, *created})
+
+
+def is_public_path(path: Path, root: Path = ROOT) -> bool:
+    rel = path.relative_to(root)
+    return path.name not in EXCLUDED_FILES and not any(part in EXCLUDED_DIRS for part in rel.parts)
+
+
 def default_url(path: Path, root: Path = ROOT) -> str:
     rel = path.relative_to(root).as_posix()
     if rel == "index.html":
@@ -56,30 +287,30 @@ def default_url(path: Path, root: Path = ROOT) -> str:
     return f"{BASE_URL}/{rel}"
 
 
-def discover_public_pages(root: Path = ROOT, *, include_404: bool = True) -> list[PublicPage]:
-    pages: list[PublicPage] = []
-    for path in sorted(root.rglob("*.html")):
-        rel = path.relative_to(root)
-        if path.name in EXCLUDED_FILES or any(part in EXCLUDED_DIRS for part in rel.parts):
-            continue
-        if path.name == "404.html" and not include_404:
-            continue
+def discover_public_pages(
+    root: Path = ROOT,
+    *,
+    include_404: bool = True,
+    output: SiteOutput | None = None,
+    corpus: PageCorpus | None = None,
+) -> list[PublicPage]:
+    """Return public pages, including pages a build has generated into ``output``."""
+
+    corpus = corpus or PageCorpus(root, output=output)
+    return [
+        PublicPage(path=page.path, canonical_url=page.canonical_url, in_sitemap=page.in_sitemap)
+        for page in corpus.public_pages(include_404=include_404)
+    ]
 
-        source = path.read_text(encoding="utf-8", errors="replace")
-        canonical_match = CANONICAL_RE.search(source)
-        canonical_url = canonical_match.group(1) if canonical_match else default_url(path, root)
-        in_sitemap = path.name != "404.html" and not NOINDEX_RE.search(source)
-        pages.append(PublicPage(path=path, canonical_url=canonical_url, in_sitemap=in_sitemap))
-    return pages
 
+def public_html_paths(root: Path = ROOT, *, include_404: bool = True, corpus: PageCorpus | None = None) -> list[Path]:
+    corpus = corpus or PageCorpus(root)
+    return [page.path for page in corpus.public_pages(include_404=include_404)]
 
-def public_html_paths(root: Path = ROOT, *, include_404: bool = True) -> list[Path]:
-    return [page.path for page in discover_public_pages(root, include_404=include_404)]
 
+def sitemap_urls(root: Path = ROOT, pages: list[PublicPage] | None = None) -> list[str]:
+    """Return sitemap URLs, reusing an already-discovered page list when given."""
 
-def sitemap_urls(root: Path = ROOT) -> list[str]:
-    return sorted({
-        page.canonical_url
-        for page in discover_public_pages(root, include_404=False)
-        if page.in_sitemap
-    })
+    if pages is None:
+        pages = discover_public_pages(root, include_404=False)
+    return sorted({page.canonical_url for page in pages if page.in_sitemap})
@@ -11,6 +11,8 @@ from datetime import datetime
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
+from content import NewsArticle, load_news
+
 
 ROOT = Path(__file__).resolve().parent.parent
 NEWS_JSON = ROOT / "news" / "news.json"
@@ -34,11 +36,8 @@ def local_now(value: str | None) -> datetime:
     return parsed.astimezone(OREGON_TZ)
 
 
-def due_on(article: dict) -> datetime:
-    value = article.get("publishedAt", "")
-    if len(value) == 10:
-        return datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=OREGON_TZ)
-    return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(OREGON_TZ)
+def is_due(article: NewsArticle, now: datetime) -> bool:
+    return article.status == "scheduled" and article.published_at is not None and article.published_at <= now
 
 
 def remove_noindex(path: Path) -> None:
@@ -63,30 +62,31 @@ def main() -> int:
     args = parse_args()
     now = local_now(args.now)
     news = json.loads(NEWS_JSON.read_text(encoding="utf-8"))
-    due = [item for item in news if item.get("status") == "scheduled" and due_on(item) <= now]
+    due = [article for article in load_news(news) if is_due(article, now)]
     if not due:
         print(f"No scheduled news is due as of {now.isoformat()}")
         return 0
 
     print("Due for publication:")
-    for item in due:
-        print(f"- {item['publishedAt']}: {item['title']}")
+    for article in due:
+        print(f"- {article.published}: {article.title}")
     if args.dry_run:
         return 0
 
-    for item in due:
-        item["status"] = "published"
-        page = ROOT / item["url"].lstrip("/")
+    for article in due:
+        # ``data`` is the entry in ``news`` itself, which is written back below.
+        article.data["status"] = "published"
+        page = ROOT / article.url.lstrip("/")
         remove_noindex(page)
 
     NEWS_JSON.write_text(json.dumps(news, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
     run(["python3", "scripts/build_site.py"])
     run(["python3", "scripts/site_quality_check.py", "--strict-placeholders"])
 
-    sitemap = (ROOT / "sitemap.xml").read_text(encoding="utf-8")
+    sitemap = "".join(path.read_text(encoding="utf-8") for path in sorted((ROOT / "sitemaps").glob("*.xml")))
     rss = (ROOT / "news" / "rss.xml").read_text(encoding="utf-8")
-    for item in due:
-        absolute = f"{BASE_URL}{item['url']}"
+    for article in due:
+        absolute = f"{BASE_URL}{article.url}"
         if absolute not in sitemap or absolute not in rss:
             raise RuntimeError(f"Published story missing from sitemap or RSS: {absolute}")
     print(f"Published {len(due)} scheduled story/stories at {now.isoformat()}")
@@ -8,7 +8,7 @@ from dataclasses import dataclass
 from html.parser import HTMLParser
 from pathlib import Path
 
-from public_pages import ROOT, public_html_paths
+from public_pages import ROOT, PageCorpus, public_html_paths
 
 
 EXPECTED_NAV = [
@@ -150,9 +150,9 @@ def active_state_findings(
     return []
 
 
-def audit_page(path: Path, root: Path = ROOT) -> list[Finding]:
+def audit_page(path: Path, root: Path = ROOT, corpus: PageCorpus | None = None) -> list[Finding]:
     rel = path.relative_to(root).as_posix()
-    source = path.read_text(encoding="utf-8", errors="replace")
+    source = corpus.text(path) if corpus else path.read_text(encoding="utf-8", errors="replace")
     parser = ShellParser()
     parser.feed(source)
     findings: list[Finding] = []
@@ -206,16 +206,17 @@ def audit_page(path: Path, root: Path = ROOT) -> list[Finding]:
     return findings
 
 
-def run(root: Path = ROOT) -> tuple[list[Path], list[Finding]]:
-    pages = public_html_paths(root, include_404=True)
-    return pages, [finding for page in pages for finding in audit_page(page, root)]
+def run(root: Path = ROOT, corpus: PageCorpus | None = None) -> tuple[list[Path], list[Finding]]:
+    corpus = corpus or PageCorpus(root)
+    pages = public_html_paths(root, include_404=True, corpus=corpus)
+    return pages, [finding for page in pages for finding in audit_page(page, root, corpus)]
 
 
-def main() -> int:
+def main(argv: list[str] | None = None, corpus: PageCorpus | None = None) -> int:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("--report", default="shell-consistency-report.md")
-    args = parser.parse_args()
-    pages, findings = run(ROOT)
+    args = parser.parse_args(argv)
+    pages, findings = run(ROOT, corpus)
     lines = [
         "# Public shell consistency report",
         "",
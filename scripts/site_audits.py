@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Run every public-page audit in one process over a shared page corpus.
+
+Each page is read from disk once, and the link audits share one parse of it,
+instead of every tool walking and reading the whole site again. Every audit
+runs even when an earlier one fails; the exit status is nonzero if any failed.
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+import accessibility_audit
+import lcp_image_audit
+import link_audit
+import page_weight_audit
+import shell_consistency_audit
+import site_quality_check
+from public_pages import PageCorpus
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--strict-placeholders", action="store_true", help="Treat placeholder content markers as errors.")
+    parser.add_argument("--report-dir", default=".", help="Directory for the audit reports (repo-relative).")
+    args = parser.parse_args(argv)
+
+    reports = ROOT / args.report_dir
+    corpus = PageCorpus(ROOT)
+    audits = [
+        (site_quality_check, ["--report", str(reports / "site-quality-report.md")] + (["--strict-placeholders"] if args.strict_placeholders else [])),
+        (accessibility_audit, ["--report", str(reports / "accessibility-report.md")]),
+        (link_audit, ["--report", str(reports / "link-audit-report.md")]),
+        (shell_consistency_audit, ["--report", str(reports / "shell-consistency-report.md")]),
+        (lcp_image_audit, ["--report", str(reports / "lcp-image-report.md")]),
+        (page_weight_audit, ["--report", str(reports / "page-weight-report.md"), "--json-report", str(reports / "page-weight-report.json")]),
+    ]
+    failed = []
+    for module, audit_args in audits:
+        if module.main(audit_args, corpus=corpus) != 0:
+            failed.append(module.__name__)
+    if failed:
+        print(f"Failed audits: {', '.join(failed)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
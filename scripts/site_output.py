@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""Where build steps read pages and write generated files.
+
+Generators receive an output object instead of calling ``Path.write_text``.
+A normal build writes straight into the working tree. ``build_site.py
+--check`` passes an overlay instead: generated files land in memory or in a
+temporary directory, later steps read them back through the overlay, and the
+checkout itself is never modified.
+
+Every write is skipped when the file already holds the same bytes, so
+unchanged pages keep their mtimes and rsync-style deploys only see real
+changes. Files that do change are replaced atomically: the new content is
+written to a temporary file beside the target and renamed over it, so a
+reader never sees half a page.
+
+Generators remove stale files with ``delete`` rather than unlinking them, so
+a check build can report a committed file that a real build would delete.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+
+class SiteOutput:
+    """Read and write generated files directly in the working tree."""
+
+    in_place = True
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.written_count = 0
+        self.skipped_count = 0
+        self.unchanged: set[Path] = set()
+        self.updated: set[Path] = set()
+        self.deleted: set[Path] = set()
+
+    def relative(self, path: Path) -> str:
+        return path.relative_to(self.root).as_posix()
+
+    def read_bytes(self, path: Path) -> bytes:
+        return path.read_bytes()
+
+    def read_text(self, path: Path, *, errors: str = "strict") -> str:
+        return self.read_bytes(path).decode("utf-8", errors=errors)
+
+    def exists(self, path: Path) -> bool:
+        return path.is_file()
+
+    def write_bytes(self, path: Path, data: bytes) -> bool:
+        """Write ``data`` unless ``path`` already holds it; return whether it was written."""
+
+        if self.holds(path, data):
+            self.skipped_count += 1
+            self.unchanged.add(path)
+            return False
+        self.store(path, data)
+        self.written_count += 1
+        self.unchanged.discard(path)
+        self.deleted.discard(path)
+        self.updated.add(path)
+        return True
+
+    def write_text(self, path: Path, text: str) -> bool:
+        return self.write_bytes(path, text.encode("utf-8"))
+
+    def delete(self, path: Path) -> bool:
+        """Remove a stale generated file; return whether there was one to remove."""
+
+        if not self.exists(path):
+            return False
+        self.remove(path)
+        self.written_count += 1
+        self.unchanged.discard(path)
+        self.updated.discard(path)
+        self.deleted.add(path)
+        return True
+
+    def remove(self, path: Path) -> None:
+        path.unlink(missing_ok=True)
+
+    def keep(self, path: Path) -> None:
+        """Count ``path`` as unchanged when a generator knows its content without rendering it."""
+
+        self.skipped_count += 1
+        self.unchanged.add(path)
+
+    def holds(self, path: Path, data: bytes) -> bool:
+        try:
+            # A size mismatch settles most changed files without reading them.
+            if path.stat().st_size != len(data):
+                return False
+            return path.read_bytes() == data
+        except FileNotFoundError:
+            return False
+
+    def store(self, path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        descriptor = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            with os.fdopen(descriptor, "wb") as handle:
+                handle.write(data)
+            if path.exists():
+                os.chmod(temporary, path.stat().st_mode & 0o7777)
+            os.replace(temporary, path)
+        except BaseException:
+            temporary.unlink(missing_ok=True)
+            raise
+
+    def counts(self) -> tuple[int, int]:
+        """Return how many writes or deletions changed a file and how many writes were skipped."""
+
+        return self.written_count, self.skipped_count
+
+    def reset_counts(self) -> None:
+        self.written_count = self.skipped_count = 0
+        self.unchanged = set()
+        self.updated = set()
+        self.deleted = set()
+
+    def merge(self, other: SiteOutput) -> None:
+        """Fold in the counts of a copy of this output used by a worker process."""
+
+        self.written_count += other.written_count
+        self.skipped_count += other.skipped_count
+        self.unchanged = (self.unchanged - other.updated) | other.unchanged
+        self.updated = (self.updated - other.unchanged - other.deleted) | other.updated
+        self.deleted = (self.deleted - other.updated - other.unchanged) | other.deleted
+
+    def created_paths(self) -> list[Path]:
+        """Return generated files that exist only in this output, not the tree."""
+
+        return []
+
+    def overrides(self, path: Path) -> bool:
+        """Return whether reads of ``path`` see different content than the tree."""
+
+        return False
+
+
+class OverlayOutput(SiteOutput):
+    """Collect generated files outside the working tree.
+
+    Without a directory, files are kept in memory; that is fastest but only
+    visible to this process. With a directory (for example a
+    ``TemporaryDirectory``), files are written beneath it using their
+    repo-relative paths so pool workers can share the overlay.
+
+    ``delete`` never touches the tree: it drops any overlay copy and records
+    the path, which then reads as missing. Those records travel back from
+    pool workers with the write counts, through ``merge``.
+    """
+
+    in_place = False
+
+    def __init__(self, root: Path, directory: Path | None = None) -> None:
+        super().__init__(root)
+        self.directory = directory
+        self.files: dict[str, bytes] = {}
+
+    def read_bytes(self, path: Path) -> bytes:
+        if path in self.deleted:
+            raise FileNotFoundError(path)
+        relative = self.relative(path)
+        if self.directory is None:
+            if relative in self.files:
+                return self.files[relative]
+        elif (self.directory / relative).is_file():
+            return (self.directory / relative).read_bytes()
+        return path.read_bytes()
+
+    def exists(self, path: Path) -> bool:
+        if path in self.deleted:
+            return False
+        relative = self.relative(path)
+        if self.directory is None:
+            return relative in self.files or path.is_file()
+        return (self.directory / relative).is_file() or path.is_file()
+
+    def holds(self, path: Path, data: bytes) -> bool:
+        # Identical files need no overlay copy: reads fall through to the tree.
+        return self.exists(path) and self.read_bytes(path) == data
+
+    def store(self, path: Path, data: bytes) -> None:
+        relative = self.relative(path)
+        if self.directory is None:
+            self.files[relative] = data
+            return
+        super().store(self.directory / relative, data)
+
+    def remove(self, path: Path) -> None:
+        relative = self.relative(path)
+        if self.directory is None:
+            self.files.pop(relative, None)
+        else:
+            (self.directory / relative).unlink(missing_ok=True)
+
+    def overrides(self, path: Path) -> bool:
+        if path in self.deleted:
+            return True
+        relative = self.relative(path)
+        if self.directory is None:
+            return relative in self.files
+        return (self.directory / relative).is_file()
+
+    def written_paths(self) -> list[str]:
+        """Return the repo-relative path of every generated file."""
+
+        if self.directory is None:
+            return sorted(self.files)
+        return sorted(
+            (Path(folder) / name).relative_to(self.directory).as_posix()
+            for folder, _, names in os.walk(self.directory)
+            for name in names
+        )
+
+    def deleted_paths(self) -> list[str]:
+        """Return the repo-relative path of every committed file the build would delete."""
+
+        return sorted(self.relative(path) for path in self.deleted if path.is_file())
+
+    def written(self) -> dict[str, bytes]:
+        """Return every generated file's bytes by repo-relative path."""
+
+        return {relative: self.read_bytes(self.root / relative) for relative in self.written_paths()}
+
+    def created_paths(self) -> list[Path]:
+        return [self.root / relative for relative in self.written_paths() if not (self.root / relative).is_file()]
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""File watching and a local preview server for ``build_site.py --watch --serve``.
+
+``FileWatcher`` reports which watched files changed since it last looked. On
+Linux it sleeps on inotify until a watched directory changes; elsewhere, or
+when inotify is unavailable, it polls file sizes and mtimes.
+
+``PreviewServer`` serves the working tree over HTTP with strong ETags, gzip
+for text responses and a server-sent-events endpoint that tells open pages to
+reload after each rebuild.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import gzip
+import hashlib
+import os
+import select
+import sys
+import threading
+import time
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Iterable
+from urllib.parse import urlsplit
+
+
+LIVE_RELOAD_PATH = "/__livereload"
+LIVE_RELOAD_SCRIPT = (
+    f'<script>new EventSource("{LIVE_RELOAD_PATH}").onmessage = () => location.reload();</script>\n'
+).encode("utf-8")
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml", "image/svg+xml")
+MINIMUM_GZIP_BYTES = 512
+
+# inotify(7) event bits for a file that was written, moved in, created or removed.
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+INOTIFY_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+
+Signature = tuple[int, int] | None
+
+
+def signature(path: Path) -> Signature:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class Inotify:
+    """A minimal ctypes binding: add directory watches and wait for any event."""
+
+    def __init__(self) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories: set[Path] = set()
+
+    def watch(self, directories: Iterable[Path]) -> None:
+        for directory in set(directories) - self.directories:
+            if self._add_watch(self.fd, os.fsencode(directory), INOTIFY_MASK) >= 0:
+                self.directories.add(directory)
+
+    def wait(self, timeout: float) -> bool:
+        """Return whether any event arrived within ``timeout``, draining the queue."""
+
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return False
+        while True:
+            try:
+                if not os.read(self.fd, 65536):
+                    break
+            except BlockingIOError:
+                break
+        return True
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class FileWatcher:
+    """Track the size and mtime of a set of files and report which changed.
+
+    ``targets`` returns the repo-relative files to watch; it is called again
+    after every rebuild so newly generated pages are picked up.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        targets: Callable[[], Iterable[str]],
+        *,
+        interval: float = 0.25,
+        settle: float = 0.05,
+        polling: bool = False,
+    ) -> None:
+        self.root = root
+        self.targets = targets
+        self.interval = interval
+        self.settle = settle
+        self.signatures: dict[str, Signature] = {}
+        self.inotify: Inotify | None = None
+        if not polling and sys.platform.startswith("linux"):
+            try:
+                self.inotify = Inotify()
+            except (OSError, AttributeError):
+                self.inotify = None
+        self.retarget()
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self.inotify else "polling"
+
+    def retarget(self) -> None:
+        """Re-read the target list, starting to track new files and dropping removed ones.
+
+        Files already tracked keep their last seen state, so an edit made while
+        a rebuild was running is still reported by the next ``changes()``.
+        """
+
+        targets = set(self.targets())
+        self.signatures = {
+            relative: self.signatures[relative] if relative in self.signatures else signature(self.root / relative)
+            for relative in sorted(targets)
+        }
+        if self.inotify is not None:
+            self.inotify.watch({(self.root / relative).parent for relative in self.signatures if (self.root / relative).parent.is_dir()})
+
+    def absorb(self, paths: Iterable[Path]) -> None:
+        """Accept the current state of files the build itself wrote."""
+
+        for path in paths:
+            relative = path.relative_to(self.root).as_posix()
+            self.signatures[relative] = signature(path)
+
+    def changes(self) -> set[str]:
+        changed = {relative for relative, known in self.signatures.items() if signature(self.root / relative) != known}
+        for relative in changed:
+            self.signatures[relative] = signature(self.root / relative)
+        return changed
+
+    def wait(self, stop: threading.Event | None = None) -> set[str]:
+        """Block until at least one watched file changed and return the changed paths."""
+
+        while stop is None or not stop.is_set():
+            if self.inotify is not None:
+                if not self.inotify.wait(1.0):
+                    continue
+            else:
+                time.sleep(self.interval)
+            # Editors often write a file in several steps; let them finish.
+            time.sleep(self.settle)
+            changed = self.changes()
+            if changed:
+                return changed
+        return set()
+
+    def close(self) -> None:
+        if self.inotify is not None:
+            self.inotify.close()
+
+
+class LiveReload:
+    """A generation counter that wakes every connected page when it changes."""
+
+    def __init__(self) -> None:
+        self.generation = 0
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def notify(self) -> None:
+        with self.condition:
+            self.generation += 1
+            self.condition.notify_all()
+
+    def close(self) -> None:
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def wait(self, seen: int, timeout: float) -> int:
+        with self.condition:
+            self.condition.wait_for(lambda: self.closed or self.generation != seen, timeout)
+            return self.generation
+
+
+class PreviewHandler(SimpleHTTPRequestHandler):
+    server: PreviewServer
+
+    def do_GET(self) -> None:
+        self.respond(head=False)
+
+    def do_HEAD(self) -> None:
+        self.respond(head=True)
+
+    def log_message(self, format: str, *args: object) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def respond(self, *, head: bool) -> None:
+        url_path = urlsplit(self.path).path
+        if url_path == LIVE_RELOAD_PATH and self.server.reload is not None:
+            self.stream_reloads()
+            return
+        path = Path(self.translate_path(self.path))
+        if path.is_dir():
+            if not url_path.endswith("/"):
+                self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+                self.send_header("Location", url_path + "/")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            path = path / "index.html"
+        status = HTTPStatus.OK
+        if not path.is_file():
+            status = HTTPStatus.NOT_FOUND
+            path = Path(self.directory) / "404.html"
+            if not path.is_file():
+                self.send_error(HTTPStatus.NOT_FOUND)
+                return
+
+        content_type = self.guess_type(str(path))
+        wants_gzip = "gzip" in self.headers.get("Accept-Encoding", "")
+        etag, body, encoded = self.server.representation(path, content_type, gzipped=wants_gzip)
+        if status == HTTPStatus.OK and etag in {tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")}:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if encoded:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def stream_reloads(self) -> None:
+        reload = self.server.reload
+        assert reload is not None
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        seen = reload.generation
+        try:
+            while not reload.closed:
+                generation = reload.wait(seen, timeout=15)
+                if generation != seen:
+                    seen = generation
+                    self.wfile.write(b"data: reload\n\n")
+                else:
+                    self.wfile.write(b": keepalive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class PreviewServer(ThreadingHTTPServer):
+    """Serve ``root`` with ETags, gzip and, when ``live_reload`` is set, reload events."""
+
+    daemon_threads = True
+
+    def __init__(self, root: Path, port: int, *, host: str = "127.0.0.1", live_reload: bool = True, verbose: bool = False) -> None:
+        super().__init__((host, port), partial(PreviewHandler, directory=str(root)))
+        self.root = root
+        self.reload = LiveReload() if live_reload else None
+        self.verbose = verbose
+        self._cache: dict[tuple[Path, bool], tuple[Signature, str, bytes, bool]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def representation(self, path: Path, content_type: str, *, gzipped: bool) -> tuple[str, bytes, bool]:
+        """Return the ETag, body and whether it is gzipped, reusing work for unchanged files."""
+
+        current = signature(path)
+        key = (path, gzipped)
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached and cached[0] == current:
+            return cached[1:]
+        body = path.read_bytes()
+        if content_type == "text/html" and self.reload is not None:
+            body = inject_live_reload(body)
+        etag = hashlib.sha256(body).hexdigest()[:20]
+        encoded = gzipped and len(body) >= MINIMUM_GZIP_BYTES and content_type.startswith(COMPRESSIBLE_TYPES)
+        if encoded:
+            body = gzip.compress(body, compresslevel=6, mtime=0)
+            etag += "-gzip"
+        result = (f'"{etag}"', body, encoded)
+        with self._lock:
+            self._cache[key] = (current, *result)
+        return result
+
+    def notify_reload(self) -> None:
+        if self.reload is not None:
+            self.reload.notify()
+
+    def server_close(self) -> None:
+        if self.reload is not None:
+            self.reload.close()
+        super().server_close()
+
+
+def inject_live_reload(body: bytes) -> bytes:
+    index = body.lower().rfind(b"</body>")
+    if index < 0:
+        return body + LIVE_RELOAD_SCRIPT
+    return body[:index] + LIVE_RELOAD_SCRIPT + body[index:]
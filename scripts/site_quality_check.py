@@ -9,13 +9,13 @@ import re
 import sys
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from html.parser import HTMLParser
 from pathlib import Path
 from typing import Iterable
 from urllib.parse import urlparse
 from zoneinfo import ZoneInfo
 
-from public_pages import public_html_paths
+from content import Event, NewsArticle, parse_day
+from public_pages import PageCorpus, PageSummary, public_html_paths
 
 ROOT = Path(__file__).resolve().parent.parent
 OREGON_TZ = ZoneInfo("America/Los_Angeles")
@@ -41,20 +41,7 @@ class Issue:
     message: str
 
 
-class LinkExtractor(HTMLParser):
-    def __init__(self) -> None:
-        super().__init__(convert_charrefs=True)
-        self.links: list[str] = []
-
-    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
-        attrs_dict = dict(attrs)
-        for attr in ("href", "src"):
-            value = attrs_dict.get(attr)
-            if value:
-                self.links.append(value.strip())
-
-
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Validate public content quality.")
     parser.add_argument(
         "--report",
@@ -66,11 +53,11 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Treat placeholder content markers as errors.",
     )
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
-def collect_public_html() -> list[Path]:
-    return public_html_paths(ROOT, include_404=True)
+def collect_public_html(corpus: PageCorpus | None = None) -> list[Path]:
+    return public_html_paths(ROOT, include_404=True, corpus=corpus)
 
 
 def is_ignorable_url(url: str) -> bool:
@@ -119,15 +106,18 @@ def path_exists(path: Path) -> bool:
     return any(candidate.is_file() for candidate in candidate_paths(path))
 
 
-def check_html_links(pages: list[Path]) -> list[Issue]:
+def page_links(summary: PageSummary) -> list[str]:
+    return [attrs[attr].strip() for _, attrs, _ in summary.references for attr in ("href", "src") if attrs.get(attr)]
+
+
+def check_html_links(pages: list[Path], corpus: PageCorpus | None = None) -> list[Issue]:
     issues: list[Issue] = []
+    corpus = corpus or PageCorpus(ROOT)
 
     for page in pages:
         rel = page.relative_to(ROOT).as_posix()
-        parser = LinkExtractor()
-        parser.feed(page.read_text(encoding="utf-8"))
 
-        for link in parser.links:
+        for link in page_links(corpus.page(page).summary):
             if link == "#":
                 issues.append(
                     Issue(
@@ -157,13 +147,14 @@ def check_html_links(pages: list[Path]) -> list[Issue]:
     return issues
 
 
-def find_placeholder_issues(pages: list[Path], strict: bool) -> list[Issue]:
+def find_placeholder_issues(pages: list[Path], strict: bool, corpus: PageCorpus | None = None) -> list[Issue]:
     issues: list[Issue] = []
     level = "ERROR" if strict else "WARN"
+    corpus = corpus or PageCorpus(ROOT)
 
     for page in pages:
         rel = page.relative_to(ROOT).as_posix()
-        text = page.read_text(encoding="utf-8")
+        text = corpus.text(page)
         for pattern in PLACEHOLDER_PATTERNS:
             if pattern.search(text):
                 issues.append(
@@ -177,23 +168,6 @@ def find_placeholder_issues(pages: list[Path], strict: bool) -> list[Issue]:
     return issues
 
 
-def is_valid_date(value: str) -> bool:
-    try:
-        datetime.strptime(value, "%Y-%m-%d")
-    except ValueError:
-        return False
-    return True
-
-
-def parse_ymd(value: str) -> datetime | None:
-    if not isinstance(value, str) or not value.strip():
-        return None
-    try:
-        return datetime.strptime(value, "%Y-%m-%d")
-    except ValueError:
-        return None
-
-
 def require_fields(item: dict, fields: tuple[str, ...], source: str) -> list[Issue]:
     issues: list[Issue] = []
     for field in fields:
@@ -211,44 +185,43 @@ def check_news_json() -> list[Issue]:
 
     for idx, item in enumerate(data):
         source = f"news/news.json[{idx}]"
+        if not isinstance(item, dict):
+            issues.append(Issue("ERROR", source, "News entry must be an object"))
+            continue
         issues.extend(require_fields(item, REQUIRED_NEWS_FIELDS, source))
+        article = NewsArticle.from_dict(item)
 
-        url = item.get("url", "")
-        if isinstance(url, str) and url.startswith("/"):
-            if not path_exists(ROOT / url.lstrip("/")):
-                issues.append(Issue("ERROR", source, f"News URL not found: {url}"))
+        if article.url.startswith("/"):
+            if not path_exists(ROOT / article.url.lstrip("/")):
+                issues.append(Issue("ERROR", source, f"News URL not found: {article.url}"))
 
-        image = item.get("image", "")
-        if isinstance(image, str) and image.startswith("/"):
-            if not path_exists(ROOT / image.lstrip("/")):
-                issues.append(Issue("ERROR", source, f"News image not found: {image}"))
+        if article.image.startswith("/"):
+            if not path_exists(ROOT / article.image.lstrip("/")):
+                issues.append(Issue("ERROR", source, f"News image not found: {article.image}"))
 
-        for date_key in ("publishedAt", "createdAt", "updatedAt"):
-            date_value = item.get(date_key)
-            if isinstance(date_value, str) and date_value.strip() and not is_valid_date(date_value):
-                issues.append(Issue("ERROR", source, f"Invalid {date_key} date format: {date_value}"))
+        for date_key, parsed in (("publishedAt", article.published_on), ("createdAt", article.created_on), ("updatedAt", article.updated_on)):
+            raw = item.get(date_key)
+            if isinstance(raw, str) and raw.strip() and parsed is None:
+                issues.append(Issue("ERROR", source, f"Invalid {date_key} date format: {raw}"))
 
         status = item.get("status", "published")
         if not isinstance(status, str) or status not in VALID_NEWS_STATUSES:
             issues.append(Issue("ERROR", source, f"Invalid news status: {status!r}"))
             continue
 
-        created_at = parse_ymd(item.get("createdAt"))
-        published_at = parse_ymd(item.get("publishedAt"))
-        updated_at = parse_ymd(item.get("updatedAt"))
-
-        if created_at and published_at and created_at.date() > published_at.date():
+        created_at, published_at, updated_at = article.created_on, article.published_on, article.updated_on
+        if created_at and published_at and created_at > published_at:
             issues.append(Issue("WARN", source, "createdAt is after publishedAt"))
-        if published_at and updated_at and published_at.date() > updated_at.date():
+        if published_at and updated_at and published_at > updated_at:
             issues.append(Issue("WARN", source, "publishedAt is after updatedAt"))
 
-        if status == "published" and published_at and published_at.date() > today:
+        if status == "published" and published_at and published_at > today:
             issues.append(Issue("ERROR", source, "Published article has a future publishedAt date"))
 
         if status == "scheduled":
             if not published_at:
                 issues.append(Issue("ERROR", source, "Scheduled article must include publishedAt"))
-            elif published_at.date() <= today:
+            elif published_at <= today:
                 issues.append(Issue("WARN", source, "Scheduled article publishedAt is not in the future"))
 
     return issues
@@ -260,8 +233,7 @@ def check_events_json() -> list[Issue]:
     data = json.loads(path.read_text(encoding="utf-8"))
     if not isinstance(data, dict):
         return [Issue("ERROR", "events/events.json", "Expected an object with `asOf` and `events`")]
-    as_of = data.get("asOf")
-    if not isinstance(as_of, str) or not is_valid_date(as_of):
+    if parse_day(data.get("asOf")) is None:
         issues.append(Issue("ERROR", "events/events.json", "`asOf` must use YYYY-MM-DD"))
     events = data.get("events")
     if not isinstance(events, list):
@@ -274,20 +246,19 @@ def check_events_json() -> list[Issue]:
             issues.append(Issue("ERROR", source, "Event entry must be an object"))
             continue
         issues.extend(require_fields(item, REQUIRED_EVENT_FIELDS, source))
+        event = Event.from_dict(item)
 
-        date_value = item.get("date", "")
-        if isinstance(date_value, str) and date_value.strip() and not is_valid_date(date_value):
-            issues.append(Issue("ERROR", source, f"Invalid event date format: {date_value}"))
+        raw_date = item.get("date", "")
+        if isinstance(raw_date, str) and raw_date.strip() and event.date is None:
+            issues.append(Issue("ERROR", source, f"Invalid event date format: {raw_date}"))
 
-        url = item.get("url", "")
-        if isinstance(url, str) and url.startswith("/"):
-            if not path_exists(ROOT / url.lstrip("/")):
-                issues.append(Issue("ERROR", source, f"Event URL not found: {url}"))
+        if event.url.startswith("/"):
+            if not path_exists(ROOT / event.url.lstrip("/")):
+                issues.append(Issue("ERROR", source, f"Event URL not found: {event.url}"))
 
-        calendar_link = item.get("calendar_link")
-        if isinstance(calendar_link, str) and calendar_link.strip().startswith("/"):
-            if not path_exists(ROOT / calendar_link.lstrip("/")):
-                issues.append(Issue("ERROR", source, f"Calendar file not found: {calendar_link}"))
+        if event.calendar_link.startswith("/"):
+            if not path_exists(ROOT / event.calendar_link.lstrip("/")):
+                issues.append(Issue("ERROR", source, f"Calendar file not found: {event.calendar_link}"))
 
     return issues
 
@@ -317,13 +288,14 @@ def write_report(path: Path, issues: list[Issue]) -> None:
     path.write_text("\n".join(lines) + "\n", encoding="utf-8")
 
 
-def main() -> int:
-    args = parse_args()
-    pages = collect_public_html()
+def main(argv: list[str] | None = None, corpus: PageCorpus | None = None) -> int:
+    args = parse_args(argv)
+    corpus = corpus or PageCorpus(ROOT)
+    pages = collect_public_html(corpus)
 
     issues: list[Issue] = []
-    issues.extend(check_html_links(pages))
-    issues.extend(find_placeholder_issues(pages, strict=args.strict_placeholders))
+    issues.extend(check_html_links(pages, corpus))
+    issues.extend(find_placeholder_issues(pages, strict=args.strict_placeholders, corpus=corpus))
     issues.extend(check_news_json())
     issues.extend(check_events_json())
 
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Precompiled HTML fragment templates and a content-addressed fragment cache.
+
+A ``Template`` is HTML with ``{slot}`` placeholders, HTML-escaped when
+rendered, and ``{slot|safe}`` placeholders for markup that is inserted as is.
+It is compiled once into a ``str.format_map`` pattern.
+
+``FragmentCache`` memoizes rendered fragments by template name, version and
+source plus a hash of the content they were rendered from, so a card for an
+unchanged article is rendered once per build and, when the cache is saved
+under ``.build-cache``, reused by later builds.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import html
+import json
+import pickle
+import re
+from pathlib import Path
+from typing import Callable, Mapping, TypeVar
+
+
+FRAGMENT_CACHE_VERSION = 1
+SLOT_RE = re.compile(r"\{([A-Za-z_]\w*)(\|safe)?\}")
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def esc(value: object) -> str:
+    return html.escape(str(value or ""), quote=True)
+
+
+class Template:
+    """HTML with escaped ``{slot}`` and raw ``{slot|safe}`` placeholders.
+
+    Bump ``version`` when the code that computes a template's slot values
+    changes what it renders; edits to the template text are picked up anyway.
+    """
+
+    def __init__(self, name: str, source: str, *, version: int = 1) -> None:
+        self.name = name
+        self.version = version
+        pattern: list[str] = []
+        escaped: list[str] = []
+        safe: list[str] = []
+        position = 0
+        for match in SLOT_RE.finditer(source):
+            pattern.append(source[position : match.start()].replace("{", "{{").replace("}", "}}"))
+            pattern.append("{" + match.group(1) + "}")
+            (safe if match.group(2) else escaped).append(match.group(1))
+            position = match.end()
+        pattern.append(source[position:].replace("{", "{{").replace("}", "}}"))
+        self.pattern = "".join(pattern)
+        self.escaped = tuple(dict.fromkeys(escaped))
+        self.safe = tuple(dict.fromkeys(safe))
+        self.key = f"{name}:{version}:{hashlib.sha256(source.encode('utf-8')).hexdigest()[:16]}"
+
+    def render(self, values: Mapping[str, object]) -> str:
+        slots = {name: esc(values[name]) for name in self.escaped}
+        slots.update((name, values[name]) for name in self.safe)
+        return self.pattern.format_map(slots)
+
+
+def content_digest(value: object) -> str:
+    """Hash plain JSON-like data.
+
+    Pickling is several times faster than ``json.dumps`` here. Equal bytes
+    always mean equal content; equal content pickled differently (say, with
+    keys in another order) only costs a cache miss.
+    """
+
+    return hashlib.sha256(pickle.dumps(value, protocol=5)).hexdigest()
+
+
+class FragmentCache:
+    """Rendered fragments keyed by template and content hash.
+
+    ``render`` only calls ``values`` on a miss. ``save`` keeps just the
+    fragments used since loading, so entries for removed or edited content
+    do not accumulate. A cache written by a different ``revision`` of the
+    rendering code is ignored.
+    """
+
+    def __init__(self, path: Path | None = None, *, revision: str = "", fragments: dict[str, str] | None = None) -> None:
+        self.path = path
+        self.revision = revision
+        self.fragments = fragments or {}
+        self.used: dict[str, str] = {}
+        self._values: dict[tuple[str, str], object] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path: Path, *, revision: str = "") -> FragmentCache:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data.get("version") != FRAGMENT_CACHE_VERSION or data.get("revision") != revision:
+                return cls(path, revision=revision)
+            fragments = data["fragments"]
+            if not isinstance(fragments, dict):
+                return cls(path, revision=revision)
+            return cls(path, revision=revision, fragments=fragments)
+        except (OSError, ValueError, KeyError, AttributeError):
+            return cls(path, revision=revision)
+
+    def render(self, template: Template, content: object, values: Callable[[], Mapping[str, object]]) -> str:
+        key = template.key + ":" + content_digest(content)
+        fragment = self.used.get(key)
+        if fragment is None:
+            fragment = self.fragments.get(key)
+            if fragment is None:
+                self.misses += 1
+                fragment = template.render(values())
+            else:
+                self.hits += 1
+            self.used[key] = fragment
+        else:
+            self.hits += 1
+        return fragment
+
+    def memo(self, compute: Callable[[T], R], content: T, key: object = None) -> R:
+        """Return ``compute(content)``, computed once per distinct content for this cache.
+
+        ``key`` stands in for ``content`` when hashing, for records that
+        carry a digest of their own.
+        """
+
+        memo_key = (compute.__qualname__, content_digest(content if key is None else key))
+        if memo_key not in self._values:
+            self._values[memo_key] = compute(content)
+        return self._values[memo_key]  # type: ignore[return-value]
+
+    def save(self) -> None:
+        if self.path is None or self.used == self.fragments:
+            return
+        payload = {"version": FRAGMENT_CACHE_VERSION, "revision": self.revision, "fragments": dict(sorted(self.used.items()))}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":")) + "\n", encoding="utf-8")
+        except OSError:
+            return
+        self.fragments = dict(self.used)
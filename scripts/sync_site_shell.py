@@ -1,25 +1,35 @@
 #!/usr/bin/env python3
-"""Synchronize the canonical Local 083 header and footer across public pages.
+"""Synchronize the canonical Local 083 header, footer and feed links across public pages.
 
 The page body between the site header and footer is intentionally left alone.
 On the first run, the script replaces only a header before the first ``<main>``
-and the final footer. Subsequent runs update the explicitly marked regions.
+and the final footer, and adds the feed discovery links just before
+``</head>``. Subsequent runs update the explicitly marked regions.
 """
 
 from __future__ import annotations
 
 import argparse
+import html
+import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 
-from public_pages import ROOT, public_html_paths
+from generate_rss import discovery_links
+from public_pages import ROOT, PageCorpus, PublicPage, public_html_paths
+from site_output import SiteOutput
 
 
 HEADER_START = "<!-- SITE SHELL: HEADER START -->"
 HEADER_END = "<!-- SITE SHELL: HEADER END -->"
 FOOTER_START = "<!-- SITE SHELL: FOOTER START -->"
 FOOTER_END = "<!-- SITE SHELL: FOOTER END -->"
+FEEDS_START = "<!-- SITE SHELL: FEEDS START -->"
+FEEDS_END = "<!-- SITE SHELL: FEEDS END -->"
 
 NAV_ITEMS = (
     ("About", "/about.html", "about"),
@@ -36,16 +46,28 @@ MARKED_HEADER_RE = re.compile(
 MARKED_FOOTER_RE = re.compile(
     rf"{re.escape(FOOTER_START)}.*?{re.escape(FOOTER_END)}", re.DOTALL
 )
-BODY_RE = re.compile(r"<body\b[^>]*>", re.IGNORECASE)
-MAIN_RE = re.compile(r"<main\b", re.IGNORECASE)
-HEAD_END_RE = re.compile(r"</head\s*>", re.IGNORECASE)
-STYLE_RE = re.compile(r"<style\b", re.IGNORECASE)
-TAILWIND_LINK_RE = re.compile(
-    r"<link\b[^>]*href=[\"']/styles/tailwind\.css[\"'][^>]*>", re.IGNORECASE
+MARKED_FEEDS_RE = re.compile(
+    rf"{re.escape(FEEDS_START)}.*?{re.escape(FEEDS_END)}", re.DOTALL
 )
-SHELL_STYLES_LINK_RE = re.compile(
-    r"<link\b[^>]*href=[\"']/styles/site-shell\.css[\"'][^>]*>", re.IGNORECASE
+TAILWIND_HREF_RE = re.compile(r"href=[\"']/styles/tailwind\.css[\"']", re.IGNORECASE)
+SHELL_STYLES_HREF_RE = re.compile(r"href=[\"']/styles/site-shell\.css[\"']", re.IGNORECASE)
+# Every tag the shell is anchored on, found in one pass. Sharing the leading
+# "<" lets the scan skip straight between tags instead of trying each
+# alternative at every character. Shell markers stay case-sensitive.
+SHELL_TOKEN_RE = re.compile(
+    r"<(?:"
+    r"(?-i:!-- SITE SHELL: (?P<marker>HEADER|FOOTER|FEEDS) (?:START|END) -->)"
+    r"|/(?P<end>head|body)\s*>"
+    r"|/?(?P<element>header|footer)\b[^>]*>"
+    r"|(?P<tag>body|main|style|link)\b[^>]*>"
+    r")",
+    re.IGNORECASE,
 )
+# Above this many pages, ``--jobs`` spreads the work over a process pool;
+# below it, starting the workers costs more than the pages take.
+PARALLEL_MIN_PAGES = 500
+
+
 def active_section(relative_path: str) -> str | None:
     """Return the main-navigation section for a public path."""
 
@@ -78,8 +100,10 @@ def nav_link(label: str, href: str, key: str, active: str | None, *, mobile: boo
     return f'<a href="{href}" class="{classes}"{aria}>{escaped_label}</a>'
 
 
-def render_header(relative_path: str) -> str:
-    active = active_section(relative_path)
+@lru_cache(maxsize=None)
+def section_header(active: str | None) -> str:
+    """The shell header with ``active`` highlighted; it depends on nothing else, so each is rendered once."""
+
     desktop = "\n".join(
         f"                {nav_link(label, href, key, active, mobile=False)}"
         for label, href, key in NAV_ITEMS
@@ -144,8 +168,13 @@ def render_header(relative_path: str) -> str:
 {HEADER_END}"""
 
 
-def render_footer(relative_path: str) -> str:
-    privacy_current = ' aria-current="page"' if relative_path == "privacy.html" else ""
+def render_header(relative_path: str) -> str:
+    return section_header(active_section(relative_path))
+
+
+@lru_cache(maxsize=None)
+def shell_footer(privacy: bool) -> str:
+    privacy_current = ' aria-current="page"' if privacy else ""
     return f"""{FOOTER_START}
     <footer class="bg-gray-100 pt-12 pb-8 text-text-primary border-t border-gray-200" data-site-shell-footer>
         <div class="container mx-auto px-6">
@@ -192,125 +221,264 @@ def render_footer(relative_path: str) -> str:
 {FOOTER_END}"""
 
 
-def element_span(source: str, tag: str, start: int = 0, end: int | None = None, *, last: bool = False) -> tuple[int, int] | None:
-    """Locate a balanced HTML element without relying on indentation."""
+def render_footer(relative_path: str) -> str:
+    return shell_footer(relative_path == "privacy.html")
+
+
+@lru_cache(maxsize=None)
+def section_feed_links(section: str | None) -> str:
+    links = "".join(
+        f'    <link rel="alternate" type="{media_type}" title="{html.escape(title)}" href="{html.escape(url)}">\n'
+        for media_type, title, url in discovery_links(section)
+    )
+    return f"{FEEDS_START}\n{links}    {FEEDS_END}"
+
+
+def render_feed_links(relative_path: str) -> str:
+    return section_feed_links(active_section(relative_path))
+
+
+@dataclass
+class Token:
+    start: int
+    end: int
+    text: str
+
+    @property
+    def closing(self) -> bool:
+        return self.text.startswith("</")
+
+
+@dataclass
+class ShellScan:
+    """Every anchor the shell needs, found in one pass over a page."""
+
+    markers: dict[str, list[Token]] = field(default_factory=dict)
+    elements: dict[str, list[Token]] = field(default_factory=lambda: {"header": [], "footer": []})
+    head_end: Token | None = None
+    body: Token | None = None
+    body_ends: list[Token] = field(default_factory=list)
+    mains: list[Token] = field(default_factory=list)
+    style: Token | None = None
+    stylesheets: set[str] = field(default_factory=set)
+
+    def region(self, name: str) -> tuple[int, int] | None:
+        """The first marked ``name`` region, from its start marker to the next end marker."""
+
+        tokens = self.markers.get(name, [])
+        start = next((token for token in tokens if token.text.endswith("START -->")), None)
+        if start is None:
+            return None
+        end = next((token for token in tokens if token.text.endswith("END -->") and token.start >= start.end), None)
+        return (start.start, end.end) if end else None
+
+
+def scan_shell(source: str) -> ShellScan:
+    scan = ShellScan()
+    for match in SHELL_TOKEN_RE.finditer(source):
+        token = Token(match.start(), match.end(), match.group(0))
+        if match.group("marker"):
+            scan.markers.setdefault(match.group("marker"), []).append(token)
+        elif match.group("element"):
+            scan.elements[match.group("element").lower()].append(token)
+        elif match.group("end"):
+            if match.group("end").lower() == "head":
+                scan.head_end = scan.head_end or token
+            else:
+                scan.body_ends.append(token)
+        else:
+            tag = match.group("tag").lower()
+            if tag == "body":
+                scan.body = scan.body or token
+            elif tag == "main":
+                scan.mains.append(token)
+            elif tag == "style":
+                scan.style = scan.style or token
+            elif TAILWIND_HREF_RE.search(token.text):
+                scan.stylesheets.add("tailwind")
+            elif SHELL_STYLES_HREF_RE.search(token.text):
+                scan.stylesheets.add("shell")
+    return scan
+
+
+def balanced_span(tokens: list[Token], opener: int) -> tuple[int, int] | None:
+    """Where the element opened by ``tokens[opener]`` closes, counting nested openers."""
 
-    boundary = len(source) if end is None else end
-    opener_re = re.compile(rf"<{tag}\b[^>]*>", re.IGNORECASE)
-    openers = list(opener_re.finditer(source, start, boundary))
-    if not openers:
-        return None
-    opener = openers[-1] if last else openers[0]
-    token_re = re.compile(rf"</?{tag}\b[^>]*>", re.IGNORECASE)
     depth = 0
-    for token in token_re.finditer(source, opener.start()):
-        if token.group(0).lstrip().startswith("</"):
+    for token in tokens[opener:]:
+        if token.closing:
             depth -= 1
             if depth == 0:
-                return opener.start(), token.end()
-        elif not token.group(0).rstrip().endswith("/>"):
+                return tokens[opener].start, token.end
+        elif not token.text.rstrip().endswith("/>"):
             depth += 1
     return None
 
 
-def ensure_shell_styles(source: str) -> str:
-    links: list[str] = []
-    if not TAILWIND_LINK_RE.search(source):
-        links.append('    <link rel="stylesheet" href="/styles/tailwind.css">')
-    if not SHELL_STYLES_LINK_RE.search(source):
-        links.append('    <link rel="stylesheet" href="/styles/site-shell.css">')
-    if not links:
-        return source
-    style = STYLE_RE.search(source)
-    head_end = HEAD_END_RE.search(source)
-    insert_at = style.start() if style else (head_end.start() if head_end else None)
-    if insert_at is None:
-        raise ValueError("Missing </head> while adding site shell stylesheets")
-    return source[:insert_at] + "\n".join(links) + "\n" + source[insert_at:]
+def indentation_before(source: str, line_end: int) -> tuple[int, int] | None:
+    """The span of the line ending at ``line_end`` when it holds nothing but indentation."""
 
-
-def add_shell_layout_attribute(source: str) -> str:
-    body = BODY_RE.search(source)
-    if not body or "data-site-shell-added" in body.group(0):
-        return source
-    tag = body.group(0)[:-1] + " data-site-shell-added>"
-    return source[: body.start()] + tag + source[body.end() :]
+    line_start = source.rfind("\n", 0, line_end) + 1
+    line = source[line_start:line_end]
+    return (line_start, line_end) if line and not line.strip(" \t") else None
 
 
 def sync_source(source: str, relative_path: str) -> str:
-    """Return source with only the public site shell synchronized."""
+    """Return source with only the public site shell synchronized.
 
-    source = ensure_shell_styles(source)
-    had_marked_header = bool(MARKED_HEADER_RE.search(source))
-    body = BODY_RE.search(source)
-    if not body:
-        raise ValueError("Missing <body> element")
-    main = MAIN_RE.search(source, body.end())
-    header_span = None if had_marked_header else element_span(
-        source, "header", body.end(), main.start() if main else None
-    )
-    shell_less = not had_marked_header and header_span is None
+    The page is scanned once for every anchor; the stylesheet links, feed
+    links, header and footer are then spliced in with one join.
+    """
 
-    header = render_header(relative_path)
-    if had_marked_header:
-        source = MARKED_HEADER_RE.sub(lambda _: header, source, count=1)
-    elif header_span:
-        source = source[: header_span[0]] + header + source[header_span[1] :]
-    else:
-        source = add_shell_layout_attribute(source)
-        body = BODY_RE.search(source)
-        assert body is not None
-        main = MAIN_RE.search(source, body.end())
-        insert_at = main.start() if main else body.end()
-        source = source[:insert_at] + "\n    " + header + "\n\n    " + source[insert_at:]
+    scan = scan_shell(source)
+    edits: list[tuple[int, int, str]] = []
 
-    footer = render_footer(relative_path)
-    if MARKED_FOOTER_RE.search(source):
-        source = MARKED_FOOTER_RE.sub(lambda _: footer, source, count=1)
+    links = []
+    if "tailwind" not in scan.stylesheets:
+        links.append('    <link rel="stylesheet" href="/styles/tailwind.css">')
+    if "shell" not in scan.stylesheets:
+        links.append('    <link rel="stylesheet" href="/styles/site-shell.css">')
+    styles_at = None
+    if links:
+        anchor = scan.style or scan.head_end
+        if anchor is None:
+            raise ValueError("Missing </head> while adding site shell stylesheets")
+        styles_at = anchor.start
+        edits.append((styles_at, styles_at, "\n".join(links) + "\n"))
+
+    feeds = render_feed_links(relative_path)
+    feeds_region = scan.region("FEEDS")
+    if feeds_region:
+        edits.append((*feeds_region, feeds))
+    elif scan.head_end is None:
+        raise ValueError("Missing </head> while adding feed links")
     else:
-        footer_span = element_span(source, "footer", last=True)
-        if footer_span:
-            source = source[: footer_span[0]] + footer + source[footer_span[1] :]
+        head_end = scan.head_end.start
+        line_start = source.rfind("\n", 0, head_end) + 1
+        # Stylesheets added on the </head> line end in a newline, so </head> then starts its own line.
+        if styles_at is not None and line_start <= styles_at <= head_end:
+            line_start = styles_at
+        if source[line_start:head_end].strip():
+            edits.append((head_end, head_end, feeds + "\n"))
         else:
-            body_end = re.search(r"</body\s*>", source, re.IGNORECASE)
-            if not body_end:
-                raise ValueError("Missing </body> while adding footer")
-            source = source[: body_end.start()] + "\n    " + footer + "\n" + source[body_end.start() :]
+            edits.append((line_start, line_start, "    " + feeds + "\n"))
+
+    if scan.body is None:
+        raise ValueError("Missing <body> element")
+    body = scan.body
+    main = next((token for token in scan.mains if token.start >= body.end), None)
+    header = render_header(relative_path)
+    header_span = scan.region("HEADER")
+    if header_span is None:
+        boundary = main.start if main else len(source)
+        headers = scan.elements["header"]
+        opener = next((index for index, token in enumerate(headers) if not token.closing and token.start >= body.end and token.end <= boundary), None)
+        header_span = balanced_span(headers, opener) if opener is not None else None
+    if header_span:
+        edits.append((*header_span, header))
+        header_at = header_span[0]
+    else:
+        if "data-site-shell-added" not in body.text:
+            edits.append((body.start, body.end, body.text[:-1] + " data-site-shell-added>"))
+        header_at = main.start if main else body.end
+        edits.append((header_at, header_at, "\n    " + header + "\n\n    "))
     # Some redirect stubs contained an indentation-only line where the shell
     # is inserted. Keep the generated diff clean without touching body copy.
-    source = re.sub(
-        rf"(?m)^[ \t]+(?=\n[ \t]*{re.escape(HEADER_START)})",
-        "",
-        source,
-        count=1,
-    )
-    return source
-
+    # An inserted header starts its own line; a replaced one must be first on its line.
+    line_start = source.rfind("\n", 0, header_at) + 1
+    if not header_span:
+        blank = indentation_before(source, header_at)
+    elif line_start and not source[line_start:header_at].strip(" \t"):
+        blank = indentation_before(source, line_start - 1)
+    else:
+        blank = None
+    if blank:
+        edits.append((*blank, ""))
 
-def synchronize(root: Path, *, check: bool) -> tuple[list[Path], list[str]]:
+    footer = render_footer(relative_path)
+    footer_span = scan.region("FOOTER")
+    if footer_span is None:
+        # The old header is replaced, so footer tags inside it no longer count.
+        outside = [token for token in scan.elements["footer"] if not (header_span and header_span[0] <= token.start < header_span[1])]
+        opener = next((index for index in reversed(range(len(outside))) if not outside[index].closing), None)
+        footer_span = balanced_span(outside, opener) if opener is not None else None
+    if footer_span:
+        edits.append((*footer_span, footer))
+    else:
+        body_end = next((token for token in scan.body_ends if not (header_span and header_span[0] <= token.start < header_span[1])), None)
+        if body_end is None:
+            raise ValueError("Missing </body> while adding footer")
+        edits.append((body_end.start, body_end.start, "\n    " + footer + "\n"))
+
+    parts = []
+    position = 0
+    # Sorting is stable, so insertions at one position keep the order they were made in.
+    for start, end, text in sorted(edits, key=lambda edit: edit[0]):
+        parts += [source[position:start], text]
+        position = end
+    parts.append(source[position:])
+    return "".join(parts)
+
+
+def sync_page(page: tuple[str, str]) -> tuple[str, str | None]:
+    """Sync one ``(source, relative path)`` pair; return the new source, or the original and an error."""
+
+    source, relative_path = page
+    try:
+        return sync_source(source, relative_path), None
+    except ValueError as error:
+        return source, str(error)
+
+
+def sync_pages(work: list[tuple[str, str]], jobs: int = 1) -> list[tuple[str, str | None]]:
+    """Run ``sync_page`` over ``work``, in a process pool when ``jobs`` allows and the tree is large enough."""
+
+    if jobs <= 1 or len(work) < PARALLEL_MIN_PAGES:
+        return [sync_page(page) for page in work]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(sync_page, work, chunksize=max(1, len(work) // (jobs * 4))))
+
+
+def synchronize(
+    root: Path,
+    *,
+    check: bool,
+    pages: list[PublicPage] | None = None,
+    output: SiteOutput | None = None,
+    corpus: PageCorpus | None = None,
+    jobs: int = 1,
+) -> tuple[list[Path], list[str]]:
+    output = output or SiteOutput(root)
+    corpus = corpus or PageCorpus(root, output=output)
     changed: list[Path] = []
     errors: list[str] = []
-    for path in public_html_paths(root, include_404=True):
-        relative_path = path.relative_to(root).as_posix()
-        source = path.read_text(encoding="utf-8", errors="replace")
-        try:
-            updated = sync_source(source, relative_path)
-        except ValueError as error:
+    paths = public_html_paths(root, include_404=True, corpus=corpus) if pages is None else [page.path for page in pages]
+    work = [(corpus.text(path), path.relative_to(root).as_posix()) for path in paths]
+    # Writes stay in this process so the output and corpus see every page.
+    for path, (source, relative_path), (updated, error) in zip(paths, work, sync_pages(work, jobs)):
+        if error:
             errors.append(f"{relative_path}: {error}")
             continue
         if updated != source:
             changed.append(path)
             if not check:
-                path.write_text(updated, encoding="utf-8")
+                output.write_text(path, updated)
+                corpus.update(path, updated)
     return changed, errors
 
 
 def main() -> int:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("--check", action="store_true", help="Fail if any public shell is out of date")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help=f"Worker processes for trees of {PARALLEL_MIN_PAGES} pages or more (default: CPU count)",
+    )
     parser.add_argument("--root", type=Path, default=ROOT, help=argparse.SUPPRESS)
     args = parser.parse_args()
-    changed, errors = synchronize(args.root.resolve(), check=args.check)
+    changed, errors = synchronize(args.root.resolve(), check=args.check, jobs=args.jobs)
     action = "would update" if args.check else "updated"
     print(f"Site shell {action} {len(changed)} public page(s).")
     for error in errors:
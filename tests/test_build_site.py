@@ -1,5 +1,8 @@
+import json
+import os
 import sys
 import unittest
+from io import StringIO
 from pathlib import Path
 from tempfile import TemporaryDirectory
 from unittest.mock import patch
@@ -7,55 +10,308 @@ from unittest.mock import patch
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT / "scripts"))
 
+import build_cache  # noqa: E402
 import build_site  # noqa: E402
+from build_cache import BuildCache  # noqa: E402
+from build_profile import Profiler  # noqa: E402
+from site_output import OverlayOutput  # noqa: E402
 
 
-class BuildSiteDriftTests(unittest.TestCase):
-    def test_bargaining_news_outputs_come_from_bilingual_manifest(self):
-        with TemporaryDirectory() as tmp:
-            root = Path(tmp)
-            (root / "data").mkdir()
-            (root / "data" / "higher-ed-bargaining-updates.json").write_text(
-                '{"updates":[{"languages":{"en":{"url":"/news/one.html"},"es":{"url":"/news/es/uno.html"}}}]}',
-                encoding="utf-8",
-            )
+def write_news(context: build_site.BuildContext) -> list[Path]:
+    output = context.root / "news.txt"
+    context.output.write_text(output, "news")
+    return [output]
+
+
+def write_events(context: build_site.BuildContext) -> list[Path]:
+    output = context.root / "events.txt"
+    context.output.write_text(output, "events")
+    return [output]
+
+
+def write_index(context: build_site.BuildContext) -> list[Path]:
+    sources = [context.output.read_text(context.root / name) for name in ("news.txt", "events.txt")]
+    output = context.root / "index.txt"
+    context.output.write_text(output, " ".join(sources))
+    return [output]
+
+
+def write_stable_page(context: build_site.BuildContext) -> list[Path]:
+    output = context.root / "index.html"
+    context.output.write_text(output, "stable")
+    return [output]
+
 
-            self.assertEqual(
-                build_site.bargaining_news_paths(root),
-                ["news/one.html", "news/es/uno.html"],
-            )
+def delete_stale_shard(context: build_site.BuildContext) -> list[Path]:
+    context.output.delete(context.root / "api" / "stale.json")
+    return []
 
-    def test_check_detects_drift_and_restores_original_file(self):
+
+def fail(context: build_site.BuildContext) -> list[Path]:
+    raise ValueError("broken source")
+
+
+class BuildSiteDriftTests(unittest.TestCase):
+    def test_check_detects_drift_without_touching_the_tree(self):
         with TemporaryDirectory() as tmp:
             root = Path(tmp)
             generated = root / "index.html"
             generated.write_text("before", encoding="utf-8")
 
-            def fake_run(command: list[str]) -> None:
-                if command[-1] == "scripts/generate_static_content.py":
-                    generated.write_text("after", encoding="utf-8")
+            def fake_static_content(context: build_site.BuildContext) -> list[Path]:
+                context.output.write_text(generated, "after")
+                context.output.write_text(root / "news" / "new.html", "new page")
+                self.assertEqual(context.output.read_text(generated), "after")
+                return [generated]
 
             with (
                 patch.object(build_site, "ROOT", root),
-                patch.object(build_site, "GENERATED_PATHS", ["index.html"]),
-                patch.object(build_site, "run", fake_run),
+                patch.object(build_site, "STEPS", [build_site.Step("static content", fake_static_content)]),
                 patch.object(sys, "argv", ["build_site.py", "--check", "--skip-css"]),
+                patch("sys.stderr", new_callable=StringIO) as stderr,
             ):
                 self.assertEqual(build_site.main(), 1)
 
+            self.assertIn("- index.html", stderr.getvalue())
+            self.assertIn("- news/new.html", stderr.getvalue())
             self.assertEqual(generated.read_text(encoding="utf-8"), "before")
+            self.assertFalse((root / "news").exists())
+
+    def test_check_reports_files_a_build_would_delete(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            stale = root / "api" / "stale.json"
+            stale.parent.mkdir()
+            stale.write_text("[]\n", encoding="utf-8")
+
+            for jobs in ("1", "2"):
+                with (
+                    self.subTest(jobs=jobs),
+                    patch.object(build_site, "ROOT", root),
+                    patch.object(build_site, "STEPS", [build_site.Step("api", delete_stale_shard), build_site.Step("page", write_stable_page)]),
+                    patch.object(sys, "argv", ["build_site.py", "--check", "--skip-css", "--force", "--jobs", jobs]),
+                    patch("sys.stderr", new_callable=StringIO) as stderr,
+                ):
+                    self.assertEqual(build_site.main(), 1)
+                self.assertIn("- api/stale.json", stderr.getvalue())
+                self.assertTrue(stale.is_file())
+
+    def test_check_builds_read_sources_without_writing_caches(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "news").mkdir()
+            (root / "news" / "news.json").write_text('[{"title": "Story"}]', encoding="utf-8")
+            (root / "images").mkdir()
+            (root / "images" / "card.png").write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x00\x00\x00\rIHDR" + (4).to_bytes(4, "big") * 2)
+
+            context = build_site.BuildContext(root, OverlayOutput(root))
+            self.assertFalse(context.persist)
+            self.assertEqual(context.articles[0].title, "Story")
+            self.assertEqual(context.images.get("/images/card.png").width, 4)
+            self.assertFalse((root / build_site.CACHE_DIR_NAME).exists())
+
+            context = build_site.BuildContext(root)
+            self.assertEqual(context.articles[0].title, "Story")
+            self.assertEqual(context.images.get("/images/card.png").height, 4)
+            self.assertTrue((root / build_site.CACHE_DIR_NAME).is_dir())
 
     def test_check_succeeds_when_rebuild_is_stable(self):
         with TemporaryDirectory() as tmp:
             root = Path(tmp)
             (root / "index.html").write_text("stable", encoding="utf-8")
+
+            for jobs in ("1", "2"):
+                with (
+                    self.subTest(jobs=jobs),
+                    patch.object(build_site, "ROOT", root),
+                    patch.object(build_site, "STEPS", [build_site.Step("static content", write_stable_page)]),
+                    patch.object(sys, "argv", ["build_site.py", "--check", "--skip-css", "--jobs", jobs]),
+                ):
+                    self.assertEqual(build_site.main(), 0)
+
+    def test_failed_step_stops_build_and_leaves_tree_untouched(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            generated = root / "index.html"
+            generated.write_text("before", encoding="utf-8")
+            later_steps: list[str] = []
+
+            def broken(context: build_site.BuildContext) -> None:
+                context.output.write_text(generated, "partial")
+                raise ValueError("events/events.json contains no renderable events")
+
             with (
                 patch.object(build_site, "ROOT", root),
-                patch.object(build_site, "GENERATED_PATHS", ["index.html"]),
-                patch.object(build_site, "run", lambda command: None),
+                patch.object(build_site, "STEPS", [
+                    build_site.Step("static content", broken),
+                    build_site.Step("rss", lambda context: later_steps.append("rss"), after=("static content",)),
+                ]),
                 patch.object(sys, "argv", ["build_site.py", "--check", "--skip-css"]),
+                patch("sys.stderr", new_callable=StringIO),
             ):
-                self.assertEqual(build_site.main(), 0)
+                self.assertEqual(build_site.main(), 1)
+
+            self.assertEqual(later_steps, [])
+            self.assertEqual(generated.read_text(encoding="utf-8"), "before")
+
+    def test_context_parses_each_source_once(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "news").mkdir()
+            (root / "news" / "news.json").write_text('[{"title": "Story"}]', encoding="utf-8")
+            context = build_site.BuildContext(root)
+
+            self.assertIs(context.news, context.news)
+            (root / "news" / "news.json").unlink()
+            self.assertEqual(context.news, [{"title": "Story"}])
+
+
+class IncrementalBuildTests(unittest.TestCase):
+    def write_step(self, name: str, source: str, target: str, log: list[str]) -> build_site.Step:
+        def action(context: build_site.BuildContext) -> list[Path]:
+            log.append(name)
+            output = context.root / target
+            output.write_text((context.root / source).read_text(encoding="utf-8").upper(), encoding="utf-8")
+            return [output]
+
+        return build_site.Step(name, action, (source,))
+
+    def test_cache_skips_steps_until_an_input_or_output_changes(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "source.txt").write_text("one", encoding="utf-8")
+            log: list[str] = []
+            steps = [self.write_step("upper", "source.txt", "out.txt", log)]
+            cache_path = root / ".build-cache" / "steps.json"
+
+            def build() -> list[str]:
+                cache = BuildCache.load(cache_path)
+                ran = build_site.run(steps, build_site.BuildContext(root), cache=cache)
+                cache.save()
+                return ran
+
+            self.assertEqual(build(), ["upper"])
+            self.assertEqual(build(), [])
+            (root / "source.txt").write_text("two", encoding="utf-8")
+            self.assertEqual(build(), ["upper"])
+            (root / "out.txt").unlink()
+            self.assertEqual(build(), ["upper"])
+            self.assertEqual((root / "out.txt").read_text(encoding="utf-8"), "TWO")
+
+    def test_interrupted_cache_save_keeps_the_previous_cache(self):
+        with TemporaryDirectory() as tmp:
+            cache_path = Path(tmp) / ".build-cache" / "steps.json"
+            cache = BuildCache(cache_path, {"upper": {"inputs": {}, "outputs": {}}})
+            cache.save()
+            cache.record("lower", {}, {})
+            with patch.object(build_cache.os, "replace", side_effect=KeyboardInterrupt), self.assertRaises(KeyboardInterrupt):
+                cache.save()
+            self.assertEqual(list(BuildCache.load(cache_path).steps), ["upper"])
+            self.assertEqual([path.name for path in cache_path.parent.iterdir()], ["steps.json"])
+
+    def test_cache_keys_images_on_size_and_mtime(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            image = root / "images" / "hero.webp"
+            image.parent.mkdir()
+            image.write_bytes(b"RIFF")
+            log: list[str] = []
+            step = self.write_step("pages", "images/hero.webp", "out.txt", log)
+            steps = [build_site.Step(step.name, step.action, ("images/**/*",))]
+            cache_path = root / ".build-cache" / "steps.json"
+
+            def build() -> list[str]:
+                cache = BuildCache.load(cache_path)
+                ran = build_site.run(steps, build_site.BuildContext(root), cache=cache)
+                cache.save()
+                return ran
+
+            self.assertEqual(build(), ["pages"])
+            with patch.object(build_cache, "file_digest", wraps=build_cache.file_digest) as hashed:
+                self.assertEqual(build(), [])
+            self.assertNotIn(image, [call.args[0] for call in hashed.call_args_list])
+            os.utime(image, ns=(image.stat().st_atime_ns, image.stat().st_mtime_ns + 1_000_000_000))
+            self.assertEqual(build(), ["pages"])
+
+    def test_since_runs_changed_steps_and_their_downstream_steps(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            for name in ("a.txt", "c.txt"):
+                (root / name).write_text(name, encoding="utf-8")
+            log: list[str] = []
+            steps = [
+                self.write_step("first", "a.txt", "b.txt", log),
+                self.write_step("second", "b.txt", "d.txt", log),
+                self.write_step("unrelated", "c.txt", "e.txt", log),
+            ]
+
+            ran = build_site.run(steps, build_site.BuildContext(root), changed={"a.txt"})
+
+            self.assertEqual(ran, ["first", "second"])
+
+
+class SchedulerTests(unittest.TestCase):
+    def test_parallel_steps_wait_for_their_dependencies(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            steps = [
+                build_site.Step("index", write_index, after=("news", "events")),
+                build_site.Step("news", write_news),
+                build_site.Step("events", write_events),
+            ]
+
+            ran = build_site.run(steps, build_site.BuildContext(root), jobs=2)
+
+            self.assertEqual(ran[-1], "index")
+            self.assertEqual((root / "index.txt").read_text(encoding="utf-8"), "news events")
+
+    def test_failure_names_the_step_and_skips_dependents(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            steps = [
+                build_site.Step("news", fail),
+                build_site.Step("index", write_index, after=("news",)),
+            ]
+            for jobs in (1, 2):
+                with self.subTest(jobs=jobs), self.assertRaisesRegex(build_site.BuildStepError, "news: broken source"):
+                    build_site.run(steps, build_site.BuildContext(root), jobs=jobs)
+            self.assertFalse((root / "index.txt").exists())
+
+    def test_rejects_circular_dependencies(self):
+        steps = [
+            build_site.Step("a", write_news, after=("b",)),
+            build_site.Step("b", write_events, after=("a",)),
+        ]
+        with self.assertRaisesRegex(build_site.BuildStepError, "circular"):
+            build_site.run(steps, build_site.BuildContext(Path(".")))
+
+
+class ProfileTests(unittest.TestCase):
+    def test_profile_records_steps_sub_stages_and_io(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "news.txt").write_text("news", encoding="utf-8")
+            (root / "events.txt").write_text("events", encoding="utf-8")
+            profiler = Profiler()
+            profiler.install_io_counters()
+            profiler.instrument(sys.modules[__name__], "write_index")
+            profiler.start()
+            try:
+                build_site.run([build_site.Step("index", lambda context: write_index(context))], build_site.BuildContext(root), jobs=2, profiler=profiler)
+            finally:
+                profiler.stop()
+
+            self.assertIs(Path.read_bytes, Path.__dict__["read_bytes"])
+            totals = profiler.totals()
+            self.assertEqual(list(totals), ["index", f"{__name__}.write_index"])
+            self.assertEqual((totals["index"].files_read, totals["index"].files_written), (2, 1))
+            self.assertEqual(totals["index"].bytes_written, len("news events"))
+
+            summary_path = profiler.write(root / "profile" / "trace.json")
+            trace = json.loads((root / "profile" / "trace.json").read_text(encoding="utf-8"))
+            self.assertEqual([event["name"] for event in trace["traceEvents"]], ["index", f"{__name__}.write_index"])
+            self.assertEqual(trace["traceEvents"][0]["ph"], "X")
+            self.assertIn("write_index", summary_path.read_text(encoding="utf-8"))
 
 
 if __name__ == "__main__":
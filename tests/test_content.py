@@ -0,0 +1,130 @@
+import json
+import pickle
+import sys
+import tempfile
+import unittest
+from datetime import date, datetime, timezone
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from content import (  # noqa: E402
+    CONTENT_CACHE,
+    CONTENT_SCHEMA_VERSION,
+    BargainingUpdate,
+    NewsArticle,
+    load_bargaining,
+    load_events,
+    load_news,
+    parse_day,
+    read_news,
+)
+from publish_scheduled_news import is_due  # noqa: E402
+
+
+class ContentModelTests(unittest.TestCase):
+    def test_news_dates_tags_and_urls_are_normalised_once(self):
+        data = {
+            "title": "Story", "url": " /news/story.html ", "tags": ["Bargaining", " Update ", "", "Bargaining", 3],
+            "publishedAt": "2026-07-12", "createdAt": "not a date", "status": " ", "author": {"name": "Local 083"},
+        }
+        article = load_news([data, "not an object"])[0]
+
+        self.assertEqual(article.url, "/news/story.html")
+        self.assertEqual(article.tags, ("Bargaining", "Update"))
+        self.assertEqual(article.status, "published")
+        self.assertEqual(article.author, "Local 083")
+        self.assertEqual(article.published_on, date(2026, 7, 12))
+        # Date-only values are midnight in Oregon.
+        self.assertEqual(article.published_at, datetime(2026, 7, 12, 7, tzinfo=timezone.utc))
+        self.assertIsNone(article.created_on)
+        self.assertIs(article.data, data)
+        self.assertEqual(pickle.loads(pickle.dumps(article)), article)
+
+    def test_timestamps_set_the_instant_but_not_the_editorial_date(self):
+        article = NewsArticle.from_dict({"publishedAt": "2026-07-12T18:30:00Z", "status": "scheduled"})
+        self.assertIsNone(article.published_on)
+        self.assertEqual(article.published_at, datetime(2026, 7, 12, 18, 30, tzinfo=timezone.utc))
+        self.assertFalse(is_due(article, datetime(2026, 7, 12, 18, 29, tzinfo=timezone.utc)))
+        self.assertTrue(is_due(article, datetime(2026, 7, 12, 18, 30, tzinfo=timezone.utc)))
+
+    def test_event_calendar_keeps_the_source_entries(self):
+        entries = [{"date": "2026-07-20", "title": "Meeting"}, {"date": "July 20", "title": "Bad date"}, "skip"]
+        calendar = load_events({"asOf": "2026-07-12", "events": entries})
+        self.assertEqual(calendar.as_of, date(2026, 7, 12))
+        self.assertIs(calendar.entries, entries)
+        self.assertEqual([event.date for event in calendar.events], [date(2026, 7, 20), None])
+        with self.assertRaisesRegex(ValueError, "`events` array"):
+            load_events(entries)
+
+    def test_parse_day_matches_strptime(self):
+        for value in ("2026-07-01", "2026-7-1", "2026-02-30", "20260701", " 2026-07-01", "", None):
+            try:
+                expected = datetime.strptime(value, "%Y-%m-%d").date()
+            except (TypeError, ValueError):
+                expected = None
+            self.assertEqual(parse_day(value), expected, value)
+
+    def test_bargaining_updates_require_editorial_dates(self):
+        update = BargainingUpdate.from_dict({"date": "2026-07-09", "tags": ["Bargaining"], "languages": {"en": {}, "es": {}}})
+        self.assertEqual(update.date, date(2026, 7, 9))
+        with self.assertRaisesRegex(ValueError, "YYYY-MM-DD"):
+            BargainingUpdate.from_dict({"date": "July 9", "languages": {}})
+
+        manifest = load_bargaining({
+            "author": {"name": "Team"},
+            "source": {"accessedAt": "2026-07-10"},
+            "updates": [{"date": "2026-07-09", "languages": {"en": {}, "es": {}}}],
+        })
+        self.assertEqual(manifest.author["name"], "Team")
+        self.assertEqual([update.date for update in manifest.updates], [date(2026, 7, 9)])
+        with self.assertRaisesRegex(ValueError, "JSON object"):
+            load_bargaining([])
+
+
+class ContentCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = Path(self.tmp.name)
+        self.source = self.root / "news" / "news.json"
+        self.source.parent.mkdir()
+        self.source.write_text(json.dumps([{"title": "One", "publishedAt": "2026-07-12"}]), encoding="utf-8")
+
+    def test_warm_reads_skip_json_decoding(self):
+        cold = read_news(self.root)
+        self.assertTrue(any((self.root / CONTENT_CACHE).glob("news.json.*.pickle")))
+        with mock.patch("content.json.loads", side_effect=AssertionError("decoded JSON")):
+            warm = read_news(self.root)
+        self.assertEqual(warm, cold)
+        self.assertEqual(warm[0].data, {"title": "One", "publishedAt": "2026-07-12"})
+
+    def test_changed_sources_and_stale_caches_are_reparsed(self):
+        read_news(self.root)
+        self.source.write_text(json.dumps([{"title": "Two"}]), encoding="utf-8")
+        self.assertEqual([article.title for article in read_news(self.root)], ["Two"])
+
+        for path in (self.root / CONTENT_CACHE).glob("*.pickle"):
+            path.write_bytes(b"corrupt")
+        self.assertEqual([article.title for article in read_news(self.root)], ["Two"])
+
+        with mock.patch("content.CONTENT_SCHEMA_VERSION", CONTENT_SCHEMA_VERSION + 1):
+            with mock.patch("content.load_news", return_value=[]) as parse:
+                read_news(self.root)
+        parse.assert_called_once()
+
+    def test_failed_cache_writes_leave_no_temporary_files(self):
+        with mock.patch("content.pickle.dump", side_effect=pickle.PicklingError("unpicklable")):
+            with self.assertRaises(pickle.PicklingError):
+                read_news(self.root)
+        self.assertEqual(list((self.root / CONTENT_CACHE).iterdir()), [])
+
+    def test_uncached_reads_write_nothing(self):
+        self.assertEqual(read_news(self.root, cache=False)[0].title, "One")
+        self.assertFalse((self.root / CONTENT_CACHE).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
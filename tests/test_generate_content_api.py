@@ -0,0 +1,98 @@
+import json
+import sys
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import generate_content_api as api  # noqa: E402
+from content import load_events, load_news  # noqa: E402
+from image_manifest import group  # noqa: E402
+
+
+def story(index: int, **fields) -> dict:
+    return {
+        "title": f"Story {index}", "description": "Body", "url": f"/news/{index}.html", "image": "/images/card.webp",
+        "alt": "", "tags": ["Update"], "author": {"name": "Local 083", "title": "Staff", "email": "x@example.org"},
+        "publishedAt": f"2026-07-{index + 1:02d}", "createdAt": "2026-06-30", "updatedAt": f"2026-07-{index + 1:02d}",
+        **fields,
+    }
+
+
+IMAGES = group({
+    "/images/card.webp": (1280, 720),
+    "/images/card-192.webp": (192, 192),
+    "/images/card-480w.webp": (480, 270),
+})
+
+
+class ContentApiTests(unittest.TestCase):
+    def setUp(self):
+        self.articles = load_news([
+            story(0, tags=["Bargaining", "Español"], featured=True),
+            story(1, status="scheduled"),
+            story(2, publishedAt="2025-12-31", tags=["Bargaining"]),
+            story(3, status="published"),
+        ])
+        self.calendar = load_events({"asOf": "2026-07-10", "events": [
+            {"date": "2026-07-20", "title": "Later", "url": "/events/later.html", "time": "Noon", "type": "Meeting"},
+            {"date": "2026-07-01", "title": "Earlier", "url": "/events/earlier.html", "location_detail": "Online"},
+            {"date": "2025-11-05", "title": "Last year", "url": "/events/old.html"},
+            {"date": "2026-07-21", "title": "No link"},
+        ]})
+
+    def test_shards_hold_public_items_in_display_order(self):
+        shards = api.shards(self.articles, self.calendar, IMAGES)
+
+        self.assertEqual([item["title"] for item in shards["news/latest.json"]], ["Story 3", "Story 0", "Story 2"])
+        self.assertEqual([item["title"] for item in shards["news/years/2026.json"]], ["Story 3", "Story 0"])
+        self.assertEqual([item["title"] for item in shards["news/tags/bargaining.json"]], ["Story 0", "Story 2"])
+        self.assertEqual([item["title"] for item in shards["news/tags/espanol.json"]], ["Story 0"])
+        first = shards["news/tags/espanol.json"][0]
+        self.assertEqual(first["author"], {"name": "Local 083", "title": "Staff"})
+        self.assertEqual((first["displayDate"], first["displayDateLong"], first["displayUpdated"]), ("Jul 1, 2026", "July 1, 2026", "July 1, 2026"))
+        self.assertNotIn("status", first)
+        self.assertEqual(
+            (first["imageSrc"], first["imageSrcset"], first["imageWidth"], first["imageHeight"], first["thumbnail"]),
+            ("/images/card-480w.webp", "/images/card-480w.webp 480w", 480, 270, "/images/card-192.webp"),
+        )
+
+        upcoming = shards["events/upcoming.json"]
+        self.assertEqual(upcoming["asOf"], "2026-07-10")
+        self.assertEqual([event["title"] for event in upcoming["events"]], ["Later"])
+        self.assertEqual(upcoming["events"][0]["displayDate"], "Mon, Jul 20, 2026")
+        self.assertEqual([event["title"] for event in shards["events/years/2026.json"]["events"]], ["Earlier", "Later"])
+
+        manifest = shards["manifest.json"]
+        self.assertEqual(manifest["news"]["count"], 3)
+        self.assertEqual([(shard["year"], shard["count"]) for shard in manifest["news"]["years"]], [(2026, 2), (2025, 1)])
+        self.assertEqual([shard["tag"] for shard in manifest["news"]["tags"]], ["Bargaining", "Español", "Update"])
+        self.assertEqual(manifest["events"]["upcoming"]["path"], "/api/events/upcoming.json")
+
+    def test_build_writes_shards_and_prunes_stale_ones(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            stale = root / "api" / "news" / "tags" / "retired.json"
+            stale.parent.mkdir(parents=True)
+            stale.write_text("[]\n", encoding="utf-8")
+
+            written = api.build(root, articles=self.articles, event_calendar=self.calendar, images=IMAGES)
+
+            self.assertFalse(stale.exists())
+            self.assertIn(root / "api" / "manifest.json", written)
+            manifest = json.loads((root / "api" / "manifest.json").read_text(encoding="utf-8"))
+            for shard in manifest["news"]["years"]:
+                self.assertTrue((root / shard["path"].lstrip("/")).is_file())
+
+    def test_tags_sharing_a_slug_share_a_shard(self):
+        articles = load_news([story(0, tags=["update!", "Update"]), story(1, tags=["update"])])
+        shards = api.shards(articles, self.calendar, IMAGES)
+
+        self.assertEqual([(shard["tag"], shard["slug"], shard["count"]) for shard in shards["manifest.json"]["news"]["tags"]], [("Update", "update", 2)])
+        self.assertEqual(len(shards["news/tags/update.json"]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import sys
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import generate_image_derivatives as derivatives  # noqa: E402
+from generate_image_derivatives import Derivative, fitting, generate, page_images, plan, used_images  # noqa: E402
+from image_manifest import scan  # noqa: E402
+from public_pages import PageCorpus  # noqa: E402
+
+
+def webp(width: int, height: int, padding: int = 0) -> bytes:
+    """An extended-format WebP header, padded to stand in for the encoded image."""
+
+    header = b"WEBPVP8X" + (10).to_bytes(4, "little") + bytes(4) + (width - 1).to_bytes(3, "little") + (height - 1).to_bytes(3, "little")
+    return b"RIFF" + (len(header) + padding).to_bytes(4, "little") + header + bytes(padding)
+
+
+def fake_encoder(derivative: Derivative) -> Derivative:
+    derivative.target.write_bytes(webp(derivative.width, derivative.height))
+    return derivative
+
+
+class ImageDerivativeTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "images").mkdir()
+        (self.root / "images" / "rally.webp").write_bytes(webp(1800, 1000, padding=9000))
+        (self.root / "images" / "logo.webp").write_bytes(webp(400, 400))
+        (self.root / "images" / "unused.webp").write_bytes(webp(2000, 1000))
+        (self.root / "index.html").write_text(
+            '<link rel="canonical" href="https://www.local083.org/">'
+            '<img src="/images/rally.webp" alt=""><img src="/images/logo.webp?v=2" alt="">',
+            encoding="utf-8",
+        )
+        self.corpus = PageCorpus(self.root)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def targets(self, pending: list[Derivative]) -> list[str]:
+        return [derivative.target.name for derivative in pending]
+
+    def test_plans_missing_widths_for_used_images_and_thumbnails_for_news_images(self):
+        used = used_images(self.root, self.corpus, {"/images/logo.webp"})
+        self.assertEqual(used, {"/images/rally.webp", "/images/logo.webp"})
+
+        pending = plan(self.root, scan(self.root), used, {"/images/logo.webp"}, {})
+
+        self.assertEqual(self.targets(pending), ["logo-192.webp", "rally-480w.webp", "rally-960w.webp", "rally-1440w.webp"])
+        self.assertEqual(pending[0].crop, (0, 0, 400, 400))
+        self.assertEqual((pending[1].width, pending[1].height), (480, 267))
+
+    def test_keeps_derivatives_the_cache_did_not_make_and_regenerates_stale_ones(self):
+        (self.root / "images" / "rally-480w.webp").write_bytes(webp(480, 267))
+        used = {"/images/rally.webp"}
+        cache: dict[str, dict[str, str]] = {}
+
+        pending = plan(self.root, scan(self.root), used, set(), cache)
+        self.assertEqual(self.targets(pending), ["rally-960w.webp", "rally-1440w.webp"])
+        self.assertEqual(generate(self.root, pending, cache, encoder=fake_encoder), [derivative.target for derivative in pending])
+        self.assertEqual(sorted(cache), ["images/rally-1440w.webp", "images/rally-960w.webp"])
+
+        # Nothing changed, so nothing is encoded again.
+        self.assertEqual(plan(self.root, scan(self.root), used, set(), cache), [])
+
+        # A new source regenerates what the cache made, but not the hand-made variant.
+        (self.root / "images" / "rally.webp").write_bytes(webp(1800, 1000, padding=100))
+        self.assertEqual(self.targets(plan(self.root, scan(self.root), used, set(), cache)), ["rally-960w.webp", "rally-1440w.webp"])
+
+        # An edited derivative is left alone.
+        (self.root / "images" / "rally-960w.webp").write_bytes(webp(960, 533, padding=4))
+        self.assertEqual(self.targets(plan(self.root, scan(self.root), used, set(), cache)), ["rally-1440w.webp"])
+
+    def test_picks_the_narrowest_candidate_covering_a_phone_screen(self):
+        self.assertEqual(fitting([(1440, "l"), (480, "s"), (960, "m")]), "m")
+        self.assertEqual(fitting([(480, "s"), (640, "m")]), "m")
+
+    def test_reports_phone_bytes_with_estimates_for_pending_variants(self):
+        manifest = scan(self.root)
+        pending = plan(self.root, manifest, {"/images/rally.webp"}, set(), {})
+        source = (self.root / "images" / "rally.webp").stat().st_size
+        logo = (self.root / "images" / "logo.webp").stat().st_size
+
+        [row] = page_images(self.root, manifest, self.corpus, pending)
+
+        self.assertEqual((row.page, row.images), ("index.html", 2))
+        self.assertEqual(row.current, source + logo)
+        self.assertEqual(row.responsive, round(source * (960 * 533) / (1800 * 1000)) + logo)
+        self.assertEqual(page_images(self.root, manifest, self.corpus)[0].saved, 0)
+
+        generate(self.root, pending, {}, encoder=fake_encoder)
+        [row] = page_images(self.root, scan(self.root), self.corpus)
+        self.assertEqual(row.responsive, len(webp(960, 533)) + logo)
+
+        report = self.root / "report.md"
+        derivatives.write_report(report, [row], [pending[0].target], [])
+        self.assertIn("| `index.html` | 2 |", report.read_text(encoding="utf-8"))
+
+
+if __name__ == "__main__":
+    unittest.main()
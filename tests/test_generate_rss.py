@@ -1,12 +1,47 @@
+import json
 import sys
 import unittest
-from datetime import datetime, timezone
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from tempfile import TemporaryDirectory
 
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT / "scripts"))
 
 import generate_rss as rss  # noqa: E402
+from site_output import OverlayOutput, SiteOutput  # noqa: E402
+
+
+# tests/golden/rss-feed.xml holds these items as the ElementTree-to-minidom serializer wrote them.
+GOLDEN_ITEMS = [
+    {
+        "title": 'Bargaining "update" & <next> steps',
+        "link": "https://www.local083.org/news/update.html?lang=en&ref=feed",
+        "description": "Members said: it's time > talk.\r\nSecond line\rthird line ]]> done",
+        "pub_date": datetime(2026, 8, 7, 7, tzinfo=timezone.utc),
+        "guid": "https://www.local083.org/news/update.html?lang=en&ref=feed",
+        "guid_is_permalink": True,
+        "categories": ["Bargaining", "R&D", ""],
+    },
+    {
+        "title": "Negociación: ¡ahora! — “citas” 🎉",
+        "link": "https://www.local083.org/news/es/negociacion.html",
+        "description": "",
+        "pub_date": datetime(2026, 8, 6, 23, 30, tzinfo=timezone(timedelta(hours=-7))),
+        "guid": "event:2026-08-06:Negociación",
+        "guid_is_permalink": False,
+    },
+    {
+        "title": "  Spaced   title  ",
+        "link": "https://www.local083.org/events/spaced.html",
+        "description": "\tTabbed\tdescription ",
+        "pub_date": datetime(1970, 1, 1, tzinfo=timezone.utc),
+        "guid": "spaced",
+        "guid_is_permalink": False,
+        "categories": [],
+    },
+]
 
 
 class RssDeterminismTests(unittest.TestCase):
@@ -29,15 +64,163 @@ class RssDeterminismTests(unittest.TestCase):
                 "guid_is_permalink": False,
             }],
         )
-        channel = feed.find("channel")
+        channel = ET.fromstring(feed).find("channel")
         self.assertIsNotNone(channel)
         self.assertEqual(channel.findtext("lastBuildDate"), rss.to_rfc2822(date))
 
-    def test_event_entries_uses_versioned_events_payload(self):
-        events = [{"title": "Meeting"}]
-        self.assertIs(rss.event_entries({"asOf": "2026-07-12", "events": events}), events)
-        with self.assertRaises(ValueError):
-            rss.event_entries(events)
+    def test_streamed_feed_matches_the_minidom_golden_file_byte_for_byte(self):
+        feed = rss.build_feed(title="Golden & <feed>", description='A "feed" for tests', self_path="/golden.xml", items=GOLDEN_ITEMS)
+
+        self.assertEqual(feed.encode("utf-8"), (ROOT / "tests" / "golden" / "rss-feed.xml").read_bytes())
+        self.assertEqual(len(ET.fromstring(feed).findall("channel/item")), len(GOLDEN_ITEMS))
+
+    def test_empty_feed_has_a_channel_and_no_items(self):
+        feed = rss.build_feed(title="Empty", description="No items", self_path="/empty.xml", items=[])
+
+        self.assertTrue(feed.endswith('rel="self" type="application/rss+xml"/>\n  </channel>\n</rss>\n'))
+        self.assertIn("<lastBuildDate>Thu, 01 Jan 1970 00:00:00 GMT</lastBuildDate>", feed)
+
+    def test_rejects_characters_xml_cannot_represent(self):
+        with self.assertRaisesRegex(ValueError, "XML cannot represent"):
+            rss.build_feed(title="Bad \x0b title", description="", self_path="/feed.xml", items=[])
+
+
+def numbered_items(count):
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "title": f"Story {number}",
+            "link": f"https://www.local083.org/news/{number}.html",
+            "description": "",
+            "pub_date": start + timedelta(days=number),
+            "guid": f"https://www.local083.org/news/{number}.html",
+            "guid_is_permalink": True,
+        }
+        for number in reversed(range(count))
+    ]
+
+
+def titles(items):
+    return [int(item["title"].split()[1]) for item in items]
+
+
+class RssArchiveTests(unittest.TestCase):
+    FEED = {"title": "News", "description": "Test feed", "self_path": "/news/rss.xml"}
+
+    def test_only_full_pages_of_the_oldest_items_are_archived(self):
+        current, pages = rss.split_archives(numbered_items(15), window=5, page_size=4)
+
+        self.assertEqual(titles(current), list(reversed(range(8, 15))))
+        self.assertEqual([titles(page) for page in pages], [[3, 2, 1, 0], [7, 6, 5, 4]])
+        self.assertEqual(rss.split_archives(numbered_items(8), window=5, page_size=4), (numbered_items(8), []))
+
+    def test_archive_pages_link_to_the_feed_and_each_other(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            written = rss.write_feeds(root, {**self.FEED, "items": numbered_items(13)}, SiteOutput(root), {}, window=5, page_size=4)
+
+            self.assertEqual(
+                [path.relative_to(root).as_posix() for path in written],
+                ["news/rss.xml", "news/atom.xml", "news/feed.json", "news/rss-archive/1.xml", "news/rss-archive/2.xml"],
+            )
+            links = {}
+            for path in written[:1] + written[3:]:
+                channel = ET.parse(path).getroot().find("channel")
+                links[path.name] = {link.get("rel"): link.get("href") for link in channel.findall(f"{{{rss.ATOM_NS}}}link")}
+                self.assertEqual(channel.find(f"{{{rss.HISTORY_NS}}}archive") is not None, path.name != "rss.xml")
+            self.assertEqual(links["rss.xml"]["prev-archive"], "https://www.local083.org/news/rss-archive/2.xml")
+            self.assertEqual(links["1.xml"]["current"], "https://www.local083.org/news/rss.xml")
+            self.assertEqual(links["1.xml"]["next-archive"], "https://www.local083.org/news/rss-archive/2.xml")
+            self.assertNotIn("prev-archive", links["1.xml"])
+            self.assertEqual(links["2.xml"]["prev-archive"], "https://www.local083.org/news/rss-archive/1.xml")
+            self.assertNotIn("next-archive", links["2.xml"])
+
+    def test_unchanged_archive_pages_are_not_rendered_again(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            ledger = {}
+            rss.write_feeds(root, {**self.FEED, "items": numbered_items(13)}, SiteOutput(root), ledger, window=5, page_size=4)
+            self.assertEqual(sorted(ledger), ["news/rss-archive/1.xml", "news/rss-archive/2.xml"])
+
+            # Two new stories change the feed but not the archived ones.
+            output = SiteOutput(root)
+            rendered = []
+            original = rss.build_feed
+            rss.build_feed = lambda **spec: rendered.append(spec["self_path"]) or original(**spec)
+            try:
+                rss.write_feeds(root, {**self.FEED, "items": numbered_items(15)}, output, ledger, window=5, page_size=4)
+            finally:
+                rss.build_feed = original
+            self.assertEqual(rendered, ["/news/rss.xml"])
+            self.assertEqual(output.updated, {root / "news" / name for name in ("rss.xml", "atom.xml", "feed.json")})
+
+            # Fewer stories drop the newest archive page and relink the first.
+            rss.write_feeds(root, {**self.FEED, "items": numbered_items(9)}, SiteOutput(root), ledger, window=5, page_size=4)
+            self.assertEqual(sorted(path.name for path in (root / "news" / "rss-archive").iterdir()), ["1.xml"])
+            self.assertNotIn("next-archive", (root / "news" / "rss-archive" / "1.xml").read_text(encoding="utf-8"))
+
+    def test_check_builds_leave_stale_archive_pages_alone(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            rss.write_feeds(root, {**self.FEED, "items": numbered_items(13)}, SiteOutput(root), {}, window=5, page_size=4)
+
+            rss.write_feeds(root, {**self.FEED, "items": numbered_items(5)}, OverlayOutput(root), {}, window=5, page_size=4)
+
+            self.assertTrue((root / "news" / "rss-archive" / "2.xml").is_file())
+
+
+
+class FeedFormatTests(unittest.TestCase):
+    def test_atom_and_json_feed_render_the_same_items(self):
+        feed = {"title": "News", "description": "Test & feed", "self_path": "/news/rss.xml", "items": GOLDEN_ITEMS}
+
+        atom = ET.fromstring(rss.build_atom_feed(**feed))
+        entries = atom.findall(f"{{{rss.ATOM_NS}}}entry")
+        self.assertEqual(atom.find(f"{{{rss.ATOM_NS}}}id").text, "https://www.local083.org/news/atom.xml")
+        self.assertEqual(atom.find(f"{{{rss.ATOM_NS}}}updated").text, "2026-08-07T07:00:00Z")
+        self.assertEqual([entry.find(f"{{{rss.ATOM_NS}}}title").text for entry in entries], [item["title"] for item in GOLDEN_ITEMS])
+        self.assertEqual(entries[1].find(f"{{{rss.ATOM_NS}}}id").text, "tag:www.local083.org,2025:event:2026-08-06:Negociaci%C3%B3n")
+        self.assertEqual(entries[1].find(f"{{{rss.ATOM_NS}}}published").text, "2026-08-07T06:30:00Z")
+        self.assertIsNone(entries[1].find(f"{{{rss.ATOM_NS}}}summary"))
+        self.assertEqual([category.get("term") for category in entries[0].findall(f"{{{rss.ATOM_NS}}}category")], ["Bargaining", "R&D"])
+
+        payload = json.loads(rss.build_json_feed(**feed))
+        self.assertEqual(payload["version"], "https://jsonfeed.org/version/1.1")
+        self.assertEqual(payload["feed_url"], "https://www.local083.org/news/feed.json")
+        self.assertEqual([item["id"] for item in payload["items"]], [item["guid"] for item in GOLDEN_ITEMS])
+        self.assertEqual(payload["items"][0]["tags"], ["Bargaining", "R&D"])
+        self.assertNotIn("tags", payload["items"][2])
+
+    def test_tag_feeds_filter_the_sorted_news_items(self):
+        items = [{**item, "categories": categories} for item, categories in zip(numbered_items(3), (["Español", "Rally"], ["Rally"], []))]
+
+        feeds = rss.tag_feeds(items)
+
+        self.assertEqual([feed["self_path"] for feed in feeds], ["/news/tags/espanol/rss.xml", "/news/tags/rally/rss.xml"])
+        self.assertEqual(feeds[0]["title"], "SEIU Local 503 at OSU - News: Español")
+        self.assertEqual(titles(feeds[1]["items"]), [2, 1])
+
+        merged = rss.tag_feeds([{**items[0], "categories": ["rally!", "Espanol"]}, {**items[1], "categories": ["Rally", "rally!"]}, items[2]])
+        self.assertEqual([feed["self_path"] for feed in merged], ["/news/tags/espanol/rss.xml", "/news/tags/rally/rss.xml"])
+        self.assertEqual(merged[1]["title"], "SEIU Local 503 at OSU - News: Rally")
+        self.assertEqual(titles(merged[1]["items"]), [2, 1])
+        self.assertEqual(rss.tag_feeds([{**items[0], "categories": ["日本語"]}])[0]["self_path"][:15], "/news/tags/tag-")
+
+    def test_removed_tags_lose_their_feeds(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            kept = root / "news" / "tags" / "update" / "rss.xml"
+            kept.parent.mkdir(parents=True)
+            kept.write_text("new", encoding="utf-8")
+            stale = root / "news" / "tags" / "rally"
+            (stale / "rss-archive").mkdir(parents=True)
+            for path in (stale / "rss.xml", stale / "feed.json", stale / "rss-archive" / "1.xml"):
+                path.write_text("old", encoding="utf-8")
+
+            rss.prune_tag_feeds(root, [kept])
+
+            self.assertFalse(stale.exists())
+            self.assertTrue(kept.is_file())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,101 @@
+import json
+import sys
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import generate_search_index as search  # noqa: E402
+from generate_search_index import SearchDocument  # noqa: E402
+from site_output import SiteOutput  # noqa: E402
+from sync_site_shell import FOOTER_END, FOOTER_START, HEADER_END, HEADER_START  # noqa: E402
+
+
+PAGE = f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <title>Strike  Vote</title>
+    <meta name="description" content="How the strike authorization vote works.">
+    <script>var hidden = "javascript";</script>
+</head>
+<body>
+{HEADER_START}
+<header><a href="/">Navigation menu</a></header>
+{HEADER_END}
+<main><h1>Strike vote</h1><p>Members voted on the café contract.</p><style>.x {{ color: red }}</style></main>
+{FOOTER_START}
+<footer>Footer links</footer>
+{FOOTER_END}
+</body>
+</html>
+"""
+
+
+def load_from(files):
+    return lambda prefix: files[f"terms/{prefix}.json"]
+
+
+class SearchIndexTests(unittest.TestCase):
+    def test_extract_document_keeps_visible_text_without_the_shell(self):
+        document = search.extract_document("/strike.html", PAGE)
+
+        self.assertEqual(document.title, "Strike Vote")
+        self.assertEqual(document.description, "How the strike authorization vote works.")
+        self.assertEqual(document.text, "Strike vote Members voted on the café contract.")
+
+    def test_tokens_fold_accents_and_drop_stop_words(self):
+        self.assertEqual(search.tokens("The Café of Local 083, a union"), ["cafe", "local", "083", "union"])
+
+    def test_lookup_matches_prefixes_of_every_term_and_ranks_titles_first(self):
+        files = search.build_index([
+            SearchDocument("/a.html", "Contract", "", "Wages and healthcare."),
+            SearchDocument("/b.html", "Meeting", "", "The contract covers wages."),
+            SearchDocument("/c.html", "Picnic", "", "Bring food."),
+        ])
+        prefixes = files["index.json"]["prefixes"]
+
+        self.assertEqual(prefixes, sorted(path[len("terms/") : -len(".json")] for path in files if path.startswith("terms/")))
+        self.assertEqual([page for page, _ in search.lookup("contr", load_from(files), prefixes)], [0, 1])
+        self.assertEqual([page for page, _ in search.lookup("contract wag", load_from(files), prefixes)], [0, 1])
+        self.assertEqual(search.lookup("contract picnic", load_from(files), prefixes), [])
+        self.assertEqual(files["pages/0.json"][2], ["/c.html", "Picnic", ""])
+
+    def test_large_shards_split_by_longer_prefixes(self):
+        words = ["co", "coat", "code", "coffee", "cold", "comb", "core"]
+        documents = [SearchDocument(f"/{word}.html", word, "", "") for word in words]
+        with mock.patch.object(search, "MAX_SHARD_BYTES", 20):
+            files = search.build_index(documents)
+        prefixes = files["index.json"]["prefixes"]
+
+        self.assertIn("co", prefixes)
+        self.assertIn("cof", prefixes)
+        self.assertEqual(list(files["terms/co.json"]), ["co"])
+        for word in words:
+            matches = search.lookup(word, load_from(files), prefixes)
+            self.assertEqual(matches[0][0], words.index(word))
+        self.assertEqual(len(search.lookup("co", load_from(files), prefixes)), len(words))
+
+    def test_build_writes_index_and_prunes_stale_shards(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            page = root / "strike.html"
+            page.write_text(PAGE, encoding="utf-8")
+            stale = root / "search" / "terms" / "zz.json"
+            stale.parent.mkdir(parents=True)
+            stale.write_text("{}\n", encoding="utf-8")
+            public_page = mock.Mock(path=page, canonical_url=f"{search.BASE_URL}/strike.html", in_sitemap=True)
+
+            written = search.build(root, pages=[public_page], output=SiteOutput(root))
+
+            self.assertFalse(stale.exists())
+            manifest = json.loads((root / "search" / "index.json").read_text(encoding="utf-8"))
+            self.assertEqual(manifest["pages"], 1)
+            self.assertEqual(len(written), len(manifest["prefixes"]) + 2)
+            self.assertEqual(json.loads((root / "search" / "pages" / "0.json").read_text(encoding="utf-8"))[0][0], "/strike.html")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import json
+import sys
+import unittest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import generate_sitemap as sitemap  # noqa: E402
+from public_pages import PAGE_INDEX, PageCorpus, PublicPage  # noqa: E402
+from site_output import OverlayOutput, SiteOutput  # noqa: E402
+from sync_site_shell import HEADER_END, HEADER_START  # noqa: E402
+
+
+NS = {"sm": sitemap.SITEMAP_NS, "image": sitemap.IMAGE_NS}
+
+
+def page(body, header="Home"):
+    return (
+        f"<html><head></head><body>{HEADER_START}<header>{header}</header>{HEADER_END}"
+        f"<main>{body}</main></body></html>"
+    )
+
+
+class SitemapTests(unittest.TestCase):
+    def build(self, root, pages, today, output=None, use_index=False):
+        output = output or SiteOutput(root)
+        for relative, text in pages.items():
+            (root / relative).parent.mkdir(parents=True, exist_ok=True)
+            if not (root / relative).is_file() or (root / relative).read_text(encoding="utf-8") != text:
+                (root / relative).write_text(text, encoding="utf-8")
+        public = [
+            PublicPage(path=root / relative, canonical_url=f"{sitemap.BASE_URL}/{relative}", in_sitemap=True)
+            for relative in pages
+        ]
+        return sitemap.generate(root, public, output, PageCorpus(root, output=output, use_index=use_index), today=today)
+
+    def test_sections_images_and_index_lastmod(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            written = self.build(
+                root,
+                {
+                    "news/story.html": page('<img src="../images/hero.webp" alt=""><img src="/images/other.webp" alt="">'),
+                    "events/rally.html": page("<p>Rally</p>"),
+                    "about.html": page("<p>About</p>"),
+                },
+                "2026-10-01",
+            )
+
+            self.assertEqual(
+                [path.relative_to(root).as_posix() for path in written],
+                ["sitemap.xml", "sitemaps/news.xml", "sitemaps/events.xml", "sitemaps/pages.xml", "data/sitemap-ledger.json"],
+            )
+            index = ET.parse(root / "sitemap.xml").getroot()
+            self.assertEqual([loc.text for loc in index.findall("sm:sitemap/sm:loc", NS)][0], f"{sitemap.BASE_URL}/sitemaps/news.xml")
+            news = ET.parse(root / "sitemaps" / "news.xml").getroot()
+            self.assertEqual(news.find("sm:url/sm:lastmod", NS).text, "2026-10-01")
+            self.assertEqual([loc.text for loc in news.findall("sm:url/image:image/image:loc", NS)], [f"{sitemap.BASE_URL}/images/hero.webp"])
+            self.assertIsNone(ET.parse(root / "sitemaps" / "events.xml").getroot().find("sm:url/image:image", NS))
+            self.assertIn("Sitemap: https://www.local083.org/sitemap.xml", (root / "robots.txt").read_text(encoding="utf-8"))
+
+    def test_lastmod_moves_only_when_page_content_changes(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            pages = {"news/story.html": page("<p>First</p>"), "events/rally.html": page("<p>Rally</p>")}
+            self.build(root, pages, "2026-10-01")
+
+            # A site-wide shell change is not a content change.
+            pages = {relative: text.replace("Home", "Home page") for relative, text in pages.items()}
+            pages["news/story.html"] = pages["news/story.html"].replace("First", "Second")
+            self.build(root, pages, "2026-10-05")
+
+            ledger = json.loads((root / "data" / "sitemap-ledger.json").read_text(encoding="utf-8"))["pages"]
+            self.assertEqual(ledger[f"{sitemap.BASE_URL}/news/story.html"]["lastmod"], "2026-10-05")
+            self.assertEqual(ledger[f"{sitemap.BASE_URL}/events/rally.html"]["lastmod"], "2026-10-01")
+            index = ET.parse(root / "sitemap.xml").getroot()
+            self.assertEqual([lastmod.text for lastmod in index.findall("sm:sitemap/sm:lastmod", NS)], ["2026-10-05", "2026-10-01"])
+
+    def test_empty_sections_are_removed_except_in_check_builds(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            self.build(root, {"news/story.html": page("<p>Story</p>"), "resources/rights.html": page("<p>Rights</p>")}, "2026-10-01")
+            (root / "resources" / "rights.html").unlink()
+
+            self.build(root, {"news/story.html": page("<p>Story</p>")}, "2026-10-02", OverlayOutput(root))
+            self.assertTrue((root / "sitemaps" / "resources.xml").is_file())
+
+            self.build(root, {"news/story.html": page("<p>Story</p>")}, "2026-10-02")
+            self.assertEqual(sorted(path.name for path in (root / "sitemaps").iterdir()), ["news.xml"])
+            self.assertNotIn("resources", (root / "data" / "sitemap-ledger.json").read_text(encoding="utf-8"))
+
+    def test_unchanged_pages_are_not_read_again(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            pages = {"news/story.html": page("<p>Story</p>"), "about.html": page("<p>About</p>")}
+            self.build(root, pages, "2026-10-01", use_index=True)
+
+            pages["news/story.html"] = page("<p>Story, updated at more length</p>")
+            with patch.object(sitemap, "content_hash", wraps=sitemap.content_hash) as hashed:
+                self.build(root, pages, "2026-10-02", use_index=True)
+            self.assertEqual(hashed.call_count, 1)
+
+            ledger = json.loads((root / "data" / "sitemap-ledger.json").read_text(encoding="utf-8"))["pages"]
+            self.assertEqual(ledger[f"{sitemap.BASE_URL}/news/story.html"]["lastmod"], "2026-10-02")
+            self.assertEqual(ledger[f"{sitemap.BASE_URL}/about.html"]["lastmod"], "2026-10-01")
+
+    def test_check_builds_leave_the_page_caches_alone(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            pages = {"news/story.html": page("<p>Story</p>")}
+            self.build(root, pages, "2026-10-01", OverlayOutput(root), use_index=True)
+            self.assertFalse((root / sitemap.HASH_CACHE).exists())
+            self.assertFalse((root / PAGE_INDEX).exists())
+
+            self.build(root, pages, "2026-10-01", use_index=True)
+            self.assertTrue((root / sitemap.HASH_CACHE).is_file())
+            self.assertTrue((root / PAGE_INDEX).is_file())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import json
 import sys
 import unittest
+from datetime import date
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
@@ -8,12 +9,20 @@ ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT / "scripts"))
 
 import generate_static_content as static  # noqa: E402
+from content import NewsArticle  # noqa: E402
+from site_templates import FragmentCache, Template  # noqa: E402
 
 
 def graph() -> str:
     return '<script type="application/ld+json">{"@context":"https://schema.org","@graph":[{"@type":"ItemList"}]}</script>'
 
 
+def webp(width: int, height: int) -> bytes:
+    """An extended-format WebP header; the image manifest reads nothing past it."""
+
+    return b"RIFF" + (22).to_bytes(4, "little") + b"WEBPVP8X" + (10).to_bytes(4, "little") + bytes(4) + (width - 1).to_bytes(3, "little") + (height - 1).to_bytes(3, "little")
+
+
 class StaticContentTests(unittest.TestCase):
     def test_event_schema_requires_confirmed_location_and_preserves_exact_details(self):
         self.assertIsNone(static.event_schema({
@@ -57,11 +66,90 @@ class StaticContentTests(unittest.TestCase):
             '<div id="target">\n  <p>new</p>\n</div><div>after</div>',
         )
 
+    def test_splice_regions_matches_one_replacement_per_region(self):
+        source = (
+            '<script type="application/ld+json">{"@graph": [{"@type": "WebPage"}]}</script>\n'
+            '<ul id="first"><li>old</li></ul>\n<p id="untouched">keep</p>\n'
+            '<section id="second"><section>old</section></section>\n'
+            "<script>\n    const fallbackItems = [\n      {\"old\": true}\n    ];\n</script>\n"
+        )
+        items = [{"title": "New"}]
+        expected = static.replace_element_inner(source, "second", "<p>2</p>")
+        expected = static.replace_element_inner(expected, "first", "<li>1</li>")
+        expected = static.replace_js_array(expected, "fallbackItems", items)
+        expected = static.update_json_ld(expected, lambda graph: graph.append({"@type": "Event"}))
+
+        spliced = static.splice_regions(
+            source,
+            elements={"second": "<p>2</p>", "first": "<li>1</li>"},
+            arrays={"fallbackItems": items},
+            json_ld=lambda graph: graph.append({"@type": "Event"}),
+        )
+        self.assertEqual(spliced, expected)
+        self.assertIn('<p id="untouched">keep</p>', spliced)
+        self.assertIn('    const fallbackItems = [\n      {\n        "title": "New"', spliced)
+
+    def test_splice_regions_reports_missing_and_unclosed_regions(self):
+        with self.assertRaisesRegex(ValueError, "missing: #absent"):
+            static.splice_regions('<div id="present"></div>', elements={"present": "", "absent": ""})
+        with self.assertRaisesRegex(ValueError, "not closed: #open"):
+            static.splice_regions('<div id="open"><div></div>', elements={"open": ""})
+        with self.assertRaisesRegex(ValueError, "fallback is missing: items"):
+            static.splice_regions("<p>no script</p>", arrays={"items": []})
+
+    def test_splice_regions_rejects_nested_regions_and_malformed_graphs(self):
+        nested = '<div id="outer"><p id="inner">old</p></div><p id="after">old</p>'
+        with self.assertRaisesRegex(ValueError, "overlap: #inner is inside #outer"):
+            static.splice_regions(nested, elements={"outer": "", "inner": ""})
+        with self.assertRaisesRegex(ValueError, "overlap: items is inside #outer"):
+            static.splice_regions('<div id="outer"><script>const items = [];</script></div>', elements={"outer": ""}, arrays={"items": []})
+        self.assertEqual(
+            static.splice_regions(nested, elements={"outer": "new", "after": "new"}),
+            '<div id="outer">\nnew\n</div><p id="after">\nnew\n</p>',
+        )
+        with self.assertRaisesRegex(ValueError, "no @graph list"):
+            static.splice_regions('<script type="application/ld+json">{"@graph": {}}</script>', json_ld=lambda graph: None)
+
+    def test_inline_fallbacks_keep_the_first_view_and_enforce_budgets(self):
+        stories = [
+            {
+                "title": f"Story {index}", "description": "Body", "url": f"/news/{index}.html", "image": "/images/card.webp",
+                "tags": ["Update"], "author": {"name": "Local 083", "email": "x@example.org"}, "status": "published",
+                "publishedAt": f"2026-07-{30 - index:02d}", "createdAt": "2026-07-01", "featured": index == 11,
+            }
+            for index in range(12)
+        ]
+        undated = {**stories[0], "title": "Undated", "publishedAt": "soon"}
+        news = static.public_news([NewsArticle.from_dict(item) for item in [*stories, undated]])
+        self.assertNotIn("Undated", [article.title for article in news])
+        fallback = static.fallback_news(news)
+        self.assertEqual([item.title for item in static.fallback_stories(news)], [item["title"] for item in fallback])
+        self.assertEqual([item["title"] for item in fallback], [f"Story {index}" for index in (*range(8), 11)])
+        self.assertEqual(fallback[0]["author"], {"name": "Local 083"})
+        self.assertNotIn("createdAt", fallback[0])
+        self.assertNotIn("status", fallback[0])
+
+        calendar = static.load_events({"asOf": "2026-07-12", "events": [
+            {"date": "2026-06-30", "title": "Old", "url": "/events/old.html", "description": "Gone"},
+            {"date": "2026-07-01", "title": "Earlier this month", "url": "/events/july.html", "description": "Kept"},
+            {"date": "2026-07-20", "title": "No link"},
+        ]})
+        self.assertEqual(
+            static.fallback_events(calendar.events, date(2026, 7, 12), 2026, 7),
+            [{"date": "2026-07-01", "title": "Earlier this month", "url": "/events/july.html"}],
+        )
+
+        with self.assertRaisesRegex(ValueError, "news.html: inline fallbackNews is [0-9,]+ bytes"):
+            static.check_fallback_budget("news.html", "fallbackNews", [{"description": "x" * 20_000}])
+
     def test_build_is_repeatable_and_excludes_scheduled_news(self):
         with TemporaryDirectory() as tmp:
             root = Path(tmp)
             (root / "news").mkdir()
             (root / "events").mkdir()
+            (root / "images").mkdir()
+            for name, size in {"feature.webp": (1600, 900), "feature-800w.webp": (800, 450), "feature-192.webp": (192, 192)}.items():
+                (root / "images" / name).write_bytes(webp(*size))
             news = [
                 {
                     "status": "scheduled", "title": "Tomorrow", "description": "Not public", "url": "/news/tomorrow.html",
@@ -89,7 +177,7 @@ class StaticContentTests(unittest.TestCase):
                 graph()
                 + '<div id="news-flash">old</div><article id="lead-story">old</article><div id="latest-list">old</div>'
                 + '<span id="latest-count">old</span><p id="results-status">old</p><div id="stories-grid">old</div>'
-                + '<script>const fallbackNews = [{"old": true}];</script>',
+                + '<script>const fallbackNews = [{"old": true}];\nconst newsImages = [];</script>',
                 encoding="utf-8",
             )
             (root / "events.html").write_text(
@@ -112,6 +200,12 @@ class StaticContentTests(unittest.TestCase):
             self.assertEqual(first, second)
             self.assertIn("Published story", first["news.html"])
             self.assertNotIn("Tomorrow", first["news.html"])
+            self.assertIn(
+                'src="/images/feature-800w.webp" srcset="/images/feature-800w.webp 800w" sizes="(max-width: 767px) calc(100vw - 2rem), 55vw" alt="Feature" width="800" height="450"',
+                first["news.html"],
+            )
+            self.assertIn('<img src="/images/feature-192.webp" alt="" width="96" height="96"', first["news.html"])
+            self.assertIn('"thumbnail": "/images/feature-192.webp"', first["news.html"])
             self.assertIn("CAT Meeting", first["events.html"])
             self.assertIn("July 2026", first["events.html"])
 
@@ -137,5 +231,37 @@ class StaticContentTests(unittest.TestCase):
             self.assertIn('/events.html#past-events', no_upcoming_home)
 
 
+class FragmentTemplateTests(unittest.TestCase):
+    def test_template_escapes_slots_unless_marked_safe(self):
+        template = Template("sample", '<p class="{kind|safe}" data-x="{ x }">{title} {count|safe}</p>')
+        self.assertEqual(
+            template.render({"kind": "lead", "title": 'Fish & "chips"', "count": 3}),
+            '<p class="lead" data-x="{ x }">Fish &amp; &quot;chips&quot; 3</p>',
+        )
+
+    def test_cards_are_reused_until_their_content_changes(self):
+        data = {
+            "title": "Story", "description": "Body", "url": "/news/story.html", "image": "/images/card.webp",
+            "tags": ["Update"], "publishedAt": "2026-07-12",
+        }
+        article = NewsArticle.from_dict(data)
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "fragments.json"
+            fragments = FragmentCache.load(path, revision="a")
+            card = static.render_story_card(article, fragments=fragments)
+            self.assertEqual(static.render_story_card(NewsArticle.from_dict(dict(data)), fragments=fragments), card)
+            self.assertEqual((fragments.misses, fragments.hits), (1, 1))
+            fragments.save()
+
+            reloaded = FragmentCache.load(path, revision="a")
+            self.assertEqual(static.render_story_card(article, fragments=reloaded), card)
+            self.assertNotEqual(static.render_story_card(article, wide=True, fragments=reloaded), card)
+            edited = static.render_story_card(NewsArticle.from_dict({**data, "title": "Edited"}), fragments=reloaded)
+            self.assertIn("Edited", edited)
+            self.assertEqual((reloaded.hits, reloaded.misses), (1, 2))
+
+            self.assertEqual(FragmentCache.load(path, revision="b").fragments, {})
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,129 @@
+import struct
+import sys
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import image_manifest  # noqa: E402
+from image_manifest import ImageSize, ResponsiveImage, group, image_size, scan  # noqa: E402
+
+
+def riff(chunk: bytes, payload: bytes) -> bytes:
+    body = b"WEBP" + chunk + len(payload).to_bytes(4, "little") + payload
+    return b"RIFF" + len(body).to_bytes(4, "little") + body
+
+
+def png(width: int, height: int) -> bytes:
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+
+
+def jpeg(width: int, height: int) -> bytes:
+    app = b"\xff\xe1" + struct.pack(">H", 8) + b"Exif\x00\x00"
+    frame = b"\xff\xc2" + struct.pack(">HBHHB", 11, 8, height, width, 3) + bytes(3)
+    return b"\xff\xd8" + app + frame + b"\xff\xd9"
+
+
+class ImageSizeTests(unittest.TestCase):
+    def test_reads_sizes_from_each_header_format(self):
+        lossy = riff(b"VP8 ", bytes(3) + b"\x9d\x01\x2a" + struct.pack("<HH", 640, 360) + bytes(4))
+        lossless = riff(b"VP8L", b"\x2f" + ((200 - 1) | (100 - 1) << 14).to_bytes(4, "little"))
+        extended = riff(b"VP8X", bytes(4) + (2560 - 1).to_bytes(3, "little") + (1707 - 1).to_bytes(3, "little"))
+
+        self.assertEqual(image_size(lossy), (640, 360))
+        self.assertEqual(image_size(lossless), (200, 100))
+        self.assertEqual(image_size(extended), (2560, 1707))
+        self.assertEqual(image_size(png(800, 827)), (800, 827))
+        self.assertEqual(image_size(jpeg(1280, 964)), (1280, 964))
+
+    def test_rejects_other_files(self):
+        with self.assertRaisesRegex(ValueError, "not a WebP, PNG or JPEG"):
+            image_size(b"GIF89a")
+        with self.assertRaisesRegex(ValueError, "no frame header"):
+            image_size(b"\xff\xd8\xff\xd9")
+
+
+class ImageManifestTests(unittest.TestCase):
+    def test_groups_thumbnails_and_width_variants_under_their_original(self):
+        manifest = group({
+            "/images/rally.webp": (1800, 1084),
+            "/images/rally-1440w.webp": (1440, 867),
+            "/images/rally-480w.webp": (480, 289),
+            "/images/rally-960w.webp": (960, 578),
+            "/images/rally-192.webp": (192, 192),
+            "/images/orphan-480w.webp": (480, 270),
+        })
+
+        self.assertEqual(sorted(manifest.entries), ["/images/orphan-480w.webp", "/images/rally.webp"])
+        rally = manifest.get("/images/rally.webp")
+        self.assertEqual([variant.width for variant in rally.variants], [480, 960, 1440])
+        self.assertEqual(rally.thumbnail, "/images/rally-192.webp")
+        self.assertEqual(
+            manifest.responsive("/images/rally.webp"),
+            ResponsiveImage(
+                "/images/rally-960w.webp",
+                "/images/rally-480w.webp 480w, /images/rally-960w.webp 960w, /images/rally-1440w.webp 1440w",
+                960,
+                578,
+            ),
+        )
+        self.assertEqual(manifest.responsive("/images/orphan-480w.webp"), ResponsiveImage("/images/orphan-480w.webp", "", 480, 270))
+        self.assertEqual(manifest.thumbnail("/images/orphan-480w.webp"), "/images/orphan-480w.webp")
+        self.assertEqual(manifest.responsive("https://example.org/photo.jpg").width, image_manifest.FALLBACK_SIZE[0])
+
+    def test_src_falls_back_to_the_narrowest_variant(self):
+        manifest = group({"/images/wide.png": (4000, 2000), "/images/wide-1440w.png": (1440, 720), "/images/wide-2000w.png": (2000, 1000)})
+
+        self.assertEqual(manifest.get("/images/wide.png").variants[0], ImageSize("/images/wide-1440w.png", 1440, 720))
+        self.assertEqual(manifest.responsive("/images/wide.png").src, "/images/wide-1440w.png")
+
+    def test_webp_variants_group_under_originals_of_other_formats(self):
+        manifest = group({
+            "/images/team.jpg": (1280, 964),
+            "/images/team-480w.webp": (480, 362),
+            "/images/team-192.webp": (192, 192),
+            "/images/flyer.png": (800, 1000),
+            "/images/flyer.webp": (800, 1000),
+            "/images/flyer-480w.webp": (480, 600),
+        })
+
+        self.assertEqual(sorted(manifest.entries), ["/images/flyer.png", "/images/flyer.webp", "/images/team.jpg"])
+        self.assertEqual(manifest.get("/images/team.jpg").variants, (ImageSize("/images/team-480w.webp", 480, 362),))
+        self.assertEqual(manifest.thumbnail("/images/team.jpg"), "/images/team-192.webp")
+        self.assertEqual(manifest.get("/images/flyer.png").variants, ())
+        self.assertEqual(len(manifest.get("/images/flyer.webp").variants), 1)
+
+    def test_scan_reuses_sizes_cached_by_file_hash(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "images").mkdir()
+            (root / "images" / "logo.png").write_bytes(png(800, 827))
+            (root / "images" / "notes.txt").write_text("not an image", encoding="utf-8")
+
+            self.assertEqual(scan(root).get("/images/logo.png").width, 800)
+            self.assertTrue((root / image_manifest.IMAGE_CACHE).is_file())
+
+            # A renamed file has the same hash, so its header is not parsed again.
+            (root / "images" / "logo.png").rename(root / "images" / "mark.png")
+            with mock.patch.object(image_manifest, "image_size", side_effect=AssertionError("header parsed")):
+                self.assertEqual(scan(root).get("/images/mark.png").height, 827)
+
+            (root / "images" / "mark.png").write_bytes(png(400, 400))
+            self.assertEqual(scan(root).get("/images/mark.png").width, 400)
+            self.assertEqual(scan(root, cache=False).get("/images/mark.png").width, 400)
+
+    def test_scan_names_unreadable_images(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "images").mkdir()
+            (root / "images" / "broken.webp").write_bytes(b"RIFF")
+
+            with self.assertRaisesRegex(ValueError, "images/broken.webp"):
+                scan(root)
+
+
+if __name__ == "__main__":
+    unittest.main()
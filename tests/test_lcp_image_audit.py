@@ -0,0 +1,83 @@
+import sys
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import lcp_image_audit as lcp  # noqa: E402
+
+
+PAGE = """<html><head><link rel="canonical" href="https://www.local083.org/events/rally.html"></head><body>
+<header><img src="/images/logo.png" alt="" loading="lazy"></header>
+<main>
+    <img src="/images/rally.webp" alt="Rally" loading="lazy" decoding="async">
+    <template><img src="/images/card.webp" alt=""></template>
+    <img
+        src="/images/crowd.webp"
+        alt="Crowd"
+        fetchpriority="high"
+    >
+    <img src="/images/sign.webp" alt="Sign" loading="eager" width="10" height="10"/>
+</main>
+</body></html>"""
+
+
+class LcpImageAuditTests(unittest.TestCase):
+    def test_first_image_in_main_is_the_lcp_candidate(self):
+        images = lcp.main_images(PAGE)
+
+        self.assertEqual([image.attrs["src"] for image in images], ["/images/rally.webp", "/images/crowd.webp", "/images/sign.webp"])
+        self.assertEqual([image.lcp for image in images], [True, False, False])
+        self.assertEqual(PAGE[images[1].start : images[1].start + len(images[1].text)], images[1].text)
+        self.assertEqual(
+            images[0].problems(),
+            [
+                'LCP image is lazy-loaded; remove `loading="lazy"`',
+                'LCP image is missing `fetchpriority="high"`',
+                "LCP image is missing `width` and `height`",
+            ],
+        )
+        self.assertEqual(
+            images[1].problems(),
+            [
+                'below-the-fold image is missing `loading="lazy"`',
+                'below-the-fold image is missing `decoding="async"`',
+                'only the LCP image should have `fetchpriority="high"`',
+            ],
+        )
+
+    def test_fix_rewrites_only_the_image_tags_and_keeps_their_layout(self):
+        fixed = lcp.fix(PAGE, {"/images/rally.webp": (1800, 1000)})
+
+        self.assertIn('<img src="/images/rally.webp" alt="Rally" decoding="async" fetchpriority="high" width="1800" height="1000">', fixed)
+        self.assertIn(
+            '<img\n        src="/images/crowd.webp"\n        alt="Crowd"\n        loading="lazy"\n        decoding="async"\n    >',
+            fixed,
+        )
+        self.assertIn('<img src="/images/sign.webp" alt="Sign" width="10" height="10" loading="lazy" decoding="async"/>', fixed)
+        self.assertIn('<header><img src="/images/logo.png" alt="" loading="lazy"></header>', fixed)
+        self.assertTrue(all(not image.problems() for image in lcp.main_images(fixed)))
+        self.assertEqual(lcp.fix(fixed, {}), fixed)
+
+    def test_fix_pages_touches_only_the_requested_paths(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            for name in ("events/rally.html", "news/rally.html"):
+                (root / name).parent.mkdir(parents=True, exist_ok=True)
+                (root / name).write_text(PAGE.replace("events/rally", name[:-5]), encoding="utf-8")
+
+            changed = lcp.fix_pages(root, ["events"])
+
+            self.assertEqual([page.relative_to(root).as_posix() for page in changed], ["events/rally.html"])
+            self.assertEqual((root / "news" / "rally.html").read_text(encoding="utf-8"), PAGE.replace("events/rally", "news/rally"))
+            pages, findings = lcp.run(root)
+            self.assertEqual(len(pages), 2)
+            # Without the image in the manifest, the LCP dimensions cannot be filled in.
+            self.assertEqual([finding.split(" ", 1)[0] for finding in findings], ["`events/rally.html`"] + ["`news/rally.html`"] * 8)
+            self.assertIn("missing `width` and `height`", findings[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import json
+import sys
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import page_weight_audit as weight  # noqa: E402
+
+
+PAGE = """<!doctype html><html><head>
+<link rel="canonical" href="https://www.local083.org/news/story.html">
+<link rel="stylesheet" href="/styles/site.css">
+<link rel="icon" href="/images/logo.png">
+<link rel="apple-touch-icon" href="/images/touch.png">
+<script src="/js/app.js?v=2" defer></script>
+<script src="https://cdn.example.org/widget.js"></script>
+<script>var inline = "ab";</script>
+<style>p { color: red; }</style>
+</head><body>
+<img src="/images/rally-960w.webp" srcset="/images/rally-480w.webp 480w, /images/rally-960w.webp 960w, /images/rally.webp 1800w" alt="">
+<img src="/images/rally-960w.webp" srcset="/images/rally-480w.webp 480w, /images/rally-960w.webp 960w, /images/rally.webp 1800w" alt="">
+<picture><source srcset="/images/team.webp" type="image/webp"><img src="/images/team.jpg" alt=""></picture>
+<script src="/js/app.js?v=2" defer></script>
+</body></html>"""
+
+FILES = {
+    "styles/site.css": b'@import url("/styles/fonts.css");\n' + bytes(100),
+    "styles/fonts.css": b"@font-face { src: url('../fonts/Inter.woff2') format('woff2'); }",
+    "fonts/Inter.woff2": bytes(1000),
+    "js/app.js": bytes(300),
+    "images/logo.png": bytes(50),
+    "images/touch.png": bytes(5000),
+    "images/rally.webp": bytes(9000),
+    "images/rally-960w.webp": bytes(4000),
+    "images/rally-480w.webp": bytes(2000),
+    "images/team.webp": bytes(700),
+    "images/team.jpg": bytes(900),
+}
+
+
+def config(budgets: dict[str, int] | None = None) -> weight.BudgetConfig:
+    return weight.BudgetConfig(
+        (weight.PageGroup("news article", ("news/*.html",), budgets or {}), weight.PageGroup("other", ("*",), {})),
+        percent=5,
+        bytes=100,
+    )
+
+
+class PageWeightTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        for name, data in FILES.items():
+            (self.root / name).parent.mkdir(parents=True, exist_ok=True)
+            (self.root / name).write_bytes(data)
+        (self.root / "news").mkdir()
+        (self.root / "news" / "story.html").write_text(PAGE, encoding="utf-8")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_weighs_linked_assets_imports_fonts_and_image_candidates(self):
+        [page] = weight.run(self.root, config())
+        css = len(FILES["styles/site.css"]) + len(FILES["styles/fonts.css"])
+
+        self.assertEqual((page.page, page.group), ("news/story.html", "news article"))
+        self.assertEqual(page.html, len(PAGE.encode("utf-8")))
+        self.assertEqual((page.inline_scripts, page.inline_styles), (len('var inline = "ab";'), len("p { color: red; }")))
+        self.assertEqual((page.css, page.js, page.fonts), (css, 300, 1000))
+        # The repeated image counts once; the apple-touch-icon is not fetched.
+        self.assertEqual((page.images_min, page.images_max), (50 + 2000 + 700, 50 + 9000 + 900))
+        self.assertEqual(page.total_max, page.html + css + 300 + 1000 + 50 + 9000 + 900)
+        # Document, two stylesheets, a font, a script, the icon, two images and the external script.
+        self.assertEqual(page.requests, 9)
+
+    def test_reports_budget_overruns_and_regressions_against_the_baseline(self):
+        [page] = weight.run(self.root, config({"js": 299, "requests": 9}))
+        baseline = {"news/story.html": {"total_max": page.total_max - 1000, "requests": 8}}
+
+        findings = weight.check([page], config({"js": 299, "requests": 9}), baseline)
+
+        self.assertEqual(len(findings), 3)
+        self.assertIn("js is 300, over the news article budget of 299", findings[0])
+        self.assertIn(f"total_max grew from {page.total_max - 1000:,}", findings[1])
+        self.assertIn("requests grew from 8 to 9", findings[2])
+        self.assertEqual(weight.check([page], config(), weight.baseline_of([page])), [])
+        self.assertEqual(weight.check([page], config(), {"news/story.html": {"total_max": page.total_max - 100, "requests": 9}}), [])
+
+    def test_rejects_unknown_budget_metrics(self):
+        path = self.root / "budgets.json"
+        path.write_text(json.dumps({"groups": [{"name": "home", "pages": ["index.html"], "budgets": {"javascript": 1}}]}), encoding="utf-8")
+
+        with self.assertRaisesRegex(ValueError, "unknown budget metric.*javascript"):
+            weight.load_budgets(path)
+
+    def test_repository_budgets_group_translated_articles_and_downloads(self):
+        budgets = weight.load_budgets(ROOT / weight.BUDGETS)
+
+        self.assertEqual([group.name for group in budgets.groups][-1], "other")
+        self.assertEqual(budgets.group_of("news/es/2026-02-17-negociacion-comienza-con-poder-sindical.html").name, "news article")
+        self.assertEqual(budgets.group_of("resources/zoom-backgrounds.html").name, "wallpaper downloads")
+
+
+if __name__ == "__main__":
+    unittest.main()
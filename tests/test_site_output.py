@@ -0,0 +1,79 @@
+import os
+import sys
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from site_output import OverlayOutput, SiteOutput  # noqa: E402
+
+
+class SiteOutputTests(unittest.TestCase):
+    def test_identical_writes_are_skipped_and_leave_mtime_alone(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            page = root / "news" / "story.html"
+            output = SiteOutput(root)
+
+            self.assertTrue(output.write_text(page, "first"))
+            page.chmod(0o644)
+            before = page.stat().st_mtime_ns - 10_000_000
+            os.utime(page, ns=(before, before))
+            self.assertFalse(output.write_text(page, "first"))
+            self.assertEqual(page.stat().st_mtime_ns, before)
+            self.assertIn(page, output.unchanged)
+
+            self.assertTrue(output.write_text(page, "second"))
+            self.assertEqual(page.read_text(encoding="utf-8"), "second")
+            self.assertEqual(page.stat().st_mode & 0o777, 0o644)
+            self.assertNotIn(page, output.unchanged)
+            self.assertEqual(output.counts(), (2, 1))
+            self.assertEqual(sorted(path.name for path in page.parent.iterdir()), ["story.html"])
+
+    def test_overlay_keeps_only_files_that_differ_from_the_tree(self):
+        with TemporaryDirectory() as tmp, TemporaryDirectory() as scratch:
+            root = Path(tmp)
+            (root / "same.html").write_text("same", encoding="utf-8")
+            (root / "changed.html").write_text("old", encoding="utf-8")
+            for output in (OverlayOutput(root), OverlayOutput(root, Path(scratch))):
+                with self.subTest(directory=output.directory):
+                    output.write_text(root / "same.html", "same")
+                    output.write_text(root / "changed.html", "new")
+                    output.write_text(root / "created.html", "created")
+
+                    self.assertEqual(output.written_paths(), ["changed.html", "created.html"])
+                    self.assertEqual(output.read_text(root / "changed.html"), "new")
+                    self.assertEqual(output.counts(), (2, 1))
+                    self.assertEqual((root / "changed.html").read_text(encoding="utf-8"), "old")
+                    self.assertFalse((root / "created.html").exists())
+
+    def test_overlay_records_deletions_without_touching_the_tree(self):
+        with TemporaryDirectory() as tmp, TemporaryDirectory() as scratch:
+            root = Path(tmp)
+            (root / "stale.json").write_text("[]", encoding="utf-8")
+            for output in (OverlayOutput(root), OverlayOutput(root, Path(scratch))):
+                with self.subTest(directory=output.directory):
+                    output.write_text(root / "created.json", "{}")
+                    self.assertTrue(output.delete(root / "stale.json"))
+                    self.assertTrue(output.delete(root / "created.json"))
+                    self.assertFalse(output.delete(root / "missing.json"))
+
+                    self.assertFalse(output.exists(root / "stale.json"))
+                    self.assertEqual(output.written_paths(), [])
+                    self.assertEqual(output.deleted_paths(), ["stale.json"])
+                    self.assertTrue((root / "stale.json").is_file())
+
+                    output.write_text(root / "stale.json", "[]")
+                    self.assertEqual(output.deleted_paths(), [])
+
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "stale.json").write_text("[]", encoding="utf-8")
+            self.assertTrue(SiteOutput(root).delete(root / "stale.json"))
+            self.assertFalse((root / "stale.json").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import gzip
+import os
+import sys
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from site_preview import LIVE_RELOAD_PATH, FileWatcher, PreviewServer  # noqa: E402
+
+
+def bump(path: Path, text: str) -> None:
+    path.write_text(text, encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class FileWatcherTests(unittest.TestCase):
+    def test_reports_edits_but_not_absorbed_build_writes(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            for name in ("events.json", "events.html"):
+                (root / name).write_text("v1", encoding="utf-8")
+            targets = ["events.json", "events.html"]
+            watcher = FileWatcher(root, lambda: targets, polling=True)
+            self.assertEqual(watcher.mode, "polling")
+            self.assertEqual(watcher.changes(), set())
+
+            bump(root / "events.json", "v2")
+            bump(root / "events.html", "built")
+            watcher.absorb([root / "events.html"])
+            self.assertEqual(watcher.changes(), {"events.json"})
+            self.assertEqual(watcher.changes(), set())
+
+            targets.append("news/new.html")
+            watcher.retarget()
+            (root / "news").mkdir()
+            (root / "news" / "new.html").write_text("new", encoding="utf-8")
+            self.assertEqual(watcher.wait(), {"news/new.html"})
+            watcher.close()
+
+
+class PreviewServerTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "index.html").write_text("<html><body>" + "story " * 200 + "</body></html>", encoding="utf-8")
+        (self.root / "404.html").write_text("<html><body>missing</body></html>", encoding="utf-8")
+        self.server = PreviewServer(self.root, 0)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def fetch(self, path: str, **headers: str):
+        request = urllib.request.Request(self.server.url.rstrip("/") + path, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                return response.status, response.headers, response.read()
+        except urllib.error.HTTPError as error:
+            return error.code, error.headers, error.read()
+
+    def test_gzip_etag_and_live_reload_script(self):
+        status, headers, body = self.fetch("/", **{"Accept-Encoding": "gzip"})
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        page = gzip.decompress(body).decode("utf-8")
+        self.assertIn(LIVE_RELOAD_PATH, page)
+        self.assertTrue(page.endswith("</body></html>"))
+
+        status, _, body = self.fetch("/", **{"Accept-Encoding": "gzip", "If-None-Match": headers["ETag"]})
+        self.assertEqual((status, body), (304, b""))
+
+        _, plain_headers, _ = self.fetch("/")
+        self.assertIsNone(plain_headers["Content-Encoding"])
+        self.assertNotEqual(plain_headers["ETag"], headers["ETag"])
+
+        bump(self.root / "index.html", "<html><body>changed</body></html>")
+        status, changed_headers, _ = self.fetch("/", **{"If-None-Match": plain_headers["ETag"]})
+        self.assertEqual(status, 200)
+        self.assertNotEqual(changed_headers["ETag"], plain_headers["ETag"])
+
+    def test_missing_pages_use_the_site_404(self):
+        status, _, body = self.fetch("/nowhere.html")
+        self.assertEqual(status, 404)
+        self.assertIn(b"missing", body)
+
+
+if __name__ == "__main__":
+    unittest.main()
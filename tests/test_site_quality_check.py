@@ -2,12 +2,24 @@ import sys
 import unittest
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from unittest.mock import patch
 
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT / "scripts"))
 
 import site_quality_check as sq  # noqa: E402
 import public_pages as pp  # noqa: E402
+from site_output import SiteOutput  # noqa: E402
+
+
+class CountingOutput(SiteOutput):
+    def __init__(self, root: Path) -> None:
+        super().__init__(root)
+        self.reads: list[str] = []
+
+    def read_bytes(self, path: Path) -> bytes:
+        self.reads.append(self.relative(path))
+        return super().read_bytes(path)
 
 
 class PathExistsTests(unittest.TestCase):
@@ -74,6 +86,81 @@ class PublicPageDiscoveryTests(unittest.TestCase):
             self.assertEqual(pp.public_html_paths(root), [root / "404.html"])
             self.assertEqual(pp.sitemap_urls(root), [])
 
+    def test_walker_never_enters_excluded_directories(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            for directory in ("node_modules/pkg", "news/2026", ".git/objects"):
+                (root / directory).mkdir(parents=True)
+                (root / directory / "page.html").write_text("<html></html>", encoding="utf-8")
+            visited: list[str] = []
+            real_scandir = pp.os.scandir
+
+            def recording_scandir(path):
+                visited.append(Path(path).relative_to(root).as_posix())
+                return real_scandir(path)
+
+            with patch.object(pp.os, "scandir", recording_scandir):
+                found = [path.relative_to(root).as_posix() for path, _ in pp.walk_public_html(root)]
+
+            self.assertEqual(found, ["news/2026/page.html"])
+            self.assertEqual(sorted(visited), [".", "news", "news/2026"])
+
+    def test_page_index_skips_reading_unchanged_pages(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "index.html").write_text("<html></html>", encoding="utf-8")
+            (root / "draft.html").write_text('<meta name="robots" content="noindex">', encoding="utf-8")
+
+            first = CountingOutput(root)
+            self.assertEqual(pp.sitemap_urls(root, pp.discover_public_pages(root, output=first)), ["https://www.local083.org/"])
+            self.assertEqual(sorted(first.reads), ["draft.html", "index.html"])
+            self.assertTrue((root / pp.PAGE_INDEX).is_file())
+
+            second = CountingOutput(root)
+            self.assertEqual(pp.sitemap_urls(root, pp.discover_public_pages(root, output=second)), ["https://www.local083.org/"])
+            self.assertEqual(second.reads, [])
+
+            (root / "draft.html").write_text('<link rel="canonical" href="https://www.local083.org/draft/">', encoding="utf-8")
+            third = CountingOutput(root)
+            urls = pp.sitemap_urls(root, pp.discover_public_pages(root, output=third))
+            self.assertEqual(third.reads, ["draft.html"])
+            self.assertEqual(urls, ["https://www.local083.org/", "https://www.local083.org/draft/"])
+
+
+class PageCorpusTests(unittest.TestCase):
+    def test_tools_sharing_a_corpus_read_each_page_once(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "index.html").write_text('<a href="/about.html#team">About</a><img src="/missing.png"> TODO', encoding="utf-8")
+            (root / "about.html").write_text('<h2 id="team">Team</h2><a name="history"></a><meta name="robots" content="noindex">', encoding="utf-8")
+            output = CountingOutput(root)
+            corpus = pp.PageCorpus(root, output=output)
+            original_root = sq.ROOT
+            try:
+                sq.ROOT = root
+                pages = sq.collect_public_html(corpus)
+                issues = sq.check_html_links(pages, corpus) + sq.find_placeholder_issues(pages, strict=True, corpus=corpus)
+                self.assertEqual(pp.sitemap_urls(root, pp.discover_public_pages(root, corpus=corpus)), ["https://www.local083.org/"])
+            finally:
+                sq.ROOT = original_root
+
+            self.assertEqual(sorted(output.reads), ["about.html", "index.html"])
+            self.assertEqual([issue.message for issue in issues], ["Broken internal link: /missing.png", "Possible unfinished content marker found (\\bTODO\\b)"])
+            about = corpus.page(root / "about.html")
+            self.assertEqual(about.summary.anchors, {"team", "history"})
+            self.assertTrue(about.noindex)
+            self.assertEqual([line for _, _, line in corpus.page(root / "index.html").summary.references], [1, 1])
+
+    def test_update_replaces_cached_text(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            page = root / "index.html"
+            page.write_text('<p id="old"></p>', encoding="utf-8")
+            corpus = pp.PageCorpus(root)
+            self.assertEqual(corpus.page(page).summary.ids, ["old"])
+            corpus.update(page, '<p id="new"></p>')
+            self.assertEqual(corpus.page(page).summary.ids, ["new"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,11 +1,13 @@
 import sys
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT / "scripts"))
 
 import sync_site_shell as shell  # noqa: E402
+from benchmark_site_shell import reference_sync_page  # noqa: E402
 
 
 PAGE = '''<!doctype html><html><head><style>body { color: black; }</style></head><body>
@@ -89,6 +91,48 @@ class SyncSiteShellTests(unittest.TestCase):
         updated = shell.sync_source(page, "rally/index.html")
         self.assertNotIn("\n    \n    <!-- SITE SHELL", updated)
 
+    def test_adds_section_feed_links_before_head_end(self):
+        page = PAGE.replace("</style></head>", "</style>\n</head>")
+        updated = shell.sync_source(page, "events/rally.html")
+        feeds = updated[updated.index(shell.FEEDS_START) : updated.index("</head>")]
+        self.assertEqual(feeds.count('<link rel="alternate"'), 6)
+        self.assertIn('type="application/feed+json" title="SEIU Local 503 at OSU - Events (JSON Feed)" href="https://www.local083.org/events/feed.json"', feeds)
+        self.assertTrue(feeds.endswith(f"    {shell.FEEDS_END}\n"))
+
+        moved = shell.sync_source(updated, "about.html")
+        self.assertEqual(moved.count(shell.FEEDS_START), 1)
+        self.assertNotIn("/events/feed.json", moved)
+        self.assertIn('type="application/atom+xml" title="SEIU Local 503 at OSU - News and Events (Atom)" href="https://www.local083.org/atom.xml"', moved)
+
+    def test_single_scan_matches_previous_synchronizer(self):
+        pages = {
+            "nested header and inner footer": PAGE.replace('<nav>Old</nav>', '<header>Inner<footer>x</footer></header><nav>Old</nav>'),
+            "self-closing and uppercase tags": PAGE.replace("<header class=\"old\">", "<HEADER class=\"old\"><header/>").replace("</header>\n<main", "</HEADER>\n<MAIN"),
+            "style on the head line": "<html><head><title>T</title>  <style></style></head><body><main>x</main></body></html>",
+            "links already present": '<html><head>\n<link rel="stylesheet" href="/styles/tailwind.css">\n<link href="/styles/site-shell.css" rel="stylesheet">\n</head><body>\n    <main>x</main>\n</body></html>',
+            "no main": "<html><head></head><body class=\"x\">Only text</body></html>",
+            "indented marked header": shell.sync_source(PAGE, "about.html").replace(shell.HEADER_START, "  \n  " + shell.HEADER_START),
+            "missing body end": "<html><head></head><body><main>x</main></html>",
+            "missing head end": "<html><body><main>x</main></body></html>",
+        }
+        for name, page in pages.items():
+            for relative_path in ("about.html", "news/story.html", "privacy.html"):
+                with self.subTest(name=name, path=relative_path):
+                    self.assertEqual(shell.sync_page((page, relative_path)), reference_sync_page((page, relative_path)))
+
+    def test_fragments_are_rendered_once_per_section(self):
+        shell.section_header.cache_clear()
+        for path in ("news.html", "news/a.html", "news/b.html", "about.html"):
+            shell.render_header(path)
+        self.assertEqual(shell.section_header.cache_info().misses, 2)
+        self.assertIs(shell.render_feed_links("news/a.html"), shell.render_feed_links("news/b.html"))
+
+    def test_worker_pool_matches_serial_run(self):
+        work = [(PAGE, "news/story.html"), ("<html><body></body></html>", "about.html"), (PAGE, "privacy.html")] * 2
+        with patch.object(shell, "PARALLEL_MIN_PAGES", 2):
+            self.assertEqual(shell.sync_pages(work, jobs=2), shell.sync_pages(work))
+        self.assertEqual(shell.sync_pages(work)[1], ("<html><body></body></html>", "Missing </head> while adding site shell stylesheets"))
+
 
 if __name__ == "__main__":
     unittest.main()